@@ -1,10 +1,13 @@
+import os
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from app.services.core.logging_service import audit_logger
 
-# 1) Cargar variables desde Secret Manager ANTES de importar Config
-from app.services.gcp.secret_manager_service import cargar_variables_desde_secret
-cargar_variables_desde_secret()
+# 1) Cargar variables desde Secret Manager ANTES de importar Config.
+# ENABLE_SECRET_MANAGER=false lo omite (p. ej. en el build de la imagen, sin credenciales ni secretos)
+if os.getenv("ENABLE_SECRET_MANAGER", "true").lower() in ("true", "1", "yes"):
+    from app.services.gcp.secret_manager_service import cargar_variables_desde_secret
+    cargar_variables_desde_secret()
 
 # 2) Ahora sí importar Config (ya con os.environ lleno)
 from app.config import Config
@@ -41,11 +44,17 @@ def create_app():
 
         # Importar modelos para que SQLAlchemy los reconozca
         from app.models.video import Video
+        from app.models.analisis_cache import AnalisisCache
+        from app.models.badWord import BadWord
+        from app.models.traduccion_cache import TraduccionCache
 
         # Crear las tablas si no existen (solo en desarrollo)
         with app.app_context():
             try:
                 db.create_all()
+                # create_all no altera tablas existentes: columnas nuevas de video/club
+                from app.services.core.migraciones_service import aplicar_migraciones
+                aplicar_migraciones(db.engine)
                 audit_logger.log_error(
                     error_type="APP_DATABASE_TABLES_CREATED",
                     message="Tablas de base de datos creadas/verificadas exitosamente"
@@ -0,0 +1,34 @@
+# app/models/analisis_cache.py
+from app import db
+from datetime import datetime
+
+
+class AnalisisCache(db.Model):
+    """
+    Resultado completo de analizar_video_completo indexado por el hash del contenido
+    del objeto en GCS (md5/crc32c) y la versión de configuración del pipeline.
+    Permite reutilizar el veredicto cuando se re-sube el mismo clip con otro nombre.
+    """
+
+    __tablename__ = "analisis_cache"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+
+    # "md5:<base64>" o "crc32c:<base64>:<size>" según lo que exponga el blob
+    hash_contenido = db.Column(db.String(128), nullable=False)
+    version_pipeline = db.Column(db.String(64), nullable=False)
+
+    # JSON con el dict devuelto por analizar_video_completo
+    resultado = db.Column(db.Text, nullable=False)
+
+    video_id_origen = db.Column(db.Integer, nullable=True)
+    hits = db.Column(db.Integer, nullable=False, default=0)
+    fecha_creacion = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    fecha_ultimo_uso = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.UniqueConstraint("hash_contenido", "version_pipeline", name="uq_hash_version_pipeline"),
+    )
+
+    def __repr__(self):
+        return f"<AnalisisCache {self.hash_contenido} ({self.version_pipeline}, hits={self.hits})>"
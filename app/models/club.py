@@ -19,6 +19,8 @@ class Club(db.Model):
     nombre = db.Column(db.String(100), nullable=False)
     color_primario = db.Column(db.String(7), nullable=False, default='#000000')
     logo_url = db.Column(db.String(200), nullable=True)
+    # País ISO 3166-1 alfa-2 (AR, ES, MX...): define el lexicón de moderación del club
+    pais = db.Column(db.String(2), nullable=True)
     
     # Fechas y estado
     fecha_creacion = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -46,6 +48,7 @@ class Club(db.Model):
             'nombre': self.nombre,
             'color_primario': self.color_primario,
             'logo_url': self.logo_url,
+            'pais': self.pais,
             'fecha_creacion': self.fecha_creacion.isoformat() if self.fecha_creacion else None,
             'activo': self.activo,
             'total_usuarios': len(self.usuarios) if self.usuarios else 0
@@ -62,6 +65,7 @@ class Club(db.Model):
                 nombre=data.get('nombre'),
                 color_primario=data.get('color_primario', '#000000'),
                 logo_url=data.get('logo_url', ''),
+                pais=(data.get('pais') or '').upper()[:2] or None,
                 activo=data.get('activo', True)
             )
             
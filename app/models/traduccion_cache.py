@@ -0,0 +1,33 @@
+# app/models/traduccion_cache.py
+from app import db
+from datetime import datetime
+
+
+class TraduccionCache(db.Model):
+    """
+    Traducción persistida de una etiqueta (Video Intelligence / logos) por idioma destino.
+    El vocabulario de etiquetas es chico y se repite entre videos: solo las etiquetas
+    que nunca se vieron llegan a Google Translate.
+    """
+
+    __tablename__ = "traduccion_cache"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+
+    # Etiqueta original normalizada (strip + minúsculas)
+    texto_origen = db.Column(db.String(255), nullable=False)
+    idioma_destino = db.Column(db.String(8), nullable=False, default="es")
+    traduccion = db.Column(db.String(255), nullable=False)
+
+    # Origen de la traducción: api, diccionario, manual
+    fuente = db.Column(db.String(20), nullable=False, default="api")
+
+    hits = db.Column(db.Integer, nullable=False, default=0)
+    fecha_creacion = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint("texto_origen", "idioma_destino", name="uq_texto_idioma_traduccion"),
+    )
+
+    def __repr__(self):
+        return f"<TraduccionCache {self.texto_origen} -> {self.traduccion} ({self.idioma_destino})>"
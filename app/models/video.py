@@ -36,6 +36,11 @@ class Video(db.Model):
     frames_texto_analizados = db.Column(db.Integer, nullable=True, default=0, comment="Número de frames analizados para texto.")
     # ... arriba con las demás columnas
     idempotency_key = db.Column(db.String(128), nullable=True, index=True)
+    vi_operation_name = db.Column(db.String(255), nullable=True, comment="Operación de Video Intelligence en curso (modo submit/resume).")
+    club_id = db.Column(db.Integer, nullable=True, index=True, comment="Club que subió el video (define el locale de moderación).")
+    etiquetas_original = db.Column(db.Text, nullable=True, comment="Etiquetas de Video Intelligence en inglés, sin traducir.")
+    logotipos_original = db.Column(db.Text, nullable=True, comment="Logotipos tal como los devuelve Video Intelligence.")
+    traduccion_pendiente = db.Column(db.Boolean, nullable=False, default=False, index=True, comment="Etiquetas/logotipos todavía en inglés (traducción diferida).")
 
     # --- Constantes de Estado ---
     ESTADOS_ADMIN = ['sin-revisar', 'aceptado', 'rechazado']
@@ -89,6 +94,10 @@ class Video(db.Model):
             )
             self.etiquetas = datos_ia.get('etiquetas', '')
             self.logotipos = datos_ia.get('logotipos', '')
+            self.etiquetas_original = datos_ia.get('etiquetas_original', '')
+            self.logotipos_original = datos_ia.get('logotipos_original', '')
+            # Con traducción diferida 'etiquetas'/'logotipos' quedan en inglés hasta que se traducen
+            self.traduccion_pendiente = bool(datos_ia.get('traduccion_pendiente'))
             self.puntaje_confianza = datos_ia.get('puntaje_confianza', 0.0)
             self.tiempo_procesamiento = datos_ia.get('tiempo_procesamiento', 0.0)
 
@@ -290,6 +299,7 @@ class Video(db.Model):
         return {
             'id': self.id,
             'usuario_id': self.usuario_id,
+            'club_id': self.club_id,
             'video_url': self.video_url,
             'nombre_archivo': self.nombre_archivo,
             'duracion': self.duracion,
@@ -300,6 +310,7 @@ class Video(db.Model):
             'contenido_explicito': self.contenido_explicito,
             'etiquetas': self.etiquetas,
             'logotipos': self.logotipos,
+            'traduccion_pendiente': self.traduccion_pendiente,
             'objetos_detectados': json.loads(self.objetos_detectados) if self.objetos_detectados else [],
             'puntaje_confianza': self.puntaje_confianza,
             'fecha_subida': self.fecha_subida.isoformat() if self.fecha_subida else None,
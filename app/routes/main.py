@@ -1,9 +1,21 @@
 import os
 from flask import Blueprint, render_template, request, redirect, url_for, jsonify, abort
 from app.services.gcp.gcs_service import _get_bucket, obtener_url_firmada, obtener_url_firmada_upload
-from app.services.video.video_processor import procesar_video_individual
+from app.services.video.video_processor import (
+    procesar_video_individual,
+    iniciar_procesamiento_video,
+    reanudar_procesamiento_video,
+    VI_ASYNC_ENABLED,
+)
 from app.services.gcp.cloud_tasks_service import enqueue_process_video_task
 from app.services.video.video_batch_worker import procesar_videos_pendientes_batch
+from app.services.video.analysis_cache_service import obtener_estadisticas_cache
+from app.services.moderation.text_detection_service import obtener_estadisticas_moderacion_api
+from app.services.moderation.badwords_service import obtener_estado_lexicon, sembrar_badwords_desde_lista
+from app.services.moderation.text_moderation_service import moderar_textos, LoteInvalidoError
+from app.services.moderation.locale_lexicon_service import locale_para_pais, obtener_estadisticas_locales
+from app.services.i18n.translation_service import obtener_estadisticas_traduccion
+from app.services.i18n.traduccion_pendiente_service import encolar_traduccion_pendiente, traducir_videos_pendientes
 from app.services.core.logging_service import audit_logger
 from app.models.video import Video
 from app.models.club import Club
@@ -260,6 +272,11 @@ def ver_detalle_video(video_id: int):
             details={'video_filename': video.nombre_archivo, 'video_estado': video.estado}
         )
 
+        # Traducción diferida pendiente: se muestran los originales y se (re)encola la task,
+        # sin traducir dentro del request
+        if video.traduccion_pendiente:
+            encolar_traduccion_pendiente()
+
         return render_template("admin_detalle.html", video=video, signed_url=None)
         
     except Exception as e:
@@ -538,6 +555,36 @@ def health_check():
             "error": str(e)
         }), 500
 
+@main.get("/admin/metrics")
+def metricas_servicios():
+    """Contadores en memoria de las caches del pipeline (por proceso/worker)."""
+    try:
+        return jsonify({
+            "analisis_cache": obtener_estadisticas_cache(),
+            "lexicon_badwords": obtener_estado_lexicon(),
+            "moderacion_texto_api": obtener_estadisticas_moderacion_api(),
+            "lexicones_locale": obtener_estadisticas_locales(),
+            "traduccion_etiquetas": obtener_estadisticas_traduccion(),
+        }), 200
+    except Exception as e:
+        logger.error(f"Error obteniendo métricas: {e}")
+        return jsonify({"error": "server"}), 500
+
+@main.post("/admin/badwords/sembrar")
+def sembrar_badwords():
+    """Copia a la tabla badword las palabras de la lista en código que aún no existen."""
+    try:
+        insertadas = sembrar_badwords_desde_lista()
+        return jsonify({"ok": True, "insertadas": insertadas}), 200
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error sembrando badwords: {e}")
+        audit_logger.log_error(
+            error_type="BADWORDS_SEED_ERROR",
+            message=f"Error sembrando badwords: {str(e)}"
+        )
+        return jsonify({"error": "server"}), 500
+
 @main.post("/tasks/process-video")
 def tasks_process_video():
     if not _is_cloud_tasks_request(request):
@@ -552,9 +599,40 @@ def tasks_process_video():
         request.headers.get("X-CloudTasks-TaskName")
         or request.headers.get("X-Cloudtasks-Taskname")
     )
-    logger.info(f"[TASK] start task={task_name} object={object_name}")
+    fase = (data.get("fase") or "").strip()
+    logger.info(f"[TASK] start task={task_name} object={object_name} fase={fase or 'inicial'}")
 
     try:
+        # ⏱ Fase de reanudación (submit/resume): solo consulta la operación de VI
+        if fase == "reanudar":
+            video = (
+                Video.query
+                .filter_by(gcs_object_name=object_name, estado_ia="procesando")
+                .first()
+            )
+            if not video or not video.vi_operation_name:
+                logger.info(f"[TASK] skip resume object={object_name} (sin operación pendiente)")
+                return ("", 204)
+
+            try:
+                intento = int(data.get("intento") or 1)
+            except (TypeError, ValueError):
+                intento = 1
+
+            resultado = reanudar_procesamiento_video(video, intento=intento)
+            if resultado.get("omitido"):
+                logger.info(f"[TASK] skip resume task={task_name} video_id={video.id} (entrega duplicada)")
+                return ("", 204)
+            if not resultado.get("pendiente"):
+                video.estado_ia = "completado" if resultado.get("exitoso") else "error"
+                db.session.commit()
+
+            logger.info(
+                f"[TASK] resume task={task_name} video_id={video.id} "
+                f"intento={intento} estado_ia={video.estado_ia}"
+            )
+            return ("", 204)
+
         # 🔒 LOCK ATÓMICO: solo uno puede pasar a 'procesando'
         updated = (
             Video.query
@@ -576,7 +654,17 @@ def tasks_process_video():
         if not video:
             return ("", 204)
 
-        resultado = procesar_video_individual(video)
+        if VI_ASYNC_ENABLED:
+            # Submit: enviar annotate_video y liberar el hilo; una task posterior reanuda
+            resultado = iniciar_procesamiento_video(video)
+            if resultado.get("pendiente"):
+                logger.info(
+                    f"[TASK] submitted task={task_name} video_id={video.id} "
+                    f"operation={resultado.get('operacion')}"
+                )
+                return ("", 204)
+        else:
+            resultado = procesar_video_individual(video)
 
         video.estado_ia = "completado" if resultado.get("exitoso") else "error"
         db.session.commit()
@@ -599,6 +687,33 @@ def tasks_process_video():
         # 500 => Cloud Tasks reintenta
         return ("", 500)
 
+@main.post("/tasks/translate-pending")
+def tasks_translate_pending():
+    """Traduce en lote las etiquetas/logotipos de videos analizados con traducción diferida."""
+    if not _is_cloud_tasks_request(request):
+        return ("Forbidden", 403)
+
+    data = request.get_json(silent=True) or {}
+    try:
+        limite = int(data["limite"]) if data.get("limite") else None
+    except (TypeError, ValueError):
+        limite = None
+
+    try:
+        resumen = traducir_videos_pendientes(limite)
+        logger.info(f"[TASK] translate-pending {resumen}")
+        if resumen.get("fallidos"):
+            # Etiquetas sin traducir: 500 => Cloud Tasks reintenta (esos videos siguen pendientes)
+            return jsonify(resumen), 500
+        # Quedaron más que un lote: otra task en la próxima ventana
+        if resumen.get("restantes"):
+            encolar_traduccion_pendiente()
+        return jsonify(resumen), 200
+    except Exception:
+        logger.exception("[TASK] error translate-pending")
+        # 500 => Cloud Tasks reintenta
+        return ("", 500)
+
 #========================================
 @main.post("/api/upload-url")
 def api_upload_url():
@@ -612,6 +727,10 @@ def api_upload_url():
         club_id = data.get("club_id")
         if club_id in ("", None, "null", "None"):
             club_id = None
+        try:
+            club_id_int = int(club_id) if club_id is not None else None
+        except (TypeError, ValueError):
+            club_id_int = None
 
         duracion_raw = data.get("duracion")
         try:
@@ -674,6 +793,7 @@ def api_upload_url():
             estado_ia="pendiente",
             contenido_explicito="No analizado",
             idempotency_key=idempotency_key,   # ← CLAVE
+            club_id=club_id_int,
         )
 
         db.session.add(nuevo_video)
@@ -706,4 +826,35 @@ def api_upload_url():
             error_type="API_UPLOAD_URL_ERROR",
             message=f"Error generando URL firmada: {str(e)}"
         )
-        return jsonify({"error": "upload_url_error"}), 500
\ No newline at end of file
+        return jsonify({"error": "upload_url_error"}), 500
+#========================================
+@main.post("/api/moderate-text")
+def api_moderate_text():
+    """
+    Modera un lote de textos con los matchers locales (y Language v2 opcional, acotado).
+    Body: {"textos": ["..."] | [{"id": ..., "texto": "..."}], "usar_api": false, "max_api": 20,
+           "pais": "AR"}   # opcional: suma el lexicón del locale del país
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        max_api = data.get("max_api")
+        pais = data.get("pais")
+        if pais is not None and not isinstance(pais, str):
+            raise LoteInvalidoError("'pais' debe ser un código de país (string)")
+        resultado = moderar_textos(
+            data.get("textos"),
+            usar_api=bool(data.get("usar_api", False)),
+            max_api=int(max_api) if max_api is not None else None,
+            locale=locale_para_pais(pais) if pais else None,
+        )
+        return jsonify(resultado), 200
+
+    except (LoteInvalidoError, TypeError, ValueError) as e:
+        return jsonify({"error": "bad_request", "detalle": str(e)}), 400
+
+    except Exception as e:
+        audit_logger.log_error(
+            error_type="API_MODERATE_TEXT_ERROR",
+            message=f"Error moderando textos: {str(e)}"
+        )
+        return jsonify({"error": "moderate_text_error"}), 500
@@ -0,0 +1,68 @@
+# app/services/core/cache_service.py
+"""
+Cache en memoria por proceso, acotada por cantidad de entradas (LRU) y por TTL.
+Thread-safe: gunicorn corre varios hilos por worker y todos comparten la instancia.
+
+Uso:
+    cache = CacheTTL(max_entradas=5000, ttl_seg=3600)
+    valor = cache.obtener(clave)          # None si no está o expiró
+    cache.guardar(clave, valor)
+    cache.estadisticas()                  # hits, misses, hit_ratio, desalojos, ...
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class CacheTTL:
+    def __init__(self, max_entradas: int, ttl_seg: float):
+        self.max_entradas = max(0, int(max_entradas))
+        self.ttl_seg = float(ttl_seg)
+        self._datos: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expirados": 0, "desalojos": 0}
+
+    def obtener(self, clave: Hashable) -> Optional[Any]:
+        ahora = time.monotonic()
+        with self._lock:
+            item = self._datos.get(clave)
+            if item is None:
+                self._stats["misses"] += 1
+                return None
+            vence, valor = item
+            if vence <= ahora:
+                del self._datos[clave]
+                self._stats["expirados"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._datos.move_to_end(clave)
+            self._stats["hits"] += 1
+            return valor
+
+    def guardar(self, clave: Hashable, valor: Any):
+        if self.max_entradas == 0:
+            return
+        with self._lock:
+            self._datos[clave] = (time.monotonic() + self.ttl_seg, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+                self._stats["desalojos"] += 1
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+
+    def __len__(self) -> int:
+        return len(self._datos)
+
+    def estadisticas(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entradas"] = len(self._datos)
+        consultas = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / consultas, 3) if consultas else 0.0
+        stats["max_entradas"] = self.max_entradas
+        stats["ttl_seg"] = self.ttl_seg
+        return stats
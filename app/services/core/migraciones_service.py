@@ -0,0 +1,89 @@
+# app/services/core/migraciones_service.py
+"""
+Migraciones de esquema para tablas existentes.
+
+db.create_all() crea las tablas que faltan pero nunca altera una tabla que ya existe:
+las columnas nuevas de modelos existentes (video, club) se agregan acá con ALTER TABLE.
+Cada migración se aplica solo si la columna no está, así que es idempotente y corre
+en cada arranque (create_app) después de create_all().
+
+También se puede correr a mano antes de desplegar (desde la raíz del repo):
+    python -m app.services.core.migraciones_service
+"""
+import logging
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import inspect, text
+
+from app.services.core.logging_service import audit_logger
+
+logger = logging.getLogger(__name__)
+
+
+class Migracion(NamedTuple):
+    tabla: str
+    columna: str
+    # Definición de la columna para ALTER TABLE ... ADD COLUMN (válida en MySQL y SQLite)
+    definicion: str
+    # Índice que el modelo declara con index=True (create_all no lo crea en tablas existentes)
+    indice: Optional[str] = None
+
+
+# En orden de aparición; agregar al final
+MIGRACIONES: List[Migracion] = [
+    Migracion("video", "vi_operation_name", "VARCHAR(255) NULL"),
+    Migracion("video", "club_id", "INTEGER NULL", indice="ix_video_club_id"),
+    # Queda NULL en los clubes existentes: hay que cargarlo (ISO alfa-2) para que el club
+    # use el lexicón de su locale; mientras tanto sus videos se moderan con las listas globales
+    Migracion("club", "pais", "VARCHAR(2) NULL"),
+    Migracion("video", "etiquetas_original", "TEXT NULL"),
+    Migracion("video", "logotipos_original", "TEXT NULL"),
+    Migracion("video", "traduccion_pendiente", "BOOLEAN NOT NULL DEFAULT FALSE",
+              indice="ix_video_traduccion_pendiente"),
+]
+
+
+def aplicar_migraciones(engine) -> List[str]:
+    """
+    Agrega las columnas (e índices) que faltan en tablas existentes.
+    Las tablas que todavía no existen las crea create_all() con el modelo completo.
+    Retorna las columnas agregadas como "tabla.columna".
+    """
+    inspector = inspect(engine)
+    tablas = set(inspector.get_table_names())
+    columnas = {}
+    agregadas = []
+
+    with engine.begin() as conn:
+        for m in MIGRACIONES:
+            if m.tabla not in tablas:
+                continue
+            if m.tabla not in columnas:
+                columnas[m.tabla] = {c["name"] for c in inspector.get_columns(m.tabla)}
+            if m.columna in columnas[m.tabla]:
+                continue
+            conn.execute(text(f"ALTER TABLE {m.tabla} ADD COLUMN {m.columna} {m.definicion}"))
+            if m.indice:
+                conn.execute(text(f"CREATE INDEX {m.indice} ON {m.tabla} ({m.columna})"))
+            columnas[m.tabla].add(m.columna)
+            agregadas.append(f"{m.tabla}.{m.columna}")
+            logger.info(f"[MIGRACION] Columna agregada: {m.tabla}.{m.columna}")
+
+    if agregadas:
+        audit_logger.log_event(
+            event_type="DB_SCHEMA_MIGRATION",
+            message=f"Columnas agregadas: {', '.join(agregadas)}",
+            details={"columnas": agregadas}
+        )
+    return agregadas
+
+
+def main():
+    from app import create_app, db
+    with create_app().app_context():
+        # create_app ya las aplica al arrancar; esto solo confirma el estado
+        print(aplicar_migraciones(db.engine) or "Esquema al día")
+
+
+if __name__ == "__main__":
+    main()
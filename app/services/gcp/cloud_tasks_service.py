@@ -1,49 +1,44 @@
 import os
 import json
+import time
 import logging
 from datetime import datetime, timedelta, timezone
+from typing import Optional
 
+from google.api_core.exceptions import AlreadyExists
 from google.cloud import tasks_v2
 from google.protobuf import timestamp_pb2
 
 logger = logging.getLogger(__name__)
 
+# Ventana de agrupación de la task de traducción diferida: una task por ventana traduce
+# todos los videos que terminaron en ella
+TRANSLATE_TASK_VENTANA_SEC = max(1, int(os.getenv("TRANSLATE_TASK_VENTANA_SEC", "60")))
 
-def enqueue_process_video_task(object_name: str, *, delay_seconds: int = 0) -> str:
-    """
-    Encola una Cloud Task para procesar UN video (por object_name).
 
-    Env vars requeridas:
-      - GCP_PROJECT_ID (o GOOGLE_CLOUD_PROJECT)
-      - CLOUD_TASKS_LOCATION (default: us-east1)
-      - CLOUD_TASKS_QUEUE (default: video-processing)
-      - TASK_PROCESS_URL (URL completa a /tasks/process-video)
-      - TASKS_OIDC_SA_EMAIL (service account email para firmar OIDC)
-    """
+def _config_cola() -> tuple:
+    """(cliente, parent, oidc_sa_email) de la cola configurada. Lanza RuntimeError si falta config."""
     project_id = os.getenv("GCP_PROJECT_ID") or os.getenv("GOOGLE_CLOUD_PROJECT")
     location = (os.getenv("CLOUD_TASKS_LOCATION") or "us-east1").strip()
     queue = (os.getenv("CLOUD_TASKS_QUEUE") or "video-processing").strip()
-    target_url = (os.getenv("TASK_PROCESS_URL") or "").strip()
     oidc_sa_email = (os.getenv("TASKS_OIDC_SA_EMAIL") or "").strip()
 
     if not project_id:
         raise RuntimeError("Falta env var: GCP_PROJECT_ID o GOOGLE_CLOUD_PROJECT")
-    if not target_url:
-        raise RuntimeError("Falta env var: TASK_PROCESS_URL")
     if not oidc_sa_email:
         raise RuntimeError("Falta env var: TASKS_OIDC_SA_EMAIL")
 
     client = tasks_v2.CloudTasksClient()
-    parent = client.queue_path(project_id, location, queue)
+    return client, client.queue_path(project_id, location, queue), oidc_sa_email
 
-    body = json.dumps({"object_name": object_name}).encode("utf-8")
 
+def _http_task(target_url: str, payload: dict, oidc_sa_email: str, delay_seconds: int = 0) -> dict:
     task: dict = {
         "http_request": {
             "http_method": tasks_v2.HttpMethod.POST,
             "url": target_url,
             "headers": {"Content-Type": "application/json"},
-            "body": body,
+            "body": json.dumps(payload).encode("utf-8"),
             "oidc_token": {"service_account_email": oidc_sa_email},
         }
     }
@@ -53,7 +48,66 @@ def enqueue_process_video_task(object_name: str, *, delay_seconds: int = 0) -> s
         ts = timestamp_pb2.Timestamp()
         ts.FromDatetime(dt)
         task["schedule_time"] = ts
+    return task
+
+
+def enqueue_process_video_task(object_name: str, *, delay_seconds: int = 0, fase: str = None, intento: int = 0) -> str:
+    """
+    Encola una Cloud Task para procesar UN video (por object_name).
+    Con fase="reanudar" la task consulta la operación de Video Intelligence
+    ya enviada (modo submit/resume); intento cuenta los sondeos realizados.
+
+    Env vars requeridas:
+      - GCP_PROJECT_ID (o GOOGLE_CLOUD_PROJECT)
+      - CLOUD_TASKS_LOCATION (default: us-east1)
+      - CLOUD_TASKS_QUEUE (default: video-processing)
+      - TASK_PROCESS_URL (URL completa a /tasks/process-video)
+      - TASKS_OIDC_SA_EMAIL (service account email para firmar OIDC)
+    """
+    target_url = (os.getenv("TASK_PROCESS_URL") or "").strip()
+    if not target_url:
+        raise RuntimeError("Falta env var: TASK_PROCESS_URL")
+    client, parent, oidc_sa_email = _config_cola()
+
+    payload = {"object_name": object_name}
+    if fase:
+        payload["fase"] = fase
+        payload["intento"] = int(intento)
+    task = _http_task(target_url, payload, oidc_sa_email, delay_seconds)
 
     resp = client.create_task(request={"parent": parent, "task": task})
-    logger.info(f"[CLOUD_TASKS] enqueued task={resp.name} object={object_name}")
+    logger.info(f"[CLOUD_TASKS] enqueued task={resp.name} object={object_name} fase={fase or 'inicial'}")
+    return resp.name
+
+
+def enqueue_translate_pending_task() -> Optional[str]:
+    """
+    Encola la task /tasks/translate-pending (traducción diferida en lote), programada al
+    final de la ventana actual de TRANSLATE_TASK_VENTANA_SEC. La task se nombra por ventana:
+    si varios videos terminan en la misma, Cloud Tasks rechaza los nombres repetidos y
+    queda una sola task que traduce el lote entero.
+
+    Env vars: las de enqueue_process_video_task; la URL sale de TASK_TRANSLATE_URL
+    (default: TASK_PROCESS_URL con /tasks/translate-pending).
+    Retorna el nombre de la task, o None si la ventana ya tenía una.
+    """
+    target_url = (os.getenv("TASK_TRANSLATE_URL") or "").strip()
+    if not target_url:
+        process_url = (os.getenv("TASK_PROCESS_URL") or "").strip()
+        if not process_url.endswith("/tasks/process-video"):
+            raise RuntimeError("Falta env var: TASK_TRANSLATE_URL")
+        target_url = process_url[:-len("/tasks/process-video")] + "/tasks/translate-pending"
+    client, parent, oidc_sa_email = _config_cola()
+
+    ahora = time.time()
+    ventana = int(ahora // TRANSLATE_TASK_VENTANA_SEC)
+    delay = (ventana + 1) * TRANSLATE_TASK_VENTANA_SEC - ahora
+    task = _http_task(target_url, {}, oidc_sa_email, max(1, int(delay)))
+    task["name"] = f"{parent}/tasks/translate-pending-{ventana}"
+
+    try:
+        resp = client.create_task(request={"parent": parent, "task": task})
+    except AlreadyExists:
+        return None
+    logger.info(f"[CLOUD_TASKS] enqueued task={resp.name} (traducción diferida)")
     return resp.name
@@ -1,11 +1,13 @@
 # app/services/gcs_service.py
 import os
 import mimetypes
+import threading
 from datetime import timedelta, datetime
 from google.cloud import storage
 from google.oauth2 import service_account
 from google.auth import default as auth_default
-from google.auth.transport.requests import Request
+from google.auth.transport.requests import AuthorizedSession, Request
+from requests.adapters import HTTPAdapter
 from app.services.core.logging_service import audit_logger
 import logging
 logger = logging.getLogger(__name__)
@@ -13,6 +15,14 @@ logger = logging.getLogger(__name__)
 # Lee config desde variables de entorno (centralizado en .env)
 BUCKET_NAME = os.getenv("GOOGLE_CLOUD_STORAGE_BUCKET", "accessfan-video")
 GOOGLE_CRED_PATH = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")  # opcional en local
+# Conexiones HTTP del cliente compartido: igual a --threads de gunicorn
+GCS_HTTP_POOL_SIZE = max(1, int(os.getenv("GCS_HTTP_POOL_SIZE", "8")))
+
+_storage_client = None
+_storage_credentials = None
+_storage_client_lock = threading.Lock()
+# Un solo refresh del token a la vez (los hilos comparten las credenciales del cliente)
+_credentials_refresh_lock = threading.Lock()
 
 
 def _build_signed_url(blob, expiration=timedelta(hours=24), method="GET"):
@@ -22,12 +32,7 @@ def _build_signed_url(blob, expiration=timedelta(hours=24), method="GET"):
         tuple[str, str]: (url, modo) donde modo ∈ {"PRIVATE_KEY", "IAM"}
     """
 
-    creds, _ = auth_default()
-
-    try:
-        creds.refresh(Request())
-    except Exception as e:
-        logger.warning(f"[SIGNED_URL] No se pudo refrescar token ADC: {e}")
+    creds = _credenciales_vigentes()
 
     sign_bytes = getattr(creds, "sign_bytes", None)
     if callable(sign_bytes):
@@ -60,22 +65,63 @@ def _build_signed_url(blob, expiration=timedelta(hours=24), method="GET"):
 
     return blob.generate_signed_url(**extra_kwargs), "IAM"
 
-def _get_storage_client():
+def _credenciales_vigentes():
     """
-    Crea el cliente de GCS. Si hay ruta de credenciales (local), la usa.
-    En Cloud Run, bastan las credenciales por defecto de la Service Account.
+    Credenciales del cliente compartido con el token vigente. Solo se refresca cuando venció,
+    con un Request() propio y bajo lock: un hilo refresca y el resto reutiliza el token.
     """
-    try:
-        if GOOGLE_CRED_PATH and os.path.isfile(GOOGLE_CRED_PATH):
-            creds = service_account.Credentials.from_service_account_file(GOOGLE_CRED_PATH)
-            return storage.Client(credentials=creds)
-        return storage.Client()  # Usar credenciales predeterminadas en Cloud Run
-    except Exception as e:
-        audit_logger.log_error(
-            error_type="GCS_CLIENT_ERROR",
-            message=f"Error creando cliente de GCS: {str(e)}"
-        )
-        raise
+    _get_storage_client()
+    creds = _storage_credentials
+    if not creds.valid:
+        with _credentials_refresh_lock:
+            if not creds.valid:
+                try:
+                    creds.refresh(Request())
+                except Exception as e:
+                    logger.warning(f"[SIGNED_URL] No se pudo refrescar token ADC: {e}")
+    return creds
+
+def _crear_storage_client():
+    """
+    Crea el cliente de GCS y retorna (cliente, credenciales). Si hay ruta de credenciales
+    (local), la usa. En Cloud Run, bastan las credenciales por defecto de la Service Account.
+    El transporte es una AuthorizedSession con un pool de GCS_HTTP_POOL_SIZE conexiones,
+    así los hilos del worker reutilizan las sesiones TLS en vez de negociarlas por llamada.
+    """
+    if GOOGLE_CRED_PATH and os.path.isfile(GOOGLE_CRED_PATH):
+        creds = service_account.Credentials.from_service_account_file(GOOGLE_CRED_PATH, scopes=storage.Client.SCOPE)
+        project = creds.project_id
+    else:
+        creds, project = auth_default(scopes=storage.Client.SCOPE)  # Credenciales predeterminadas en Cloud Run
+
+    session = AuthorizedSession(creds)
+    adapter = HTTPAdapter(pool_connections=GCS_HTTP_POOL_SIZE, pool_maxsize=GCS_HTTP_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    kwargs = {"credentials": creds, "_http": session}
+    if project:
+        kwargs["project"] = project
+    return storage.Client(**kwargs), creds
+
+def _get_storage_client():
+    """Cliente de GCS del proceso (singleton thread-safe, compartido por todos los hilos)."""
+    global _storage_client, _storage_credentials
+    if _storage_client is None:
+        with _storage_client_lock:
+            if _storage_client is None:
+                try:
+                    cliente, _storage_credentials = _crear_storage_client()
+                    # Se publica último: quien vea el cliente ya ve sus credenciales
+                    _storage_client = cliente
+                    logger.info(f"[GCS] Cliente compartido creado (pool HTTP={GCS_HTTP_POOL_SIZE})")
+                except Exception as e:
+                    audit_logger.log_error(
+                        error_type="GCS_CLIENT_ERROR",
+                        message=f"Error creando cliente de GCS: {str(e)}"
+                    )
+                    raise
+    return _storage_client
 
 def _get_bucket():
     if not BUCKET_NAME:
@@ -373,7 +419,6 @@ def _rehydrate_from_gcs(videos_list, id_counter, prefix="uploads/"):
     try:
         logger.info(f"[REHYDRATE] Iniciando rehidratación de videos desde bucket '{BUCKET_NAME}', prefijo='{prefix}'")
 
-        client = _get_storage_client()
         bucket = _get_bucket()
 
         blobs = bucket.list_blobs(prefix=prefix)
@@ -422,6 +467,37 @@ def _rehydrate_from_gcs(videos_list, id_counter, prefix="uploads/"):
         )
         raise
 
+def obtener_url_lectura_gcs_uri(gcs_uri: str, minutos: int = 15) -> str:
+    """
+    URL firmada GET de corta duración para un gs://bucket/objeto.
+    Pensada para lectores que hacen peticiones por rangos (p. ej. ffmpeg vía cv2),
+    de modo que solo se transfieren los bytes que realmente se leen.
+    """
+    bucket_name, object_name = gcs_uri.replace("gs://", "").split("/", 1)
+    blob = _get_storage_client().bucket(bucket_name).blob(object_name)
+    url, _ = _build_signed_url(blob, expiration=timedelta(minutes=minutos), method="GET")
+    return url
+
+def obtener_hash_contenido(object_name: str):
+    """
+    Devuelve un identificador del contenido del objeto a partir de la metadata de GCS
+    (sin descargar el archivo): "md5:<b64>" o, para objetos compuestos sin md5,
+    "crc32c:<b64>:<size>". Retorna None si el objeto no existe o no trae hashes.
+    """
+    try:
+        blob = _get_bucket().get_blob(object_name)
+        if not blob:
+            logger.warning(f"[HASH] '{object_name}' no existe en '{BUCKET_NAME}'")
+            return None
+        if blob.md5_hash:
+            return f"md5:{blob.md5_hash}"
+        if blob.crc32c:
+            return f"crc32c:{blob.crc32c}:{blob.size}"
+        return None
+    except Exception as e:
+        logger.warning(f"[HASH] No se pudo obtener hash de '{object_name}': {e}")
+        return None
+
 def obtener_todos_los_videos(prefix="uploads/"):
     """
     Obtiene todos los videos del bucket de GCS y los retorna como lista.
@@ -2,6 +2,7 @@ import os
 import json
 import re
 import mimetypes
+from typing import Optional
 from vertexai import init
 from vertexai.preview.generative_models import GenerativeModel, Part
 from app.services.core.logging_service import audit_logger
@@ -50,10 +51,26 @@ def _guess_video_mime(gcs_uri: str) -> str:
 
     return mime or "video/mp4"
 
-def analizar_video_gemini(gcs_uri: str) -> dict:
+def _generar_con_timeout(model, contenido, timeout_sec: Optional[float]):
+    """
+    generate_content con deadline de la llamada RPC. El SDK no expone timeout,
+    así que se arma el request con el propio modelo y se llama al cliente gapic.
+    """
+    if not timeout_sec:
+        return model.generate_content(contenido)
+    try:
+        request = model._prepare_request(contents=contenido)
+        cliente = model._prediction_client
+    except AttributeError:
+        # Versión del SDK sin esos internos: sin deadline propio
+        return model.generate_content(contenido)
+    return model._parse_response(cliente.generate_content(request=request, timeout=timeout_sec))
+
+def analizar_video_gemini(gcs_uri: str, timeout_sec: Optional[float] = None) -> dict:
     """
     Analiza un video en GCS usando Gemini (modelo multimodal).
     Retorna un dict estructurado compatible con tu pipeline.
+    timeout_sec: deadline de la llamada a Vertex (None => el del SDK).
     """
     try:
         init(project=PROJECT, location=LOCATION)
@@ -219,7 +236,7 @@ def analizar_video_gemini(gcs_uri: str) -> dict:
         - "resumen": "sin hallazgos"
         """
 
-        response = model.generate_content([video_part, prompt])
+        response = _generar_con_timeout(model, [video_part, prompt], timeout_sec)
         texto = (response.text or "").strip()
         data = _extract_json(texto)
 
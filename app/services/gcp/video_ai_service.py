@@ -2,12 +2,19 @@
 import os
 import time
 import logging
-from typing import Dict, List, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import Dict, List, Optional, Tuple
+from flask import current_app, has_app_context
 from google.cloud import videointelligence_v1 as vi
 from google.oauth2 import service_account
 from app.services.core.logging_service import audit_logger
-from app.services.i18n.translation_service import traducir_etiquetas, traducir_contenido_explicito, traducir_logos
-from app.services.moderation.text_detection_service import analizar_texto_en_video
+from app.services.i18n.translation_service import (
+    traducir_etiquetas, traducir_contenido_explicito, traducir_logos, TRADUCCION_DIFERIDA, TRADUCCION_HABILITADA,
+)
+from app.services.moderation.text_detection_service import (
+    analizar_texto_en_video, analizar_texto_desde_anotaciones, OCR_FRAME_SELECTION, OCR_BACKEND,
+)
 
 # Configurar logging
 logger = logging.getLogger(__name__)
@@ -15,6 +22,18 @@ logger = logging.getLogger(__name__)
 _GOOGLE_CRED_PATH = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
 USE_VERTEX_AI = os.getenv("USE_VERTEX_AI", "false").lower() in ("true", "1", "yes")
 
+# Fan-out: ramas Gemini / Video Intelligence / OCR en paralelo, cada una con su timeout
+AI_FANOUT_ENABLED = os.getenv("AI_FANOUT_ENABLED", "true").lower() in ("true", "1", "yes")
+GEMINI_TIMEOUT_SEC = float(os.getenv("GEMINI_TIMEOUT_SEC", "90"))
+OCR_TIMEOUT_SEC = float(os.getenv("OCR_TIMEOUT_SEC", "90"))
+VI_TIMEOUT_MARGIN_SEC = 5.0  # VI ya aplica timeout_sec a operation.result(); margen para no cortar antes
+# Ramas vencidas que siguen corriendo en segundo plano (cada una con su hilo, app context
+# y quizá un video en /tmp). Con este tope alcanzado, Gemini/OCR no se lanzan.
+AI_MAX_RAMAS_HUERFANAS = int(os.getenv("AI_MAX_RAMAS_HUERFANAS", "4"))
+
+_ramas_huerfanas = {"en_curso": 0}
+_ramas_huerfanas_lock = threading.Lock()
+
 def _get_client():
     try:
         if _GOOGLE_CRED_PATH and os.path.isfile(_GOOGLE_CRED_PATH):
@@ -40,12 +59,19 @@ def _client():
         _video_client = _get_client()
     return _video_client
 
-def analizar_video_completo(gcs_uri: str, timeout_sec: int = 600) -> Dict:
+def analizar_video_completo(gcs_uri: str, timeout_sec: int = 600, annotation_result=None,
+                            duracion_seg: Optional[float] = None, locale: Optional[str] = None) -> Dict:
     """
     Analiza un video en GCS unificando Gemini (Vertex AI) y Video Intelligence.
+    Las ramas remotas (Gemini, Video Intelligence y OCR) se ejecutan en paralelo
+    cuando AI_FANOUT_ENABLED=true, cada una con su propio timeout.
+    Si se pasa annotation_result (modo submit/resume), no se vuelve a llamar a Video Intelligence.
+    duracion_seg (Video.duracion) fija el presupuesto de frames del OCR.
+    locale (el del país del club) elige el lexicón local con que se modera el texto.
     Retorna un dict consolidado con:
       - etiquetas, objetos, logos, texto, alertas visuales
       - puntaje_confianza, estado_visual, estado_texto, veredicto_ia
+      - tiempos_ramas (segundos por rama remota)
     """
     start_time = time.time()
     logger.info(f"[AI] Iniciando análisis combinado para: {gcs_uri}")
@@ -53,141 +79,26 @@ def analizar_video_completo(gcs_uri: str, timeout_sec: int = 600) -> Dict:
     use_vertex = os.getenv("USE_VERTEX_AI", "false").lower() in ("true", "1", "yes")
 
     # === BLOQUE 1: Inicialización de variables ===
-    gemini_resultado = {}
-    objetos_gemini: List[Dict] = []
-    texto_gemini: str = ""
-    alertas_gemini: List[str] = []
-    evidencia_gemini: List[Dict] = []
-
     alertas_visual: List[str] = []
-    alertas_set = set()  # SIEMPRE definido (evita NameError cuando use_vertex=false)
-
-    # === BLOQUE 2: Análisis con Gemini (Vertex AI) ===
-    if use_vertex:
-        try:
-            from app.services.gcp.vertex_ai_video_service import analizar_video_gemini
-            import json, re
-            logger.info("[GEMINI] Ejecutando análisis Vertex AI...")
-            gemini_resultado = analizar_video_gemini(gcs_uri)
-            raw = gemini_resultado.get("raw_text", "")
-            if raw:
-                clean = re.sub(r"```(?:json)?", "", raw, flags=re.IGNORECASE).strip()
-                try:
-                    gemini_resultado = json.loads(clean)
-                except Exception:
-                    logger.warning("[GEMINI] No se pudo parsear JSON limpio; se usará el dict original si trae campos.")
-
-            objetos_gemini = gemini_resultado.get("objetos_detectados", []) or []
-            evidencia_gemini = gemini_resultado.get("evidencia", []) or []
-
-            texto_val = gemini_resultado.get("texto_detectado", [])
-            if isinstance(texto_val, list):
-                texto_gemini = ", ".join([str(x) for x in texto_val if str(x).strip()])
-            else:
-                texto_gemini = str(texto_val or "").strip()
-
-            alertas_gemini = gemini_resultado.get("alertas", []) or []
-
-            # Normalizar alertas Gemini (SIN conducta_obscena: todo va a gesto_obsceno)
-            for a in alertas_gemini:
-                x = str(a).strip().lower().replace(" ", "_")
-                if x in ("arma", "arma_de_fuego", "pistola", "gun", "firearm", "weapon_firearm"):
-                    alertas_set.add("arma_fuego")
-                elif x in ("arma_blanca", "cuchillo", "knife", "blade", "navaja", "machete", "weapon_knife"):
-                    alertas_set.add("arma_blanca")
-                elif x in ("gesto_obsceno", "dedo_medio", "middle_finger", "fuck_you"):
-                    alertas_set.add("gesto_obsceno")
-                elif x in ("violencia", "sangre", "blood", "violence", "fight", "aggression"):
-                    alertas_set.add("violencia")
-                elif x in ("amenaza", "threat", "intimidacion", "intimidation", "neck_cut", "slit_throat"):
-                    alertas_set.add("amenaza")
-
-            # Normalizar evidencia Gemini (SIN conducta_obscena: todo va a gesto_obsceno)
-            for ev in evidencia_gemini:
-                try:
-                    t = str(ev.get("tipo", "")).strip().lower().replace(" ", "_")
-                    if t in ("arma", "arma_de_fuego", "pistola", "gun", "firearm"):
-                        ev["tipo"] = "arma_fuego"
-                    elif t in ("arma_blanca", "cuchillo", "knife", "blade", "navaja", "machete"):
-                        ev["tipo"] = "arma_blanca"
-                    elif t in ("gesto_obsceno", "dedo_medio", "middle_finger", "fuck_you"):
-                        ev["tipo"] = "gesto_obsceno"
-                    elif t in ("conducta_obscena", "genital_grab", "sexual_gesture"):
-                        ev["tipo"] = "gesto_obsceno"
-                    elif t in ("violencia", "blood", "fight", "aggression"):
-                        ev["tipo"] = "violencia"
-                    elif t in ("amenaza", "threat", "intimidation", "neck_cut", "slit_throat"):
-                        ev["tipo"] = "amenaza"
-                except Exception:
-                    continue
 
-                hay_cuchillo = any(
-                    any(k in str(o.get("notas", "")).lower() for k in ("cuchillo", "knife", "blade", "cubierto", "cutlery", "utensil", "table knife", "butter knife", "steak knife"))
-                    for o in (objetos_gemini or [])
-                ) or any(
-                    any(k in str(ev.get("descripcion", "")).lower() for k in ("cuchillo", "knife", "blade", "cubierto", "cutlery", "utensil", "table knife", "cuello", "degoll", "corte", "slit", "throat", "neck"))
-                    for ev in (evidencia_gemini or [])
-                )
+    # === BLOQUES 2, 3 y 6: Gemini + Video Intelligence + OCR (ramas remotas) ===
+    ramas = _ejecutar_ramas_remotas(gcs_uri, timeout_sec, use_vertex, annotation_result, duracion_seg, locale)
 
-                if hay_cuchillo:
-                    alertas_set.add("arma_blanca")
+    gemini = ramas["gemini"]
+    objetos_gemini: List[Dict] = gemini["objetos"]
+    texto_gemini: str = gemini["texto"]
+    evidencia_gemini: List[Dict] = gemini["evidencia"]
+    alertas_set = gemini["alertas"]  # SIEMPRE definido (evita NameError cuando use_vertex=false)
 
-            logger.info(
-                f"[GEMINI] {len(objetos_gemini)} objetos | alertas={sorted(alertas_set)} | evidencia={len(evidencia_gemini)}"
-            )
+    annotation_result = ramas["video_intelligence"]
+    etiquetas_en = _procesar_etiquetas(annotation_result)
+    contenido_explicito_en = _procesar_contenido_explicito(annotation_result)
+    logotipos_obj_en = _procesar_logotipos(annotation_result)
+    logotipos_en = ", ".join([item["logo"] for item in logotipos_obj_en])
+    objetos_detectados_vi = _procesar_objetos(annotation_result)
+    logger.info(f"[VI] Objetos detectados: {len(objetos_detectados_vi)}")
 
-        except Exception as e:
-            logger.warning(f"[GEMINI] Error: {e}. Continuando con Video Intelligence.")
-            gemini_resultado = {}
-            objetos_gemini = []
-            texto_gemini = ""
-            evidencia_gemini = []
-            alertas_set = set()
-
-    # === BLOQUE 3: Análisis con Video Intelligence ===
-    try:
-        features = [
-            vi.Feature.LABEL_DETECTION,
-            vi.Feature.EXPLICIT_CONTENT_DETECTION,
-            vi.Feature.LOGO_RECOGNITION,
-            vi.Feature.OBJECT_TRACKING,
-            vi.Feature.SHOT_CHANGE_DETECTION,
-        ]
-        video_context = vi.VideoContext(
-            label_detection_config=vi.LabelDetectionConfig(
-                label_detection_mode=vi.LabelDetectionMode.SHOT_AND_FRAME_MODE
-            )
-        )
-
-        operation = _client().annotate_video(
-            request={"input_uri": gcs_uri, "features": features, "video_context": video_context}
-        )
-        result = operation.result(timeout=timeout_sec)
-        annotation_result = result.annotation_results[0]
-
-        etiquetas_en = _procesar_etiquetas(annotation_result)
-        contenido_explicito_en = _procesar_contenido_explicito(annotation_result)
-        logotipos_obj_en = _procesar_logotipos(annotation_result)
-        logotipos_en = ", ".join([item["logo"] for item in logotipos_obj_en])
-        objetos_detectados_vi = _procesar_objetos(annotation_result)
-        logger.info(f"[VI] Objetos detectados: {len(objetos_detectados_vi)}")
-
-    except Exception as e:
-        msg = str(e)
-
-        # Clasificar cuota/rate-limit como transitorio (para retry)
-        if (
-            "429" in msg
-            or "RATE_LIMIT_EXCEEDED" in msg
-            or "RESOURCE_EXHAUSTED" in msg
-            or "Quota exceeded" in msg
-            or "quota" in msg.lower()
-        ):
-            logger.error(f"[VI] Quota/rate-limit (transitorio): {e}")
-            raise TransientQuotaError(msg) from e
-        
-        logger.error(f"[VI] Error analizando video con Video Intelligence: {e}")
-        raise
+    resultados_texto = ramas["ocr"]
 
     # === BLOQUE 4: Fusionar Gemini + VideoIntelligence ===
     objetos_detectados = objetos_detectados_vi or []
@@ -254,25 +165,19 @@ def analizar_video_completo(gcs_uri: str, timeout_sec: int = 600) -> Dict:
     logger.info(f"[MERGE] Total objetos fusionados={len(objetos_detectados)} | alertas_visual={alertas_visual}")
 
     # === BLOQUE 5: Traducciones ===
-    try:
-        etiquetas_es = traducir_etiquetas(etiquetas_en, "es")
-        contenido_explicito_es = traducir_contenido_explicito(contenido_explicito_en, "es")
-        logotipos_es = traducir_logos(logotipos_en, "es")
-    except Exception as e:
-        logger.warning(f"[TRAD] Error traduciendo: {e}")
+    # El veredicto no depende del texto en español: con TRADUCCION_DIFERIDA se guardan los
+    # originales y la traducción la completa /tasks/translate-pending (encolada al guardar el veredicto)
+    traduccion_pendiente = TRADUCCION_DIFERIDA and TRADUCCION_HABILITADA and bool(etiquetas_en or logotipos_en)
+    if traduccion_pendiente:
         etiquetas_es, contenido_explicito_es, logotipos_es = etiquetas_en, contenido_explicito_en, logotipos_en
-
-    # === BLOQUE 6: OCR / texto en video ===
-    try:
-        resultados_texto = analizar_texto_en_video(gcs_uri, video_id=None)
-    except Exception as e:
-        logger.warning(f"[OCR] Error en detección de texto: {e}")
-        resultados_texto = {
-            "texto_detectado": "",
-            "palabras_problematicas": "",
-            "nivel_problema": "error",
-            "frames_analizados": 0,
-        }
+    else:
+        try:
+            etiquetas_es = traducir_etiquetas(etiquetas_en, "es")
+            contenido_explicito_es = traducir_contenido_explicito(contenido_explicito_en, "es")
+            logotipos_es = traducir_logos(logotipos_en, "es")
+        except Exception as e:
+            logger.warning(f"[TRAD] Error traduciendo: {e}")
+            etiquetas_es, contenido_explicito_es, logotipos_es = etiquetas_en, contenido_explicito_en, logotipos_en
 
     texto_final = resultados_texto.get("texto_detectado", "") or ""
     if texto_gemini:
@@ -342,16 +247,25 @@ def analizar_video_completo(gcs_uri: str, timeout_sec: int = 600) -> Dict:
         "estado_texto": estado_texto,
         "veredicto_ia": veredicto_ia,
         "tiempo_procesamiento": round(tiempo_total, 2),
+        "tiempos_ramas": ramas["tiempos"],
+        "ramas_timeout": ramas["timeouts"],
         "texto_detectado": texto_final,
         "palabras_problematicas": palabras_problematicas,
         "nivel_problema_texto": nivel_problema,
         "frames_texto_analizados": resultados_texto.get("frames_analizados", 0),
+        "backend_ocr": resultados_texto.get("backend_ocr", OCR_BACKEND),
+        "locale_moderacion": locale,
+        "llamadas_api_ocr": resultados_texto.get("llamadas_api_ocr", 0),
+        "frames_duplicados_omitidos": resultados_texto.get("frames_duplicados_omitidos", 0),
+        "frames_texto_solicitados": resultados_texto.get("frames_solicitados", 0),
+        "frames_texto_enviados_ocr": resultados_texto.get("frames_enviados_ocr", 0),
         "fuente_analisis": "Gemini + VideoIntelligence" if use_vertex else "VideoIntelligence",
         "alertas_gemini_normalizadas": sorted(list(alertas_set)),
         "evidencia_gemini": evidencia_gemini,
         "etiquetas_original": etiquetas_en,
         "contenido_explicito_original": contenido_explicito_en,
         "logotipos_original": logotipos_en,
+        "traduccion_pendiente": traduccion_pendiente,
     }
 
     logger.info(
@@ -360,6 +274,402 @@ def analizar_video_completo(gcs_uri: str, timeout_sec: int = 600) -> Dict:
     )
     return datos_procesados
 
+def _analizar_rama_gemini(gcs_uri: str, timeout_sec: Optional[float] = None) -> Dict:
+    """
+    BLOQUE 2: Análisis con Gemini (Vertex AI).
+    Retorna {"objetos", "texto", "evidencia", "alertas"}; ante error devuelve la rama vacía
+    para que el pipeline continúe solo con Video Intelligence.
+    timeout_sec se pasa como deadline de la llamada a Vertex.
+    """
+    objetos_gemini: List[Dict] = []
+    texto_gemini: str = ""
+    evidencia_gemini: List[Dict] = []
+    alertas_set = set()
+
+    try:
+        from app.services.gcp.vertex_ai_video_service import analizar_video_gemini
+        import json, re
+        logger.info("[GEMINI] Ejecutando análisis Vertex AI...")
+        gemini_resultado = analizar_video_gemini(gcs_uri, timeout_sec=timeout_sec)
+        raw = gemini_resultado.get("raw_text", "")
+        if raw:
+            clean = re.sub(r"```(?:json)?", "", raw, flags=re.IGNORECASE).strip()
+            try:
+                gemini_resultado = json.loads(clean)
+            except Exception:
+                logger.warning("[GEMINI] No se pudo parsear JSON limpio; se usará el dict original si trae campos.")
+
+        objetos_gemini = gemini_resultado.get("objetos_detectados", []) or []
+        evidencia_gemini = gemini_resultado.get("evidencia", []) or []
+
+        texto_val = gemini_resultado.get("texto_detectado", [])
+        if isinstance(texto_val, list):
+            texto_gemini = ", ".join([str(x) for x in texto_val if str(x).strip()])
+        else:
+            texto_gemini = str(texto_val or "").strip()
+
+        alertas_gemini = gemini_resultado.get("alertas", []) or []
+
+        # Normalizar alertas Gemini (SIN conducta_obscena: todo va a gesto_obsceno)
+        for a in alertas_gemini:
+            x = str(a).strip().lower().replace(" ", "_")
+            if x in ("arma", "arma_de_fuego", "pistola", "gun", "firearm", "weapon_firearm"):
+                alertas_set.add("arma_fuego")
+            elif x in ("arma_blanca", "cuchillo", "knife", "blade", "navaja", "machete", "weapon_knife"):
+                alertas_set.add("arma_blanca")
+            elif x in ("gesto_obsceno", "dedo_medio", "middle_finger", "fuck_you"):
+                alertas_set.add("gesto_obsceno")
+            elif x in ("violencia", "sangre", "blood", "violence", "fight", "aggression"):
+                alertas_set.add("violencia")
+            elif x in ("amenaza", "threat", "intimidacion", "intimidation", "neck_cut", "slit_throat"):
+                alertas_set.add("amenaza")
+
+        # Normalizar evidencia Gemini (SIN conducta_obscena: todo va a gesto_obsceno)
+        for ev in evidencia_gemini:
+            try:
+                t = str(ev.get("tipo", "")).strip().lower().replace(" ", "_")
+                if t in ("arma", "arma_de_fuego", "pistola", "gun", "firearm"):
+                    ev["tipo"] = "arma_fuego"
+                elif t in ("arma_blanca", "cuchillo", "knife", "blade", "navaja", "machete"):
+                    ev["tipo"] = "arma_blanca"
+                elif t in ("gesto_obsceno", "dedo_medio", "middle_finger", "fuck_you"):
+                    ev["tipo"] = "gesto_obsceno"
+                elif t in ("conducta_obscena", "genital_grab", "sexual_gesture"):
+                    ev["tipo"] = "gesto_obsceno"
+                elif t in ("violencia", "blood", "fight", "aggression"):
+                    ev["tipo"] = "violencia"
+                elif t in ("amenaza", "threat", "intimidation", "neck_cut", "slit_throat"):
+                    ev["tipo"] = "amenaza"
+            except Exception:
+                continue
+
+            hay_cuchillo = any(
+                any(k in str(o.get("notas", "")).lower() for k in ("cuchillo", "knife", "blade", "cubierto", "cutlery", "utensil", "table knife", "butter knife", "steak knife"))
+                for o in (objetos_gemini or [])
+            ) or any(
+                any(k in str(ev.get("descripcion", "")).lower() for k in ("cuchillo", "knife", "blade", "cubierto", "cutlery", "utensil", "table knife", "cuello", "degoll", "corte", "slit", "throat", "neck"))
+                for ev in (evidencia_gemini or [])
+            )
+
+            if hay_cuchillo:
+                alertas_set.add("arma_blanca")
+
+        logger.info(
+            f"[GEMINI] {len(objetos_gemini)} objetos | alertas={sorted(alertas_set)} | evidencia={len(evidencia_gemini)}"
+        )
+
+    except Exception as e:
+        logger.warning(f"[GEMINI] Error: {e}. Continuando con Video Intelligence.")
+        return _rama_gemini_vacia()
+
+    return {
+        "objetos": objetos_gemini,
+        "texto": texto_gemini,
+        "evidencia": evidencia_gemini,
+        "alertas": alertas_set,
+    }
+
+def _rama_gemini_vacia() -> Dict:
+    return {"objetos": [], "texto": "", "evidencia": [], "alertas": set()}
+
+def _request_annotate_video(gcs_uri: str) -> Dict:
+    """Request de annotate_video compartido por el modo bloqueante y el modo submit/resume."""
+    features = [
+        vi.Feature.LABEL_DETECTION,
+        vi.Feature.EXPLICIT_CONTENT_DETECTION,
+        vi.Feature.LOGO_RECOGNITION,
+        vi.Feature.OBJECT_TRACKING,
+        vi.Feature.SHOT_CHANGE_DETECTION,
+    ]
+    video_context = vi.VideoContext(
+        label_detection_config=vi.LabelDetectionConfig(
+            label_detection_mode=vi.LabelDetectionMode.SHOT_AND_FRAME_MODE
+        )
+    )
+    # Backend OCR de Video Intelligence: el texto viene en la misma operación
+    if OCR_BACKEND == "video_intelligence":
+        features.append(vi.Feature.TEXT_DETECTION)
+        video_context.text_detection_config = vi.TextDetectionConfig(language_hints=["es", "en"])
+    return {"input_uri": gcs_uri, "features": features, "video_context": video_context}
+
+def _es_error_cuota(msg: str) -> bool:
+    return (
+        "429" in msg
+        or "RATE_LIMIT_EXCEEDED" in msg
+        or "RESOURCE_EXHAUSTED" in msg
+        or "Quota exceeded" in msg
+        or "quota" in msg.lower()
+    )
+
+def _analizar_rama_video_intelligence(gcs_uri: str, timeout_sec: int):
+    """
+    BLOQUE 3: Análisis con Video Intelligence.
+    Retorna el annotation_result crudo. Cuota/rate-limit se eleva como TransientQuotaError.
+    """
+    try:
+        operation = _client().annotate_video(request=_request_annotate_video(gcs_uri))
+        result = operation.result(timeout=timeout_sec)
+        return result.annotation_results[0]
+
+    except Exception as e:
+        msg = str(e)
+
+        # Clasificar cuota/rate-limit como transitorio (para retry)
+        if _es_error_cuota(msg):
+            logger.error(f"[VI] Quota/rate-limit (transitorio): {e}")
+            raise TransientQuotaError(msg) from e
+        
+        logger.error(f"[VI] Error analizando video con Video Intelligence: {e}")
+        raise
+
+def iniciar_anotacion_video(gcs_uri: str) -> str:
+    """
+    Fase 1 del modo submit/resume: envía annotate_video y retorna el nombre
+    de la operación de larga duración SIN esperar el resultado.
+    """
+    try:
+        operation = _client().annotate_video(request=_request_annotate_video(gcs_uri))
+        operation_name = operation.operation.name
+        logger.info(f"[VI] Operación enviada: {operation_name} ({gcs_uri})")
+        return operation_name
+    except Exception as e:
+        msg = str(e)
+        if _es_error_cuota(msg):
+            logger.error(f"[VI] Quota/rate-limit al enviar operación (transitorio): {e}")
+            raise TransientQuotaError(msg) from e
+        logger.error(f"[VI] Error enviando operación de Video Intelligence: {e}")
+        raise
+
+def consultar_anotacion_video(operation_name: str):
+    """
+    Fase 2 del modo submit/resume: consulta (sin bloquear) una operación enviada.
+    Retorna el annotation_result si terminó, o None si aún está en curso.
+    Lanza excepción si la operación terminó con error.
+    """
+    try:
+        op = _client().transport.operations_client.get_operation(operation_name)
+    except Exception as e:
+        msg = str(e)
+        if _es_error_cuota(msg):
+            raise TransientQuotaError(msg) from e
+        raise
+
+    if not op.done:
+        return None
+
+    if op.HasField("error") and op.error.code:
+        raise RuntimeError(f"Operación de Video Intelligence falló: {op.error.message}")
+
+    response = vi.AnnotateVideoResponse.deserialize(op.response.value)
+    return response.annotation_results[0]
+
+def _analizar_rama_ocr(gcs_uri: str, tomas: Optional[List[Tuple[float, float]]] = None,
+                       duracion_seg: Optional[float] = None, locale: Optional[str] = None,
+                       timeout_sec: Optional[float] = None) -> Dict:
+    """
+    BLOQUE 6: OCR / texto en video. Nunca lanza: ante error devuelve nivel_problema='error'.
+    timeout_sec acota descarga, lectura de frames y llamadas a Vision.
+    """
+    try:
+        return analizar_texto_en_video(
+            gcs_uri, video_id=None, tomas=tomas, duracion_seg=duracion_seg, locale=locale,
+            timeout_sec=timeout_sec,
+        )
+    except Exception as e:
+        logger.warning(f"[OCR] Error en detección de texto: {e}")
+        return _rama_ocr_error()
+
+def _analizar_rama_ocr_desde_vi(annotation_result, locale: Optional[str] = None) -> Dict:
+    """
+    BLOQUE 6 con OCR_BACKEND=video_intelligence: el texto sale de los text_annotations
+    de la misma operación de VI. Nunca lanza.
+    """
+    try:
+        return analizar_texto_desde_anotaciones(
+            getattr(annotation_result, "text_annotations", None), locale=locale
+        )
+    except Exception as e:
+        logger.warning(f"[OCR] Error procesando texto de Video Intelligence: {e}")
+        return _rama_ocr_error()
+
+def _rama_ocr_error() -> Dict:
+    return {
+        "texto_detectado": "",
+        "palabras_problematicas": "",
+        "nivel_problema": "error",
+        "frames_analizados": 0,
+    }
+
+def _con_contexto_app(fn):
+    """
+    Envuelve fn para ejecutarla en un hilo con su propio app context de Flask
+    (y por tanto su propia sesión de BD), si el llamador tenía uno.
+    """
+    if not has_app_context():
+        return fn
+    app = current_app._get_current_object()
+
+    def _wrapper(*args, **kwargs):
+        with app.app_context():
+            return fn(*args, **kwargs)
+    return _wrapper
+
+def _registrar_rama_huerfana(futuro):
+    """Cuenta una rama vencida hasta que su hilo termine de verdad."""
+    contador = _ramas_huerfanas
+    with _ramas_huerfanas_lock:
+        contador["en_curso"] += 1
+
+    def _liberar(_futuro):
+        with _ramas_huerfanas_lock:
+            contador["en_curso"] -= 1
+    futuro.add_done_callback(_liberar)
+
+def _hay_cupo_ramas() -> bool:
+    with _ramas_huerfanas_lock:
+        return _ramas_huerfanas["en_curso"] < AI_MAX_RAMAS_HUERFANAS
+
+def _ejecutar_ramas_remotas(gcs_uri: str, timeout_sec: int, use_vertex: bool, annotation_result=None,
+                            duracion_seg: Optional[float] = None, locale: Optional[str] = None) -> Dict:
+    """
+    Ejecuta las ramas Gemini, Video Intelligence y OCR.
+    - Modo fan-out (AI_FANOUT_ENABLED=true): las tres en paralelo, cada una con su timeout.
+      Gemini y OCR que no terminan a tiempo se reemplazan por su resultado vacío/error;
+      Video Intelligence es obligatoria, por lo que su timeout propaga la excepción.
+    - Modo secuencial: mismo orden que antes (Gemini -> VI -> OCR).
+    - Con annotation_result ya disponible (submit/resume), la rama VI no se ejecuta.
+    - Con OCR_BACKEND=video_intelligence no hay rama OCR propia: el texto se modera
+      a partir del resultado de VI cuando esta termina.
+    - Gemini y OCR reciben su timeout como deadline de las llamadas a los clientes; si aun así
+      quedan AI_MAX_RAMAS_HUERFANAS ramas vencidas corriendo, no se lanzan y cuentan como timeout.
+    Retorna {"gemini", "video_intelligence", "ocr", "tiempos", "timeouts"}.
+    """
+    tiempos: Dict[str, float] = {}
+    timeouts: List[str] = []
+
+    if annotation_result is not None:
+        def _rama_vi(*_args):
+            return annotation_result
+    else:
+        _rama_vi = _analizar_rama_video_intelligence
+
+    # OCR de VI: el texto llega en el mismo annotation_result, no hay rama OCR aparte
+    ocr_desde_vi = OCR_BACKEND == "video_intelligence"
+    # Con selección por tomas, el OCR necesita las tomas de VI antes de extraer frames
+    ocr_por_tomas = OCR_FRAME_SELECTION == "tomas" and not ocr_desde_vi
+
+    def _cronometrar(nombre, fn, *args):
+        t0 = time.time()
+        try:
+            return fn(*args)
+        finally:
+            tiempos[nombre] = round(time.time() - t0, 2)
+
+    if not AI_FANOUT_ENABLED:
+        gemini = (
+            _cronometrar("gemini", _analizar_rama_gemini, gcs_uri, GEMINI_TIMEOUT_SEC)
+            if use_vertex else _rama_gemini_vacia()
+        )
+        annotation_result = _cronometrar("video_intelligence", _rama_vi, gcs_uri, timeout_sec)
+        if ocr_desde_vi:
+            ocr = _cronometrar("ocr", _analizar_rama_ocr_desde_vi, annotation_result, locale)
+        else:
+            tomas = _procesar_tomas(annotation_result) if ocr_por_tomas else None
+            ocr = _cronometrar("ocr", _analizar_rama_ocr, gcs_uri, tomas, duracion_seg, locale, OCR_TIMEOUT_SEC)
+        return {"gemini": gemini, "video_intelligence": annotation_result, "ocr": ocr,
+                "tiempos": tiempos, "timeouts": timeouts}
+
+    # Con demasiadas ramas vencidas todavía vivas, no sumar más hilos: Gemini/OCR quedan parciales
+    con_cupo = _hay_cupo_ramas()
+    if not con_cupo:
+        logger.warning(f"[FANOUT] {AI_MAX_RAMAS_HUERFANAS} ramas vencidas siguen en curso; se omiten Gemini y OCR")
+
+    executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="ai-rama")
+    inicio = time.time()
+    try:
+        fut_vi = executor.submit(
+            _con_contexto_app(_cronometrar), "video_intelligence",
+            _rama_vi, gcs_uri, timeout_sec
+        )
+        if ocr_desde_vi or not con_cupo:
+            fut_ocr = None
+        elif ocr_por_tomas:
+            def _ocr_tras_vi():
+                try:
+                    tomas = _procesar_tomas(fut_vi.result())
+                except Exception:
+                    return _rama_ocr_error()  # el error de VI se propaga desde el hilo principal
+                return _analizar_rama_ocr(gcs_uri, tomas, duracion_seg, locale, OCR_TIMEOUT_SEC)
+            fut_ocr = executor.submit(_con_contexto_app(_cronometrar), "ocr", _ocr_tras_vi)
+        else:
+            fut_ocr = executor.submit(
+                _con_contexto_app(_cronometrar), "ocr", _analizar_rama_ocr,
+                gcs_uri, None, duracion_seg, locale, OCR_TIMEOUT_SEC
+            )
+        fut_gemini = (
+            executor.submit(_con_contexto_app(_cronometrar), "gemini", _analizar_rama_gemini, gcs_uri, GEMINI_TIMEOUT_SEC)
+            if use_vertex and con_cupo else None
+        )
+
+        def _esperar(nombre, futuro, limite, fallback, desde=None):
+            restante = max(0.0, limite - (time.time() - (desde or inicio)))
+            try:
+                return futuro.result(timeout=restante)
+            except FuturesTimeoutError:
+                logger.warning(f"[FANOUT] Rama '{nombre}' superó su timeout de {limite:.0f}s; se usa resultado parcial.")
+                tiempos[nombre] = round(time.time() - inicio, 2)
+                timeouts.append(nombre)
+                _registrar_rama_huerfana(futuro)
+                return fallback()
+
+        def _vi_timeout():
+            raise TimeoutError(f"Video Intelligence no respondió en {timeout_sec}s")
+
+        # VI primero: si falla (cuota, error, timeout) no tiene sentido esperar al resto
+        annotation_result = _esperar("video_intelligence", fut_vi, timeout_sec + VI_TIMEOUT_MARGIN_SEC, _vi_timeout)
+        fin_vi = time.time()
+        if ocr_desde_vi:
+            # Moderar el texto de VI mientras Gemini sigue en curso
+            ocr = _cronometrar("ocr", _analizar_rama_ocr_desde_vi, annotation_result, locale)
+        elif fut_ocr is None:
+            timeouts.append("ocr")
+            ocr = _rama_ocr_error()
+        if fut_gemini:
+            gemini = _esperar("gemini", fut_gemini, GEMINI_TIMEOUT_SEC, _rama_gemini_vacia)
+        else:
+            if use_vertex:
+                timeouts.append("gemini")
+            gemini = _rama_gemini_vacia()
+        # En modo por tomas el OCR arranca cuando termina VI: su timeout corre desde ese momento
+        if fut_ocr is not None:
+            ocr = _esperar("ocr", fut_ocr, OCR_TIMEOUT_SEC, _rama_ocr_error, desde=fin_vi if ocr_por_tomas else None)
+    finally:
+        # No bloquear el hilo del request: las ramas vencidas cortan por el deadline de sus
+        # clientes y mientras tanto cuentan en _ramas_huerfanas
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    logger.info(f"[FANOUT] Tiempos por rama: {tiempos} | timeouts={timeouts}")
+    # Copias: una rama que terminó tarde no debe mutar el resultado ya entregado
+    return {"gemini": gemini, "video_intelligence": annotation_result, "ocr": ocr,
+            "tiempos": dict(tiempos), "timeouts": list(timeouts)}
+
+def _procesar_tomas(annotation_result) -> List[Tuple[float, float]]:
+    """
+    Extrae las tomas de SHOT_CHANGE_DETECTION como lista de (inicio_s, fin_s).
+    """
+    try:
+        tomas = []
+        for shot in getattr(annotation_result, "shot_annotations", []) or []:
+            inicio = _duration_to_seconds(getattr(shot, "start_time_offset", None))
+            fin = _duration_to_seconds(getattr(shot, "end_time_offset", None))
+            if fin > inicio:
+                tomas.append((inicio, fin))
+        logger.info(f"[VI] Tomas detectadas: {len(tomas)}")
+        return tomas
+    except Exception as e:
+        logger.warning(f"[VI] No se pudieron procesar tomas: {e}")
+        return []
+
 def _procesar_etiquetas(annotation_result) -> str:
     """
     Procesa las etiquetas detectadas y las convierte en string separado por comas.
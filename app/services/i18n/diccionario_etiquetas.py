@@ -0,0 +1,119 @@
+# app/services/i18n/diccionario_etiquetas.py
+"""
+Diccionario EN→ES empaquetado para el vocabulario de etiquetas de Video Intelligence.
+
+Las etiquetas salen de un vocabulario fijo de entidades ("person", "crowd", "stadium"...),
+así que la mayoría se resuelve sin red: traducir_etiquetas consulta primero este
+diccionario y solo lo que falta pasa a la cache (LRU + tabla) y a la API.
+
+Regenerar desde la tabla traduccion_cache (desde la raíz del repo):
+    python -m app.services.i18n.diccionario_etiquetas                  # agrega lo nuevo de la cache
+    python -m app.services.i18n.diccionario_etiquetas --min-hits 3     # solo etiquetas que se repiten
+    python -m app.services.i18n.diccionario_etiquetas --reemplazar     # la cache pisa las entradas existentes
+Por defecto las entradas ya presentes (curadas a mano) se conservan.
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DICCIONARIO_ETIQUETAS_PATH = os.getenv(
+    "DICCIONARIO_ETIQUETAS_PATH",
+    os.path.join(os.path.dirname(__file__), "data", "etiquetas_en_es.json"),
+)
+
+_diccionario = {"cargado": False, "valor": None}
+_diccionario_lock = threading.Lock()
+
+
+def _leer(ruta: str) -> Optional[Dict]:
+    if not ruta or not os.path.isfile(ruta):
+        return None
+    with open(ruta, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def obtener_diccionario(idioma_destino: str = "es") -> Dict[str, str]:
+    """{etiqueta en minúsculas: traducción} del asset (se lee una vez). Vacío si no aplica."""
+    if not _diccionario["cargado"]:
+        with _diccionario_lock:
+            if not _diccionario["cargado"]:
+                valor = None
+                try:
+                    valor = _leer(DICCIONARIO_ETIQUETAS_PATH)
+                    if valor is not None:
+                        logger.info(f"[TRAD] Diccionario de etiquetas cargado: "
+                                    f"{len(valor.get('etiquetas', {}))} entradas")
+                except Exception as e:
+                    logger.warning(f"[TRAD] Diccionario inválido {DICCIONARIO_ETIQUETAS_PATH}: {e}")
+                _diccionario["valor"] = valor
+                _diccionario["cargado"] = True
+
+    valor = _diccionario["valor"]
+    if not valor or valor.get("idioma_destino") != idioma_destino:
+        return {}
+    return valor.get("etiquetas", {})
+
+
+def regenerar_diccionario(ruta: Optional[str] = None, min_hits: int = 0, reemplazar: bool = False) -> Dict:
+    """
+    Fusiona el diccionario actual con las traducciones al español de la tabla traduccion_cache.
+    Requiere app context. Retorna un resumen con las entradas agregadas/actualizadas.
+    """
+    from app.models.traduccion_cache import TraduccionCache
+
+    ruta = ruta or DICCIONARIO_ETIQUETAS_PATH
+    actual = _leer(ruta) or {}
+    etiquetas: Dict[str, str] = dict(actual.get("etiquetas", {}))
+
+    agregadas, actualizadas = 0, 0
+    filas = TraduccionCache.query.filter(
+        TraduccionCache.idioma_destino == "es",
+        TraduccionCache.hits >= min_hits,
+    ).all()
+    for fila in filas:
+        previa = etiquetas.get(fila.texto_origen)
+        if previa is None:
+            agregadas += 1
+        elif previa != fila.traduccion and reemplazar:
+            actualizadas += 1
+        else:
+            continue
+        etiquetas[fila.texto_origen] = fila.traduccion
+
+    documento = {
+        "idioma_origen": "en",
+        "idioma_destino": "es",
+        "generado": datetime.utcnow().isoformat(timespec="seconds"),
+        "etiquetas": dict(sorted(etiquetas.items())),
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        f.write(json.dumps(documento, indent=2, ensure_ascii=False) + "\n")
+    os.replace(temporal, ruta)
+
+    return {"ruta": ruta, "entradas": len(etiquetas), "agregadas": agregadas,
+            "actualizadas": actualizadas, "filas_cache": len(filas)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenera el diccionario EN→ES de etiquetas desde la cache")
+    parser.add_argument("--salida", default=DICCIONARIO_ETIQUETAS_PATH, help="Ruta del diccionario JSON")
+    parser.add_argument("--min-hits", type=int, default=0, help="Solo traducciones reutilizadas al menos N veces")
+    parser.add_argument("--reemplazar", action="store_true", help="La cache pisa las entradas existentes")
+    args = parser.parse_args()
+
+    from app import create_app
+    with create_app().app_context():
+        resumen = regenerar_diccionario(args.salida, args.min_hits, args.reemplazar)
+    print(json.dumps(resumen, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# app/services/i18n/traduccion_pendiente_service.py
+"""
+Traducción diferida de etiquetas y logotipos de videos ya analizados.
+
+Con TRADUCCION_DIFERIDA el pipeline guarda el veredicto con los originales en inglés
+(Video.etiquetas_original / logotipos_original) y marca traduccion_pendiente. La traducción
+se completa acá, fuera del análisis, en la task POST /tasks/translate-pending: el pipeline
+la encola (Cloud Tasks) después de guardar el veredicto, agrupada por ventana de tiempo
+(ver cloud_tasks_service.enqueue_translate_pending_task). Si no se puede encolar, el
+pipeline traduce el video en el acto. Mientras tanto el detalle muestra los originales.
+"""
+import os
+import logging
+from typing import Dict, List
+
+from app import db
+from app.models.video import Video
+from app.services.core.logging_service import audit_logger
+from app.services.gcp.cloud_tasks_service import enqueue_translate_pending_task
+from app.services.i18n.translation_service import (
+    TRADUCCION_HABILITADA,
+    clave_etiqueta,
+    resolver_traducciones,
+    separar_etiquetas,
+    traducir_logos,
+    unir_traducciones,
+)
+
+logger = logging.getLogger(__name__)
+
+# Videos traducidos por ejecución de la task
+TRADUCCION_PENDIENTE_LOTE = int(os.getenv("TRADUCCION_PENDIENTE_LOTE", "50"))
+
+
+def _etiquetas_video(video: Video) -> List[str]:
+    return separar_etiquetas(video.etiquetas_original or video.etiquetas or "")
+
+
+def _aplicar_traduccion(video: Video, traducciones: Dict[str, str]) -> bool:
+    """
+    Aplica las traducciones y baja traduccion_pendiente solo si se resolvieron todas las
+    etiquetas del video. Si falta alguna, el video queda como estaba (sigue pendiente).
+    """
+    etiquetas = _etiquetas_video(video)
+    if any(clave_etiqueta(e) not in traducciones for e in etiquetas):
+        return False
+    if etiquetas:
+        video.etiquetas = unir_traducciones(etiquetas, traducciones)
+    video.logotipos = traducir_logos(video.logotipos_original or video.logotipos or "", "es")
+    video.traduccion_pendiente = False
+    return True
+
+
+def traducir_video(video: Video) -> bool:
+    """
+    Traduce los campos pendientes de un video y commitea. False si no se tradujo todo
+    (el video queda pendiente para la task). Nunca lanza excepción.
+    """
+    if not video or not video.traduccion_pendiente or not TRADUCCION_HABILITADA:
+        return False
+    try:
+        claves = [clave_etiqueta(e) for e in _etiquetas_video(video)]
+        traducciones = resolver_traducciones(claves, "es").traducciones if claves else {}
+        if not _aplicar_traduccion(video, traducciones):
+            return False
+        db.session.commit()
+        return True
+    except Exception as e:
+        db.session.rollback()
+        logger.warning(f"[TRAD] No se pudo traducir el video {video.id}: {e}")
+        return False
+
+
+def encolar_traduccion_pendiente() -> bool:
+    """Encola la task de traducción diferida. False si no se pudo (nunca lanza excepción)."""
+    try:
+        enqueue_translate_pending_task()
+        return True
+    except Exception as e:
+        logger.warning(f"[TRAD] No se pudo encolar la traducción diferida: {e}")
+        return False
+
+
+def traducir_videos_pendientes(limite: int = None) -> Dict:
+    """
+    Traduce hasta `limite` videos con traduccion_pendiente. Las etiquetas distintas del
+    lote se traducen juntas primero (una request a la API como mucho); después cada video
+    se resuelve con esas traducciones. Los videos con alguna etiqueta sin traducir siguen
+    pendientes y se cuentan en "fallidos" (la task responde 500 para que Cloud Tasks reintente).
+    """
+    if not TRADUCCION_HABILITADA:
+        return {"traducidos": 0, "fallidos": 0, "restantes": 0, "deshabilitada": True}
+
+    limite = TRADUCCION_PENDIENTE_LOTE if limite is None else max(1, int(limite))
+    videos = (
+        Video.query
+        .filter_by(traduccion_pendiente=True, estado_ia="completado")
+        .order_by(Video.id)
+        .limit(limite)
+        .all()
+    )
+    if not videos:
+        return {"traducidos": 0, "fallidos": 0, "restantes": 0}
+
+    claves = sorted({clave_etiqueta(e) for v in videos for e in _etiquetas_video(v)})
+    resolucion = resolver_traducciones(claves, "es") if claves else None
+    traducciones = resolucion.traducciones if resolucion else {}
+
+    traducidos = 0
+    try:
+        for video in videos:
+            if _aplicar_traduccion(video, traducciones):
+                traducidos += 1
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        audit_logger.log_error(
+            error_type="DEFERRED_TRANSLATION_ERROR",
+            message=f"Error en traducción diferida: {str(e)}",
+            details={"videos": [v.id for v in videos]}
+        )
+        raise
+
+    fallidos = len(videos) - traducidos
+    sin_resolver = resolucion.sin_resolver if resolucion else []
+    if fallidos:
+        audit_logger.log_error(
+            error_type="DEFERRED_TRANSLATION_INCOMPLETE",
+            message=f"Traducción diferida incompleta: {fallidos} videos siguen pendientes",
+            details={"etiquetas_sin_traducir": sin_resolver[:50]}
+        )
+
+    restantes = Video.query.filter_by(traduccion_pendiente=True, estado_ia="completado").count()
+    logger.info(f"[TRAD] Traducción diferida: {traducidos} videos, {len(claves)} etiquetas distintas, "
+                f"{fallidos} fallidos, {restantes} pendientes")
+    return {"traducidos": traducidos, "fallidos": fallidos, "etiquetas_distintas": len(claves),
+            "etiquetas_sin_traducir": len(sin_resolver), "restantes": restantes}
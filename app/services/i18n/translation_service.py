@@ -1,10 +1,15 @@
 # app/services/translation_service.py
 import os
 import logging
-from typing import List, Dict, Optional
+import threading
+from typing import List, Dict, NamedTuple, Optional
+from flask import has_app_context
+from sqlalchemy import insert, select, update
 from google.cloud import translate_v2 as translate
 from google.oauth2 import service_account
+from app.services.core.cache_service import CacheTTL
 from app.services.core.logging_service import audit_logger
+from app.services.i18n.diccionario_etiquetas import obtener_diccionario
 
 # Configurar logging
 logger = logging.getLogger(__name__)
@@ -12,6 +17,16 @@ logger = logging.getLogger(__name__)
 # Configuración desde variables de entorno
 _GOOGLE_CRED_PATH = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
 TRADUCCION_HABILITADA = os.getenv("ENABLE_TRANSLATION", "true").lower() == "true"
+# El pipeline guarda los originales en inglés y la traducción se completa fuera del análisis
+TRADUCCION_DIFERIDA = os.getenv("TRADUCCION_DIFERIDA", "true").lower() in ("true", "1", "yes")
+# Cache de traducciones: LRU en memoria delante de la tabla traduccion_cache
+TRADUCCION_CACHE_MAX_ENTRADAS = int(os.getenv("TRADUCCION_CACHE_MAX_ENTRADAS", "5000"))
+TRADUCCION_CACHE_TTL_SEG = float(os.getenv("TRADUCCION_CACHE_TTL_SEG", "86400"))
+TRADUCCION_CACHE_DB = os.getenv("TRADUCCION_CACHE_DB", "true").lower() in ("true", "1", "yes")
+# Etiquetas de Video Intelligence (siempre en inglés): una sola request translate(values=[...])
+TRADUCCION_EN_LOTE = os.getenv("TRADUCCION_EN_LOTE", "true").lower() in ("true", "1", "yes")
+# Segmentos por request (la API v2 acepta hasta 128)
+TRADUCCION_LOTE_MAX = max(1, min(128, int(os.getenv("TRADUCCION_LOTE_MAX", "100"))))
 
 def _get_translate_client():
     """
@@ -38,6 +53,228 @@ def _client():
         _translate_client = _get_translate_client()
     return _translate_client
 
+_traducciones_memoria = CacheTTL(TRADUCCION_CACHE_MAX_ENTRADAS, TRADUCCION_CACHE_TTL_SEG)
+_stats = {"hits_diccionario": 0, "hits_memoria": 0, "hits_db": 0, "misses": 0, "llamadas_api": 0, "fallos_lote": 0, "errores_db": 0}
+_stats_lock = threading.Lock()
+
+
+def _contar(clave: str, n: int = 1):
+    if n:
+        with _stats_lock:
+            _stats[clave] += n
+
+
+def clave_etiqueta(etiqueta: str) -> str:
+    """Forma con la que se busca y se guarda la traducción de una etiqueta."""
+    return etiqueta.strip().lower()
+
+
+def separar_etiquetas(etiquetas_texto: str) -> List[str]:
+    """"a, b,, c" -> ["a", "b", "c"]."""
+    return [etiqueta.strip() for etiqueta in (etiquetas_texto or "").split(',') if etiqueta.strip()]
+
+
+class ResolucionTraducciones(NamedTuple):
+    # {clave_etiqueta: traducción} de las claves resueltas
+    traducciones: Dict[str, str]
+    # Claves que no se pudieron traducir (la API falló para ellas)
+    sin_resolver: List[str]
+    desde_diccionario: int
+    desde_cache: int
+    desde_api: int
+
+
+def _buscar_traducciones(claves: List[str], idioma_destino: str) -> Dict[str, str]:
+    """
+    Traducciones ya conocidas de `claves`: primero el LRU del proceso, después la tabla
+    traduccion_cache (una sola consulta). Lo que sale de la BD se sube al LRU.
+    Usa una conexión propia (lectura + un solo UPDATE de hits por llamada): se llama a
+    mitad del pipeline y no debe confirmar ni deshacer lo pendiente en db.session.
+    """
+    encontradas: Dict[str, str] = {}
+    faltantes = []
+    for clave in claves:
+        traduccion = _traducciones_memoria.obtener((clave, idioma_destino))
+        if traduccion is not None:
+            encontradas[clave] = traduccion
+        else:
+            faltantes.append(clave)
+    _contar("hits_memoria", len(encontradas))
+
+    if faltantes and TRADUCCION_CACHE_DB and has_app_context():
+        from app import db
+        from app.models.traduccion_cache import TraduccionCache
+        try:
+            with db.engine.begin() as conn:
+                filas = conn.execute(
+                    select(TraduccionCache.id, TraduccionCache.texto_origen, TraduccionCache.traduccion)
+                    .where(TraduccionCache.idioma_destino == idioma_destino,
+                           TraduccionCache.texto_origen.in_(faltantes))
+                ).all()
+                if filas:
+                    conn.execute(
+                        update(TraduccionCache)
+                        .where(TraduccionCache.id.in_([fila.id for fila in filas]))
+                        .values(hits=TraduccionCache.hits + 1)
+                    )
+            for fila in filas:
+                encontradas[fila.texto_origen] = fila.traduccion
+                _traducciones_memoria.guardar((fila.texto_origen, idioma_destino), fila.traduccion)
+            _contar("hits_db", len(filas))
+        except Exception as e:
+            _contar("errores_db")
+            logger.warning(f"[TRAD] Error consultando cache de traducciones: {e}")
+
+    _contar("misses", len(claves) - len(encontradas))
+    return encontradas
+
+
+def _guardar_traducciones(nuevas: Dict[str, str], idioma_destino: str, fuente: str = "api"):
+    """
+    Guarda traducciones obtenidas de la API en el LRU y en la tabla (conexión propia,
+    como _buscar_traducciones). Nunca lanza excepción.
+    """
+    if not nuevas:
+        return
+    for clave, traduccion in nuevas.items():
+        _traducciones_memoria.guardar((clave, idioma_destino), traduccion)
+
+    if not TRADUCCION_CACHE_DB or not has_app_context():
+        return
+    from sqlalchemy.exc import IntegrityError
+    from app import db
+    from app.models.traduccion_cache import TraduccionCache
+    # Una transacción por fila: un duplicado no debe descartar el resto del lote
+    for clave, traduccion in nuevas.items():
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(insert(TraduccionCache).values(
+                    texto_origen=clave[:255], idioma_destino=idioma_destino,
+                    traduccion=traduccion[:255], fuente=fuente,
+                ))
+        except IntegrityError:
+            # Otro worker tradujo la misma etiqueta en paralelo; ya está en el LRU
+            continue
+        except Exception as e:
+            _contar("errores_db")
+            logger.warning(f"[TRAD] Error guardando cache de traducciones: {e}")
+            return
+
+
+def _traducir_lote(etiquetas: List[str], idioma_destino: str) -> Dict[str, str]:
+    """
+    Traduce todas las etiquetas en una request (o una cada TRADUCCION_LOTE_MAX), sin
+    detect_language: Video Intelligence devuelve las descripciones en inglés.
+    Lanza excepción si la API falla o devuelve una cantidad distinta de resultados.
+    """
+    nuevas: Dict[str, str] = {}
+    for inicio in range(0, len(etiquetas), TRADUCCION_LOTE_MAX):
+        tramo = etiquetas[inicio:inicio + TRADUCCION_LOTE_MAX]
+        resultados = _client().translate(
+            tramo,
+            source_language='en',
+            target_language=idioma_destino,
+            format_='text'
+        )
+        _contar("llamadas_api")
+        if len(resultados) != len(tramo):
+            raise ValueError(f"La API devolvió {len(resultados)} traducciones para {len(tramo)} etiquetas")
+        # La API respeta el orden de 'values'
+        for etiqueta, resultado in zip(tramo, resultados):
+            nuevas[etiqueta] = resultado['translatedText'].lower()
+    return nuevas
+
+
+def _traducir_por_etiqueta(etiquetas: List[str], idioma_destino: str) -> Dict[str, str]:
+    """Camino original: detect_language + translate por etiqueta. Las que fallan no se incluyen."""
+    nuevas: Dict[str, str] = {}
+    for etiqueta in etiquetas:
+        try:
+            # Detectar idioma primero
+            detection = _client().detect_language(etiqueta)
+            idioma_detectado = detection['language']
+            _contar("llamadas_api")
+            
+            # Solo traducir si está en inglés
+            if idioma_detectado == 'en':
+                resultado = _client().translate(
+                    etiqueta,
+                    source_language='en',
+                    target_language=idioma_destino
+                )
+                _contar("llamadas_api")
+                etiqueta_traducida = resultado['translatedText'].lower()
+                nuevas[etiqueta] = etiqueta_traducida
+                logger.debug(f"'{etiqueta}' -> '{etiqueta_traducida}'")
+            else:
+                # Si no está en inglés, mantener original (también se cachea: no vuelve a detectarse)
+                nuevas[etiqueta] = etiqueta
+                logger.debug(f"'{etiqueta}' mantenida (idioma: {idioma_detectado})")
+                
+        except Exception as e:
+            # Si falla la traducción de una etiqueta, mantener la original (sin cachear)
+            logger.warning(f"Error traduciendo '{etiqueta}': {str(e)}")
+    return nuevas
+
+
+def obtener_estadisticas_traduccion() -> Dict:
+    """Hit ratio de las traducciones (diccionario + memoria + BD) y llamadas reales a la API."""
+    with _stats_lock:
+        stats = dict(_stats)
+    resueltas = stats["hits_diccionario"] + stats["hits_memoria"] + stats["hits_db"]
+    consultas = resueltas + stats["misses"]
+    stats["hit_ratio"] = round(resueltas / consultas, 3) if consultas else 0.0
+    stats["memoria"] = _traducciones_memoria.estadisticas()
+    stats["habilitada"] = TRADUCCION_HABILITADA
+    stats["en_lote"] = TRADUCCION_EN_LOTE
+    return stats
+
+def resolver_traducciones(claves: List[str], idioma_destino: str = 'es') -> ResolucionTraducciones:
+    """
+    Traduce claves ya normalizadas (clave_etiqueta): diccionario empaquetado, después la
+    cache (LRU + tabla) y solo lo que falta a la API (en lote; si el lote falla, etiqueta
+    por etiqueta). Las fallas de la API no lanzan: esas claves vuelven en `sin_resolver`.
+    """
+    claves = list(dict.fromkeys(claves))
+    diccionario = obtener_diccionario(idioma_destino)
+    conocidas = {c: diccionario[c] for c in claves if c in diccionario}
+    _contar("hits_diccionario", len(conocidas))
+    en_diccionario = len(conocidas)
+    conocidas.update(_buscar_traducciones([c for c in claves if c not in conocidas], idioma_destino))
+    pendientes = [c for c in claves if c not in conocidas]
+
+    logger.info(f"Traduciendo {len(claves)} etiquetas al {idioma_destino} "
+                f"({en_diccionario} en diccionario, {len(conocidas) - en_diccionario} en cache, "
+                f"{len(pendientes)} a la API)")
+
+    nuevas: Dict[str, str] = {}
+    if pendientes and TRADUCCION_EN_LOTE:
+        try:
+            nuevas = _traducir_lote(pendientes, idioma_destino)
+        except Exception as e:
+            # Solo si falla el lote se vuelve a la traducción etiqueta por etiqueta
+            logger.warning(f"[TRAD] Falló la traducción en lote ({len(pendientes)} etiquetas): {e}")
+            _contar("fallos_lote")
+            nuevas = _traducir_por_etiqueta(pendientes, idioma_destino)
+    elif pendientes:
+        nuevas = _traducir_por_etiqueta(pendientes, idioma_destino)
+
+    _guardar_traducciones(nuevas, idioma_destino)
+    conocidas.update(nuevas)
+    return ResolucionTraducciones(
+        traducciones=conocidas,
+        sin_resolver=[c for c in pendientes if c not in nuevas],
+        desde_diccionario=en_diccionario,
+        desde_cache=len(claves) - len(pendientes) - en_diccionario,
+        desde_api=len(nuevas),
+    )
+
+
+def unir_traducciones(etiquetas_lista: List[str], traducciones: Dict[str, str]) -> str:
+    """Arma el string final; las etiquetas sin traducción quedan en minúsculas."""
+    return ', '.join(traducciones.get(clave_etiqueta(e), e.lower()) for e in etiquetas_lista)
+
+
 def traducir_etiquetas(etiquetas_texto: str, idioma_destino: str = 'es') -> str:
     """
     Traduce un string de etiquetas separadas por comas del inglés al idioma especificado.
@@ -58,43 +295,14 @@ def traducir_etiquetas(etiquetas_texto: str, idioma_destino: str = 'es') -> str:
     
     try:
         # Separar etiquetas y limpiar espacios
-        etiquetas_lista = [etiqueta.strip() for etiqueta in etiquetas_texto.split(',') if etiqueta.strip()]
+        etiquetas_lista = separar_etiquetas(etiquetas_texto)
         
         if not etiquetas_lista:
             return etiquetas_texto
         
-        logger.info(f"Traduciendo {len(etiquetas_lista)} etiquetas del inglés al {idioma_destino}")
-        
-        # Traducir cada etiqueta individualmente para mejor precisión
-        etiquetas_traducidas = []
-        
-        for etiqueta in etiquetas_lista:
-            try:
-                # Detectar idioma primero
-                detection = _client().detect_language(etiqueta)
-                idioma_detectado = detection['language']
-                
-                # Solo traducir si está en inglés
-                if idioma_detectado == 'en':
-                    resultado = _client().translate(
-                        etiqueta,
-                        source_language='en',
-                        target_language=idioma_destino
-                    )
-                    etiqueta_traducida = resultado['translatedText'].lower()
-                    etiquetas_traducidas.append(etiqueta_traducida)
-                    logger.debug(f"'{etiqueta}' -> '{etiqueta_traducida}'")
-                else:
-                    # Si no está en inglés, mantener original
-                    etiquetas_traducidas.append(etiqueta.lower())
-                    logger.debug(f"'{etiqueta}' mantenida (idioma: {idioma_detectado})")
-                    
-            except Exception as e:
-                # Si falla la traducción de una etiqueta, mantener la original
-                logger.warning(f"Error traduciendo '{etiqueta}': {str(e)}")
-                etiquetas_traducidas.append(etiqueta.lower())
-        
-        resultado_final = ', '.join(etiquetas_traducidas)
+        # Diccionario empaquetado primero; solo las etiquetas que nunca se tradujeron llegan a la API
+        resolucion = resolver_traducciones([clave_etiqueta(e) for e in etiquetas_lista], idioma_destino)
+        resultado_final = unir_traducciones(etiquetas_lista, resolucion.traducciones)
         
         # Log de traducción exitosa
         audit_logger.log_error(
@@ -103,7 +311,11 @@ def traducir_etiquetas(etiquetas_texto: str, idioma_destino: str = 'es') -> str:
             details={
                 'idioma_destino': idioma_destino,
                 'etiquetas_originales': len(etiquetas_lista),
-                'etiquetas_finales': len(etiquetas_traducidas)
+                'etiquetas_finales': len(etiquetas_lista),
+                'desde_diccionario': resolucion.desde_diccionario,
+                'desde_cache': resolucion.desde_cache,
+                'traducidas_api': resolucion.desde_api,
+                'sin_traducir': len(resolucion.sin_resolver)
             }
         )
         
@@ -0,0 +1,116 @@
+# app/services/moderation/aho_corasick.py
+"""
+Autómata Aho-Corasick mínimo (sin dependencias) para buscar muchas palabras a la vez.
+
+Se construye una vez por lexicón y encuentra todas las ocurrencias (como substrings,
+igual que `palabra in texto`) en una sola pasada lineal sobre el texto.
+
+Uso:
+    ac = AhoCorasick(["puta", "hijo de puta", "mierda"])
+    ac.buscar("hijo de puta")          -> {"puta", "hijo de puta"}
+    list(ac.iter_coincidencias(texto)) -> [(fin, "puta"), ...]
+"""
+import sys
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+# Con pocos patrones (p. ej. la lista de un locale) buscar cada uno con str.find/`in`,
+# que corre en C, es más rápido que recorrer el autómata carácter a carácter en Python
+MAX_PATRONES_BUSQUEDA_DIRECTA = 48
+
+
+class AhoCorasick:
+    def __init__(self, patrones: Iterable[str]):
+        self.patrones: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._salida: List[List[int]] = [[]]
+
+        vistos: Set[str] = set()
+        for patron in patrones:
+            if not patron or patron in vistos:
+                continue
+            vistos.add(patron)
+            self._agregar(patron, len(self.patrones))
+            self.patrones.append(patron)
+        self._construir_fallos()
+
+    def __len__(self) -> int:
+        return len(self.patrones)
+
+    def bytes_estimados(self) -> int:
+        """Tamaño aproximado en memoria del autómata (nodos + patrones)."""
+        total = sum(sys.getsizeof(d) for d in self._goto)
+        total += sum(sys.getsizeof(s) for s in self._salida) + sys.getsizeof(self._fail)
+        return total + sum(sys.getsizeof(p) for p in self.patrones)
+
+    def _agregar(self, patron: str, pid: int):
+        nodo = 0
+        for c in patron:
+            siguiente = self._goto[nodo].get(c)
+            if siguiente is None:
+                siguiente = len(self._goto)
+                self._goto[nodo][c] = siguiente
+                self._goto.append({})
+                self._fail.append(0)
+                self._salida.append([])
+            nodo = siguiente
+        self._salida[nodo].append(pid)
+
+    def _construir_fallos(self):
+        cola = deque(self._goto[0].values())
+        while cola:
+            nodo = cola.popleft()
+            for c, hijo in self._goto[nodo].items():
+                cola.append(hijo)
+                f = self._fail[nodo]
+                while f and c not in self._goto[f]:
+                    f = self._fail[f]
+                destino = self._goto[f].get(c, 0)
+                self._fail[hijo] = destino if destino != hijo else 0
+                # Hereda las salidas del sufijo más largo que también es patrón
+                self._salida[hijo].extend(self._salida[self._fail[hijo]])
+
+    def iter_coincidencias(self, texto: str) -> Iterator[Tuple[int, str]]:
+        """Itera (índice de fin exclusivo, patrón) por cada ocurrencia en el texto, por fin creciente."""
+        if len(self.patrones) <= MAX_PATRONES_BUSQUEDA_DIRECTA:
+            yield from self._iter_directo(texto)
+            return
+        goto, fail, salida, patrones = self._goto, self._fail, self._salida, self.patrones
+        nodo = 0
+        for i, c in enumerate(texto):
+            while nodo and c not in goto[nodo]:
+                nodo = fail[nodo]
+            nodo = goto[nodo].get(c, 0)
+            for pid in salida[nodo]:
+                yield i + 1, patrones[pid]
+
+    def _iter_directo(self, texto: str) -> Iterator[Tuple[int, str]]:
+        coincidencias = []
+        for pid, patron in enumerate(self.patrones):
+            i = texto.find(patron)
+            while i >= 0:
+                # Mismo orden que el autómata: por fin y, con igual fin, el patrón más largo primero
+                coincidencias.append((i + len(patron), -len(patron), pid))
+                i = texto.find(patron, i + 1)
+        coincidencias.sort()
+        for fin, _, pid in coincidencias:
+            yield fin, self.patrones[pid]
+
+    def buscar(self, texto: str) -> Set[str]:
+        """Conjunto de patrones presentes en el texto (mismo recorrido, sin generador)."""
+        if len(self.patrones) <= MAX_PATRONES_BUSQUEDA_DIRECTA:
+            return {patron for patron in self.patrones if patron in texto}
+        goto, fail, salida, patrones = self._goto, self._fail, self._salida, self.patrones
+        encontrados: Set[str] = set()
+        nodo = 0
+        for c in texto:
+            siguiente = goto[nodo].get(c)
+            while siguiente is None and nodo:
+                nodo = fail[nodo]
+                siguiente = goto[nodo].get(c)
+            nodo = siguiente or 0
+            if salida[nodo]:
+                for pid in salida[nodo]:
+                    encontrados.add(patrones[pid])
+        return encontrados
@@ -1,18 +1,30 @@
 # app/services/badwords_service.py
+import os
+import time
+import logging
+import threading
+from typing import NamedTuple, Optional, Tuple
+from flask import has_app_context
+from sqlalchemy import case, func, select
 from app import db
-from sqlalchemy import Column, Integer, String
+from app.models.badWord import BadWord
+from app.services.core.logging_service import audit_logger
+from app.services.moderation.aho_corasick import AhoCorasick
+from app.services.moderation.lexicon_artifact import obtener_artefacto
 
-# --- Listos para migrar a base de datos---
-class BadWord(db.Model):
-    __tablename__ = "badwords"
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    palabra = Column(String(100), nullable=False, unique=True)
-    categoria = Column(String(50), nullable=False)  # sexual o violento
+logger = logging.getLogger(__name__)
 
-    def __repr__(self):
-        return f"<BadWord {self.palabra} ({self.categoria})>"
+# Origen del lexicón: "db" (filas activas de BadWord, con recarga en caliente) o "file" (BADWORDS).
+# Si la tabla está vacía o no se puede leer, se usa BADWORDS.
+BADWORDS_SOURCE = os.getenv("BADWORDS_SOURCE", "db").lower()
+# Cada cuántos segundos se consulta la versión del lexicón en BD
+BADWORDS_RELOAD_SEC = float(os.getenv("BADWORDS_RELOAD_SEC", "30"))
 
-# --- LISTA LOCAL (hardcode inicial) ---
+# Categorías de BD -> nombres usados por el lexicón en código
+_CATEGORIA_DESDE_DB = {"violenta": "violento"}
+_CATEGORIA_HACIA_DB = {"violento": "violenta"}
+
+# --- LISTA LOCAL (hardcode inicial y fallback) ---
 BADWORDS = {
     "sexual": [
     # — Masculinos (ES / LATAM, coloquial y jerga) —
@@ -276,25 +288,224 @@ BADWORDS = {
 
 
 # --- DETECTOR ---
-def load_badwords(source="file"):
+class LexiconCompilado(NamedTuple):
+    """Lexicón inmutable ya compilado. Se reemplaza entero (swap atómico), nunca se muta."""
+    fuente: str
+    version: tuple
+    badwords: dict
+    ac: AhoCorasick
+    # patrón -> [(categoria, índice en la lista)], para devolver coincidencias en orden de lexicón
+    posiciones: dict
+
+
+# fuente -> LexiconCompilado vigente
+_lexicones = {}
+_recarga = {"ultimo_chequeo": 0.0, "ultima_recarga": None}
+_recarga_lock = threading.Lock()
+_file_lock = threading.Lock()
+
+
+def _compilar(fuente: str, version: tuple, badwords: dict) -> LexiconCompilado:
+    posiciones = {}
+    for categoria, palabras in badwords.items():
+        for i, palabra in enumerate(palabras):
+            posiciones.setdefault(palabra, []).append((categoria, i))
+    return LexiconCompilado(fuente, version, badwords, AhoCorasick(posiciones.keys()), posiciones)
+
+
+def _clave_lexicon(badwords: dict):
+    return tuple((cat, len(palabras)) for cat, palabras in badwords.items())
+
+
+def _lexicon_file() -> LexiconCompilado:
+    """BADWORDS compilado; se recompila si alguien reemplazó o modificó la lista en memoria."""
+    version = ("file",) + _clave_lexicon(BADWORDS)
+    actual = _lexicones.get("file")
+    if actual is not None and actual.version == version and actual.badwords is BADWORDS:
+        return actual
+    with _file_lock:
+        actual = _lexicones.get("file")
+        if actual is None or actual.version != version or actual.badwords is not BADWORDS:
+            actual = _compilar("file", version, BADWORDS)
+            _lexicones["file"] = actual
+        return actual
+
+
+def _version_db(conn) -> tuple:
+    """Versión barata del lexicón en BD: (max id, filas, filas activas)."""
+    max_id, total, activos = conn.execute(select(
+        func.max(BadWord.id),
+        func.count(BadWord.id),
+        func.sum(case((BadWord.activo.is_(True), 1), else_=0)),
+    )).one()
+    return ("db", max_id or 0, total or 0, int(activos or 0))
+
+
+def _cargar_desde_db(conn) -> dict:
+    badwords = {}
+    filas = conn.execute(
+        select(BadWord.palabra, BadWord.categoria)
+        .where(BadWord.activo.is_(True))
+        .order_by(BadWord.id)
+    ).all()
+    for palabra, categoria in filas:
+        palabra = (palabra or "").strip().lower()
+        if palabra:
+            badwords.setdefault(_CATEGORIA_DESDE_DB.get(categoria, categoria), []).append(palabra)
+    return badwords
+
+
+def _badwords_artefacto() -> Tuple[tuple, dict]:
+    """(versión de BD con la que se generó, {categoria: [palabras]}) del artefacto precompilado."""
+    artefacto = obtener_artefacto()
+    if artefacto is None:
+        return (), {}
+    version = tuple(artefacto.metadata.get("version_badwords_db") or ())
+    return version, {cat: list(seccion) for cat, seccion in artefacto.grupos("badwords_db").items()}
+
+
+def _lexicon_respaldo() -> LexiconCompilado:
+    """Sin BD disponible: filas de badword del artefacto si las trae; si no, la lista en código."""
+    actual = _lexicones.get("artefacto")
+    if actual is not None:
+        return actual
+    version, badwords = _badwords_artefacto()
+    if not badwords:
+        return _lexicon_file()
+    with _file_lock:
+        if "artefacto" not in _lexicones:
+            _lexicones["artefacto"] = _compilar("artefacto", ("artefacto",) + version, badwords)
+        return _lexicones["artefacto"]
+
+
+def _lexicon_db() -> LexiconCompilado:
+    """
+    Lexicón desde BD. Cada BADWORDS_RELOAD_SEC consulta la versión y, si cambió,
+    compila uno nuevo y lo publica con un swap atómico. Nunca bloquea a quien modera:
+    si otro hilo está recargando (o no hay app context / BD), se usa el lexicón vigente.
+    Lee con una conexión propia: se llama a mitad del pipeline y no debe tocar (ni
+    deshacer) los cambios pendientes que el llamador tiene en db.session.
+    """
+    actual = _lexicones.get("db")
+    if actual is not None and time.monotonic() - _recarga["ultimo_chequeo"] < BADWORDS_RELOAD_SEC:
+        return actual
+    if not has_app_context() or not _recarga_lock.acquire(blocking=False):
+        return actual or _lexicon_respaldo()
+
+    try:
+        _recarga["ultimo_chequeo"] = time.monotonic()
+        with db.engine.connect() as conn:
+            version = _version_db(conn)
+            if actual is not None and actual.version == version:
+                return actual
+
+            # Al arrancar, si el artefacto se generó con esta misma versión, no se releen las filas
+            version_artefacto, badwords = _badwords_artefacto() if actual is None else ((), {})
+            if not badwords or version_artefacto != version:
+                badwords = _cargar_desde_db(conn)
+        if badwords:
+            nuevo = _compilar("db", version, badwords)
+        else:
+            logger.warning("[BADWORDS] Tabla badword sin filas activas; se usa la lista en código")
+            nuevo = _compilar("db", version, BADWORDS)
+        _lexicones["db"] = nuevo
+        _recarga["ultima_recarga"] = time.time()
+        logger.info(f"[BADWORDS] Lexicón recargado desde BD: version={version}, patrones={len(nuevo.ac)}")
+        return nuevo
+
+    except Exception as e:
+        logger.error(f"[BADWORDS] Error cargando lexicón desde BD: {e}")
+        audit_logger.log_error(
+            error_type="BADWORDS_DB_LOAD_ERROR",
+            message=f"Error cargando badwords desde BD: {str(e)}"
+        )
+        return actual or _lexicon_respaldo()
+    finally:
+        _recarga_lock.release()
+
+
+def obtener_lexicon(source: Optional[str] = None) -> LexiconCompilado:
+    """Lexicón compilado vigente para la fuente (por defecto BADWORDS_SOURCE)."""
+    if (source or BADWORDS_SOURCE) == "db":
+        return _lexicon_db()
+    return _lexicon_file()
+
+
+def load_badwords(source: Optional[str] = None):
+    """
+    Devuelve el lexicón {categoria: [palabras]} vigente (BD o código, ver BADWORDS_SOURCE).
+    """
+    return obtener_lexicon(source).badwords
+
+
+def clave_lexicon(source: Optional[str] = None):
+    """Clave que cambia cuando cambia el lexicón (para invalidar índices derivados)."""
+    return obtener_lexicon(source).version
+
+
+def forzar_recarga():
+    """Hace que la próxima detección vuelva a consultar la versión en BD."""
+    _recarga["ultimo_chequeo"] = 0.0
+
+
+def obtener_estado_lexicon() -> dict:
+    lex = _lexicones.get(BADWORDS_SOURCE)
+    artefacto = obtener_artefacto()
+    return {
+        "fuente": BADWORDS_SOURCE,
+        "version": list(lex.version) if lex else None,
+        "origen_palabras": "bd" if lex and lex.badwords is not BADWORDS else "codigo",
+        "patrones": len(lex.ac) if lex else 0,
+        "ultima_recarga": _recarga["ultima_recarga"],
+        "artefacto": artefacto.creado if artefacto else None,
+    }
+
+
+def sembrar_badwords_desde_lista(fuente: str = "migracion_inicial") -> int:
     """
-    Carga las badwords por ahora solo desde código.
+    Inserta en la tabla badword las palabras de BADWORDS que todavía no existen.
+    El idioma no está en la lista en código: se guardan como 'es' (editable luego).
+    Retorna la cantidad de filas insertadas. Requiere app context.
     """
-    return BADWORDS
+    existentes = {
+        (p.lower(), c, i)
+        for p, c, i in db.session.query(BadWord.palabra, BadWord.categoria, BadWord.idioma).all()
+    }
+    nuevas = 0
+    for categoria, palabras in BADWORDS.items():
+        categoria_db = _CATEGORIA_HACIA_DB.get(categoria, categoria)
+        for palabra in palabras:
+            palabra = palabra.strip().lower()[:100]
+            clave = (palabra, categoria_db, "es")
+            if not palabra or clave in existentes:
+                continue
+            existentes.add(clave)
+            db.session.add(BadWord(palabra=palabra, categoria=categoria_db, idioma="es", fuente=fuente))
+            nuevas += 1
+    db.session.commit()
+    forzar_recarga()
+
+    audit_logger.log_event(
+        event_type="BADWORDS_SEED",
+        message=f"Sembradas {nuevas} badwords desde la lista en código",
+        details={"fuente": fuente}
+    )
+    return nuevas
+
 
-def detect_badwords(text: str, source="file") -> dict:
+def detect_badwords(text: str, source: Optional[str] = None) -> dict:
     """
-    Detecta palabras problemáticas en un texto.
-    Devuelve todas encontradas y clasificadas.
+    Detecta palabras problemáticas en un texto (coincidencia por substring, en minúsculas).
+    Una sola pasada con Aho-Corasick; devuelve todas encontradas y clasificadas.
     """
     text_low = text.lower()
-    badwords = load_badwords(source)
-    found = {cat: [] for cat in badwords.keys()}
+    lex = obtener_lexicon(source)  # una sola referencia: un swap concurrente no afecta esta llamada
 
-    for categoria, palabras in badwords.items():
-        for palabra in palabras:
-            if palabra in text_low:
-                found[categoria].append(palabra)
+    encontradas = {cat: [] for cat in lex.badwords.keys()}
+    for palabra in lex.ac.buscar(text_low):
+        for categoria, i in lex.posiciones[palabra]:
+            encontradas[categoria].append((i, palabra))
 
-    all_found = sum(found.values(), [])
+    found = {cat: [p for _, p in sorted(items)] for cat, items in encontradas.items()}
+    all_found = [p for palabras in found.values() for p in palabras]
     return {"found": all_found, "categories": found}
@@ -0,0 +1,52 @@
+# app/services/moderation/lexico_base.py
+"""
+Lista manual de palabras soeces y normalización de texto compartidas por
+text_detection_service, moderation_scanner y lexicon_artifact.
+Sin dependencias de GCP ni de cv2: el escáner la importa sin cargar el pipeline de OCR.
+"""
+import unicodedata
+from typing import List
+
+# Lista de palabras problemáticas (expandible)
+PALABRAS_SOECES = {
+    'español': [
+        'idiota', 'estúpido', 'imbécil', 'tarado', 'pendejo', 'cabrón',
+        'hijo de puta', 'puta', 'puto', 'marica', 'maricón', 'joto',
+        'culero', 'ojete', 'chingar', 'joder', 'mierda', 'cagada',
+        'huevón', 'güevón', 'baboso', 'mamón', 'cerdo', 'cochino', 'pelotudos','forros', 'cabrones',
+        # Agregar más según necesidades
+    ],
+    'inglés': [
+        'idiot', 'stupid', 'moron', 'dumbass', 'asshole', 'bastard',
+        'bitch', 'fuck', 'fucking', 'shit', 'damn', 'hell',
+        'crap', 'suck', 'sucks', 'gay', 'retard', 'loser',
+        'dickhead', 'motherfucker', 'son of a bitch', 'whore',
+        # Agregar más según necesidades
+    ]
+}
+
+LEET_MAP = str.maketrans({"0":"o","1":"i","3":"e","4":"a","5":"s","7":"t","@":"a","$":"s","!":"i"})
+
+def normalizar_texto(text: str) -> str:
+    """Minúsculas, sin acentos, leet reemplazado y máx. 2 repeticiones seguidas."""
+    t = text.lower()
+    t = unicodedata.normalize("NFD", t)
+    t = "".join(c for c in t if unicodedata.category(c) != "Mn")  # quita acentos
+    t = t.translate(LEET_MAP)
+    out, prev, run = [], "", 0
+    for c in t:
+        if c == prev: run += 1
+        else: run, prev = 0, c
+        if run < 2: out.append(c)  # permite hasta 2 repeticiones
+    return "".join(out)
+
+def calcular_nivel_problema(palabras_encontradas: List[str]) -> str:
+    """Calcula el nivel de problema basado en palabras encontradas"""
+    num_palabras = len(palabras_encontradas)
+
+    if num_palabras == 0:
+        return 'limpio'
+    elif num_palabras <= 2:
+        return 'sospechoso'
+    else:
+        return 'problematico'
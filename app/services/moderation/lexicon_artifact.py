@@ -0,0 +1,253 @@
+# app/services/moderation/lexicon_artifact.py
+"""
+Artefacto binario precompilado con todos los lexicones de moderación:
+PALABRAS_SOECES, BADWORDS, el vocabulario global de spanlp y las filas activas de BadWord.
+
+Se genera en el build y cada worker lo abre con mmap (solo lectura): las páginas del
+archivo las comparte el sistema operativo entre procesos y nadie relee los datasets de
+spanlp ni vuelve a cargar las filas de la BD al arrancar.
+
+Generar (desde la raíz del repo):
+    python -m app.services.moderation.lexicon_artifact              # incluye la tabla badword
+    python -m app.services.moderation.lexicon_artifact --sin-db     # solo listas en código + spanlp
+
+La imagen se construye con --sin-db --estricto (sin BD ni secretos en el build): las filas
+de la tabla badword no viajan en el artefacto de la imagen. Las carga badwords_service desde
+la BD en el primer uso (compara la versión de la tabla con `version_badwords_db`, que en ese
+caso no existe) y después las recarga en caliente. La variante con BD sirve para hosts que
+generan el artefacto con acceso a la BD antes de arrancar.
+
+Formato (enteros uint32 en el orden de bytes nativo, registrado en el índice):
+    MAGIC (8 bytes) | largo del índice (uint32) | índice JSON (utf-8) | relleno a 4 bytes
+    por sección: offsets[n+1] | orden[n] | blob utf-8
+`offsets` delimita cada palabra en el blob (en el orden original de la lista) y `orden`
+es la permutación que deja las palabras ordenadas por bytes, para buscar con bisección.
+"""
+import argparse
+import array
+import json
+import logging
+import mmap
+import os
+import sys
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LEXICON_ARTIFACT_PATH = os.getenv(
+    "LEXICON_ARTIFACT_PATH",
+    os.path.join(os.path.dirname(__file__), "data", "lexicon.bin"),
+)
+
+_MAGIC = b"AFLEX\x00\x00\x01"
+_FORMATO = 1
+
+_artefacto = {"cargado": False, "valor": None}
+_artefacto_lock = threading.Lock()
+
+
+class SeccionLexicon:
+    """Lista de palabras respaldada por el mmap: indexable, iterable y con `in` por bisección."""
+
+    def __init__(self, mm: mmap.mmap, n: int, off_offsets: int, off_orden: int, off_blob: int, meta: Dict):
+        self._mm = mm
+        self._n = n
+        self._offsets = memoryview(mm)[off_offsets:off_offsets + 4 * (n + 1)].cast("I")
+        self._orden = memoryview(mm)[off_orden:off_orden + 4 * n].cast("I")
+        self._blob = off_blob
+        self.meta = meta
+
+    def __len__(self) -> int:
+        return self._n
+
+    def _bytes(self, i: int) -> bytes:
+        return self._mm[self._blob + self._offsets[i]:self._blob + self._offsets[i + 1]]
+
+    def __getitem__(self, i: int) -> str:
+        if not 0 <= i < self._n:
+            raise IndexError(i)
+        return self._bytes(i).decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(self._n):
+            yield self._bytes(i).decode("utf-8")
+
+    def __contains__(self, palabra: str) -> bool:
+        buscada = palabra.encode("utf-8")
+        bajo, alto = 0, self._n
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            actual = self._bytes(self._orden[medio])
+            if actual < buscada:
+                bajo = medio + 1
+            elif actual > buscada:
+                alto = medio
+            else:
+                return True
+        return False
+
+    def palabras(self) -> List[str]:
+        return list(self)
+
+
+class ArtefactoLexicon:
+    """Artefacto abierto con mmap. Las secciones se nombran "<fuente>:<grupo>"."""
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        with open(ruta, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(_MAGIC)] != _MAGIC:
+            raise ValueError(f"{ruta} no es un artefacto de lexicón")
+        largo = int.from_bytes(self._mm[8:12], sys.byteorder)
+        indice = json.loads(self._mm[12:12 + largo].decode("utf-8"))
+        if indice.get("formato") != _FORMATO or indice.get("byteorder") != sys.byteorder:
+            raise ValueError(f"{ruta}: formato o byteorder incompatible")
+        self.creado = indice.get("creado")
+        self.metadata: Dict = indice.get("metadata", {})
+        self._secciones = {
+            nombre: SeccionLexicon(self._mm, s["n"], s["offsets"], s["orden"], s["blob"], s.get("meta", {}))
+            for nombre, s in indice["secciones"].items()
+        }
+
+    @property
+    def secciones(self) -> List[str]:
+        return list(self._secciones)
+
+    def seccion(self, nombre: str) -> Optional[SeccionLexicon]:
+        return self._secciones.get(nombre)
+
+    def grupos(self, fuente: str) -> Dict[str, SeccionLexicon]:
+        """{grupo: sección} de una fuente, en el orden en que se escribieron."""
+        prefijo = f"{fuente}:"
+        return {n[len(prefijo):]: s for n, s in self._secciones.items() if n.startswith(prefijo)}
+
+
+def escribir_artefacto(ruta: str, secciones: Dict[str, Tuple[List[str], Dict]], metadata: Dict) -> Dict:
+    """Serializa {nombre: (palabras, meta)} en `ruta` (escritura atómica vía archivo temporal)."""
+    datos = []
+    for nombre, (palabras, meta) in secciones.items():
+        codificadas = [p.encode("utf-8") for p in palabras]
+        offsets = array.array("I", [0])
+        for c in codificadas:
+            offsets.append(offsets[-1] + len(c))
+        orden = array.array("I", sorted(range(len(codificadas)), key=codificadas.__getitem__))
+        datos.append((nombre, len(codificadas), offsets.tobytes(), orden.tobytes(), b"".join(codificadas), meta))
+
+    def _indice(base: int) -> bytes:
+        cursor = base
+        tabla = {}
+        for nombre, n, offsets, orden, blob, meta in datos:
+            tabla[nombre] = {"n": n, "offsets": cursor, "orden": cursor + len(offsets),
+                             "blob": cursor + len(offsets) + len(orden), "meta": meta}
+            cursor += len(offsets) + len(orden) + len(blob)
+            cursor += -cursor % 4
+        return json.dumps({
+            "formato": _FORMATO,
+            "byteorder": sys.byteorder,
+            "creado": datetime.utcnow().isoformat(),
+            "metadata": metadata,
+            "secciones": tabla,
+        }, ensure_ascii=False).encode("utf-8")
+
+    # El índice guarda offsets absolutos que dependen de su propio largo: se itera hasta que se estabiliza
+    base = 0
+    while True:
+        indice = _indice(base)
+        nueva_base = 12 + len(indice) + (-(12 + len(indice)) % 4)
+        if nueva_base == base:
+            break
+        base = nueva_base
+
+    os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "wb") as f:
+        f.write(_MAGIC)
+        f.write(len(indice).to_bytes(4, sys.byteorder))
+        f.write(indice)
+        f.write(b"\0" * (base - 12 - len(indice)))
+        for _, _, offsets, orden, blob, _ in datos:
+            f.write(offsets)
+            f.write(orden)
+            f.write(blob)
+            f.write(b"\0" * (-(len(offsets) + len(orden) + len(blob)) % 4))
+    os.replace(temporal, ruta)
+    return {"ruta": ruta, "secciones": {nombre: n for nombre, n, *_ in datos}, "metadata": metadata}
+
+
+def construir_artefacto(ruta: Optional[str] = None, incluir_db: bool = True) -> Dict:
+    """
+    Junta todos los lexicones y escribe el artefacto. Con incluir_db requiere app context
+    y guarda también la versión de la tabla badword para validar el artefacto al arrancar.
+    """
+    from app.services.moderation import badwords_service, spanlp_service
+    from app.services.moderation.lexico_base import PALABRAS_SOECES
+
+    secciones: Dict[str, Tuple[List[str], Dict]] = {}
+    metadata: Dict = {}
+
+    for idioma, palabras in PALABRAS_SOECES.items():
+        secciones[f"lista:{idioma}"] = (list(palabras), {})
+
+    for categoria, palabras in badwords_service.BADWORDS.items():
+        secciones[f"badwords_codigo:{categoria}"] = (list(palabras), {})
+
+    if incluir_db:
+        from app import db
+        with db.engine.connect() as conn:
+            version = badwords_service._version_db(conn)
+            for categoria, palabras in badwords_service._cargar_desde_db(conn).items():
+                secciones[f"badwords_db:{categoria}"] = (palabras, {})
+        metadata["version_badwords_db"] = list(version)
+
+    detector = spanlp_service._get_detector_global()
+    vocab = spanlp_service._congelar_vocabulario(detector) if detector is not None else None
+    if vocab is not None:
+        palabras, longitudes = vocab
+        secciones["spanlp:global"] = (sorted(palabras), {"longitudes": list(longitudes)})
+    else:
+        logger.warning("[LEXICON] spanlp no disponible: el artefacto no incluye su vocabulario")
+
+    return escribir_artefacto(ruta or LEXICON_ARTIFACT_PATH, secciones, metadata)
+
+
+def obtener_artefacto() -> Optional[ArtefactoLexicon]:
+    """Artefacto del proceso (se abre una sola vez). None si no existe o no es válido."""
+    if not _artefacto["cargado"]:
+        with _artefacto_lock:
+            if not _artefacto["cargado"]:
+                valor = None
+                if LEXICON_ARTIFACT_PATH and os.path.isfile(LEXICON_ARTIFACT_PATH):
+                    try:
+                        valor = ArtefactoLexicon(LEXICON_ARTIFACT_PATH)
+                        logger.info(f"[LEXICON] Artefacto mapeado: {LEXICON_ARTIFACT_PATH} ({valor.creado})")
+                    except Exception as e:
+                        logger.warning(f"[LEXICON] Artefacto inválido {LEXICON_ARTIFACT_PATH}: {e}")
+                _artefacto["valor"] = valor
+                _artefacto["cargado"] = True
+    return _artefacto["valor"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera el artefacto binario de lexicones de moderación")
+    parser.add_argument("--salida", default=LEXICON_ARTIFACT_PATH, help="Ruta del artefacto")
+    parser.add_argument("--sin-db", action="store_true", help="No incluir las filas de la tabla badword")
+    parser.add_argument("--estricto", action="store_true",
+                        help="Fallar (exit 1) si el artefacto queda sin el vocabulario de spanlp")
+    args = parser.parse_args()
+
+    if args.sin_db:
+        resumen = construir_artefacto(args.salida, incluir_db=False)
+    else:
+        from app import create_app
+        with create_app().app_context():
+            resumen = construir_artefacto(args.salida, incluir_db=True)
+    print(json.dumps(resumen, indent=2, ensure_ascii=False))
+    if args.estricto and "spanlp:global" not in resumen["secciones"]:
+        sys.exit("Artefacto de lexicón incompleto: falta el vocabulario de spanlp")
+
+
+if __name__ == "__main__":
+    main()
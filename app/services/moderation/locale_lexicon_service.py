@@ -0,0 +1,161 @@
+# app/services/moderation/locale_lexicon_service.py
+"""
+Lexicones compilados por locale (es-AR, es-ES, es-MX, en, ...), elegidos según el país del club.
+
+Cada lexicón junta la lista propia del locale y el vocabulario spanlp del país sumado al
+global (como la fusión histórica: país + global), y se compila recién la primera vez que
+se usa. Quedan en un LRU acotado por memoria (LOCALE_LEXICON_MAX_MB): los locales que no
+se usan no ocupan memoria.
+
+Un club sin país (club.pais NULL, p. ej. los existentes antes de la columna) o un video sin
+club no tienen locale: se moderan solo con las listas globales, igual que antes.
+"""
+import os
+import re
+import sys
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+
+from app.services.moderation import spanlp_service
+
+logger = logging.getLogger(__name__)
+
+# Tope de memoria de los lexicones por locale cargados (el último cargado nunca se desaloja)
+LOCALE_LEXICON_MAX_MB = float(os.getenv("LOCALE_LEXICON_MAX_MB", "16"))
+
+_PAISES_INGLES = {"us", "gb", "ca", "au", "nz", "ie"}
+_CLUB_EN_OBJETO_RE = re.compile(r"(?:^|/)club_(\d+)_")
+
+
+class LexiconLocale(NamedTuple):
+    locale: str
+    pais: Optional[str]
+    # IndiceFormas de moderation_scanner (autómatas de la lista propia del locale)
+    indice: tuple
+    # (vocabulario, longitudes) del dataset spanlp del país ∪ global; None => alcanza el global
+    vocab_spanlp: Optional[tuple]
+    bytes_estimados: int
+
+
+_lexicones: "OrderedDict[str, LexiconLocale]" = OrderedDict()
+_lock = threading.Lock()
+_stats = {"hits": 0, "cargas": 0, "desalojos": 0}
+
+
+def locale_para_pais(pais: Optional[str]) -> Optional[str]:
+    """"AR" -> "es-AR", "US" -> "en"; sin país o desconocido -> None (solo listas globales)."""
+    codigo = re.sub(r"[^a-z]", "", (pais or "").lower())[-2:]
+    if codigo in spanlp_service._PAIS_A_DATASET:
+        return f"es-{codigo.upper()}"
+    if codigo in _PAISES_INGLES:
+        return "en"
+    return None
+
+
+def club_id_de_video(video) -> Optional[int]:
+    """Video.club_id, o el club codificado en el object name (uploads/club_{id}_...)."""
+    if getattr(video, "club_id", None):
+        return video.club_id
+    m = _CLUB_EN_OBJETO_RE.search(getattr(video, "gcs_object_name", None) or "")
+    return int(m.group(1)) if m else None
+
+
+def locale_para_video(video) -> Optional[str]:
+    """Locale de moderación del video según el país de su club (None sin club o sin país). Requiere app context."""
+    club_id = club_id_de_video(video)
+    if club_id is None:
+        return None
+    try:
+        from app import db
+        from app.models.club import Club
+        club = db.session.get(Club, club_id)
+        return locale_para_pais(club.pais if club else None)
+    except Exception as e:
+        logger.warning(f"[LOCALE] No se pudo resolver el país del club {club_id}: {e}")
+        return None
+
+
+def _tamano_vocab(vocab: Optional[tuple]) -> int:
+    if vocab is None:
+        return 0
+    palabras, _ = vocab
+    return sys.getsizeof(palabras) + sum(sys.getsizeof(w) for w in palabras)
+
+
+def _vocab_spanlp(pais: Optional[str]) -> Optional[tuple]:
+    """
+    Vocabulario spanlp de un locale: dataset del país ∪ global. None si el global ya lo
+    contiene (el caso normal: el escáner usa directamente el vocabulario global).
+    """
+    vocab_pais = spanlp_service.vocabulario_pais(pais) if pais else None
+    if vocab_pais is None:
+        return None
+    vocab_global = spanlp_service.vocabulario_global()
+    if vocab_global is None:
+        return vocab_pais
+    if vocab_pais[0] <= vocab_global[0]:
+        return None
+    palabras = vocab_pais[0] | vocab_global[0]
+    return palabras, tuple(sorted({len(w) for w in palabras}))
+
+
+def _compilar(locale: str) -> LexiconLocale:
+    from app.services.moderation.moderation_scanner import GRUPO_LISTA_LOCALE, _RANGO_FUENTE, compilar_formas
+    from app.services.moderation.text_detection_service import _load_bad_words
+
+    palabras = _load_bad_words(locale).get(locale, [])
+    indice = compilar_formas(
+        (palabra, "lista", locale, (_RANGO_FUENTE["lista"], GRUPO_LISTA_LOCALE, i))
+        for i, palabra in enumerate(palabras)
+    )
+    pais = locale.split("-")[1].lower() if "-" in locale else None
+    vocab = _vocab_spanlp(pais)
+
+    tamano = indice.ac_leet.bytes_estimados() + indice.ac_compacto.bytes_estimados()
+    tamano += sum(sys.getsizeof(d) for d in (indice.literales, indice.entradas, indice.compactas, indice.sin_separadores))
+    tamano += _tamano_vocab(vocab)
+    return LexiconLocale(locale, pais, indice, vocab, tamano)
+
+
+def obtener_lexicon_locale(locale: Optional[str]) -> Optional[LexiconLocale]:
+    """Lexicón compilado del locale (se compila en el primer uso). None si no hay locale."""
+    if not locale:
+        return None
+    with _lock:
+        lex = _lexicones.get(locale)
+        if lex is not None:
+            _lexicones.move_to_end(locale)
+            _stats["hits"] += 1
+            return lex
+
+    try:
+        lex = _compilar(locale)
+    except Exception as e:
+        logger.warning(f"[LOCALE] No se pudo compilar el lexicón de {locale}: {e}")
+        return None
+
+    tope = LOCALE_LEXICON_MAX_MB * 1024 * 1024
+    with _lock:
+        if locale in _lexicones:
+            return _lexicones[locale]
+        _lexicones[locale] = lex
+        _stats["cargas"] += 1
+        while len(_lexicones) > 1 and sum(l.bytes_estimados for l in _lexicones.values()) > tope:
+            desalojado, _ = _lexicones.popitem(last=False)
+            _stats["desalojos"] += 1
+            logger.info(f"[LOCALE] Lexicón {desalojado} desalojado por tope de memoria")
+    logger.info(f"[LOCALE] Lexicón {locale} compilado: {len(lex.indice.entradas)} formas, "
+                f"spanlp={'país+global' if lex.vocab_spanlp else 'global'}, ~{lex.bytes_estimados // 1024} KB")
+    return lex
+
+
+def obtener_estadisticas_locales() -> Dict:
+    with _lock:
+        cargados = {l.locale: l.bytes_estimados for l in _lexicones.values()}
+        stats = dict(_stats)
+    stats["cargados"] = list(cargados)
+    stats["bytes"] = sum(cargados.values())
+    stats["max_bytes"] = int(LOCALE_LEXICON_MAX_MB * 1024 * 1024)
+    return stats
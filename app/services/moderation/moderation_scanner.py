@@ -0,0 +1,351 @@
+# app/services/moderation/moderation_scanner.py
+"""
+Escáner unificado de moderación local: lista manual (PALABRAS_SOECES), badwords_service y spanlp.
+
+En lugar de tres recorridos independientes sobre el mismo texto y una fusión posterior:
+- el texto se normaliza una vez (minúsculas, sin acentos, leet y repeticiones como normalizar_texto),
+  más una vista compacta sin separadores ni letras repetidas para ofuscaciones ("p u t a", "miiierda"),
+- se tokeniza una vez (para spanlp, que trabaja por token),
+- la lista manual y badwords se buscan juntas en un índice combinado (Aho-Corasick) donde
+  cada forma normalizada guarda su fuente y categoría; frases de varias palabras incluidas.
+
+La vista compacta solo se recorre si el texto puede tener ofuscaciones que la vista leet
+no ve (letras duplicadas o fragmentos cortos seguidos), y su alineación por palabra solo
+se arma cuando aparece un candidato a validar: el texto de estadio típico paga una sola pasada.
+
+El índice se reconstruye solo cuando cambia alguno de los lexicones. Las listas propias
+de cada locale (y el dataset spanlp de su país) viven en locale_lexicon_service.
+"""
+import logging
+import os
+import re
+import threading
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from app.services.moderation import badwords_service, locale_lexicon_service, spanlp_service
+from app.services.moderation.aho_corasick import AhoCorasick
+from app.services.moderation.lexico_base import LEET_MAP, PALABRAS_SOECES, calcular_nivel_problema, normalizar_texto
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"\w+", flags=re.UNICODE)
+_REPETICIONES_RE = re.compile(r"(.)\1{2,}", flags=re.DOTALL)
+_DIACRITICOS_RE = re.compile("[\u0300-\u036f]")
+# Vista compacta con dos sustituciones en C: letras repetidas (siempre dentro de una palabra)
+# y separadores; [^\W_] es exactamente str.isalnum
+_DUPLICADAS_RE = re.compile(r"([^\W_])\1+")
+_SEPARADORES_RE = re.compile(r"[\W_]+")
+
+# Caracteres que normalizar_texto reemplaza (leet). Una palabra del lexicón que los contiene
+# (p. ej. "c4", "ak47") se busca tal cual: normalizada colisionaría con texto común ("ca").
+_LEET_CHARS = set("013457@$!")
+
+# Orden de salida: igual que la fusión histórica (lista -> spanlp -> badwords)
+_RANGO_FUENTE = {"lista": 0, "spanlp": 1, "badwords": 2}
+# La lista del locale va antes que la manual general (misma prioridad que tenía por locale)
+GRUPO_LISTA_LOCALE = -1
+
+# Vista compacta (tolerante a ofuscación): sin separadores, leet aplicado y letras repetidas
+# colapsadas. "p u t a", "p.u.t.4" y "miiierda" se buscan contra las mismas formas.
+ENABLE_OBFUSCATION_MATCHING = os.getenv("ENABLE_OBFUSCATION_MATCHING", "true").lower() in ("1", "true", "yes")
+# Largo máximo de cada fragmento cuando una coincidencia une varias palabras ("p u t a", "mi er da")
+OFUSCACION_MAX_FRAGMENTO = int(os.getenv("OFUSCACION_MAX_FRAGMENTO", "2"))
+# Formas compactas más cortas no se buscan uniendo palabras (demasiados falsos positivos)
+_MIN_COMPACTA_MULTIPALABRA = 3
+
+
+class IndiceFormas(NamedTuple):
+    # Autómata de la vista leet; incluye cada forma con separadores también sin ellos
+    ac_leet: AhoCorasick
+    # Formas con caracteres leet ("c4", "ak47"): pocas, se buscan con `in` sobre la vista literal
+    literales: Tuple[str, ...]
+    # Autómata sobre la vista compacta; compactas: forma compacta -> [(forma, largos de sus rachas)]
+    ac_compacto: AhoCorasick
+    compactas: dict
+    # forma sin separadores -> formas que la generan ("hijodeputa" -> {"hijo de puta"})
+    sin_separadores: dict
+    # forma normalizada -> [(orden, palabra original, fuente, categoría, clave de fusión)]
+    entradas: dict
+
+
+class VistaCompacta(NamedTuple):
+    texto: str
+    # Por cada carácter de `texto`: largo de la racha original y palabra de origen
+    rachas: List[int]
+    palabra: List[int]
+    # Por palabra: primer y último índice en `texto` y su largo en caracteres
+    inicio: List[int]
+    fin: List[int]
+    largo: List[int]
+
+
+_indice = {"clave": None, "indice": None}
+_indice_lock = threading.Lock()
+
+
+def _sin_acentos_ni_repeticiones(texto: str) -> str:
+    """normalizar_texto sin el mapeo leet: minúsculas, sin acentos, máx. 2 repeticiones seguidas."""
+    t = _DIACRITICOS_RE.sub("", unicodedata.normalize("NFD", texto.lower()))
+    return _REPETICIONES_RE.sub(r"\1\1", t)
+
+
+def _vistas_texto(texto: str) -> Tuple[str, str]:
+    """(vista literal sin acentos, vista con leet) a partir de una sola normalización."""
+    literal = _sin_acentos_ni_repeticiones(texto)
+    return literal, literal.translate(LEET_MAP)
+
+
+def _compactar_forma(forma: str) -> Tuple[str, Tuple[int, ...]]:
+    """Forma del lexicón -> (compacta sin separadores ni repeticiones, largo de cada racha)."""
+    compacta: List[str] = []
+    rachas: List[int] = []
+    for c in forma:
+        if not c.isalnum():
+            continue
+        if compacta and compacta[-1] == c:
+            rachas[-1] += 1
+        else:
+            compacta.append(c)
+            rachas.append(1)
+    return "".join(compacta), tuple(rachas)
+
+
+def _texto_compacto(leet: str) -> str:
+    """VistaCompacta.texto sin armar la alineación (suficiente para buscar candidatos)."""
+    return _SEPARADORES_RE.sub("", _DUPLICADAS_RE.sub(r"\1", leet))
+
+
+def _vista_compacta(leet: str) -> VistaCompacta:
+    """
+    Una pasada sobre la vista leet: descarta separadores, colapsa repeticiones dentro de
+    cada palabra y recuerda de qué palabra viene cada carácter para poder alinear.
+    Solo se arma cuando la vista compacta tiene un candidato que validar.
+    """
+    texto: List[str] = []
+    rachas: List[int] = []
+    palabra: List[int] = []
+    inicio: List[int] = []
+    fin: List[int] = []
+    largo: List[int] = []
+    en_palabra = False
+    for c in leet:
+        if not c.isalnum():
+            en_palabra = False
+            continue
+        if not en_palabra:
+            en_palabra = True
+            inicio.append(len(texto))
+            fin.append(len(texto))
+            largo.append(0)
+        p = len(largo) - 1
+        largo[p] += 1
+        if texto and palabra[-1] == p and texto[-1] == c:
+            rachas[-1] += 1
+        else:
+            texto.append(c)
+            rachas.append(1)
+            palabra.append(p)
+        fin[p] = len(texto) - 1
+    return VistaCompacta("".join(texto), rachas, palabra, inicio, fin, largo)
+
+
+@lru_cache(maxsize=4)
+def _re_ofuscacion(max_fragmento: int):
+    """
+    Lo único que la vista compacta agrega a la vista leet (con las formas sin separadores):
+    letras duplicadas dentro de una palabra o dos palabras seguidas de fragmentos cortos.
+    """
+    alnum, sep = r"[^\W_]", r"[\W_]"
+    corta = f"(?<!{alnum}){alnum}{{1,{max_fragmento}}}(?!{alnum})"
+    return re.compile(f"({alnum})\\1|{corta}{sep}+{corta}")
+
+
+def _requiere_vista_compacta(leet: str) -> bool:
+    return _re_ofuscacion(OFUSCACION_MAX_FRAGMENTO).search(leet) is not None
+
+
+def _coincidencia_valida(vista: VistaCompacta, ini: int, fin: int, rachas_forma: Tuple[int, ...]) -> bool:
+    """
+    Acepta una coincidencia [ini, fin) de la vista compacta si:
+    - el texto solo estira letras respecto de la forma ("miierda" sí, "pera" no es "perra"), y
+    - dentro de una palabra, o bien uniendo palabras alineadas a sus bordes cuyos
+      fragmentos son cortos ("p u t a", "mi er da"), nunca a mitad de palabras normales.
+    """
+    for k, minimo in enumerate(rachas_forma):
+        if vista.rachas[ini + k] < minimo:
+            return False
+    p0, p1 = vista.palabra[ini], vista.palabra[fin - 1]
+    if p0 == p1:
+        return True
+    if fin - ini < _MIN_COMPACTA_MULTIPALABRA:
+        return False
+    if vista.inicio[p0] != ini or vista.fin[p1] != fin - 1:
+        return False
+    return all(vista.largo[p] <= OFUSCACION_MAX_FRAGMENTO for p in range(p0, p1 + 1))
+
+
+def _clave_indice(lexicon_badwords):
+    # Se calcula en cada escaneo: tuplas armadas en C, sin recorrer las listas
+    return tuple(PALABRAS_SOECES), tuple(map(len, PALABRAS_SOECES.values())), lexicon_badwords.version
+
+
+def compilar_formas(items: Iterable[Tuple[str, str, str, Tuple[int, int, int]]]) -> IndiceFormas:
+    """
+    items: (palabra, fuente, categoría, orden). Compila los autómatas de las tres vistas.
+    Las formas con caracteres leet se buscan aparte sobre la vista literal
+    (y no entran a la vista compacta, que aplica leet).
+    """
+    entradas: Dict[str, List[Tuple[Tuple[int, int, int], str, str, str, str]]] = {}
+    literales, con_leet = set(), set()
+
+    for palabra, fuente, categoria, orden in items:
+        literal = _sin_acentos_ni_repeticiones(palabra)
+        if not literal:
+            continue
+        if _LEET_CHARS & set(literal):
+            forma = literal
+            literales.add(forma)
+        else:
+            forma = literal.translate(LEET_MAP)
+            con_leet.add(forma)
+        entradas.setdefault(forma, []).append((orden, palabra, fuente, categoria, normalizar_texto(palabra)))
+
+    compactas: Dict[str, List[Tuple[str, Tuple[int, ...]]]] = {}
+    sin_separadores: Dict[str, Set[str]] = {}
+    for forma in con_leet:
+        compacta, rachas = _compactar_forma(forma)
+        if compacta:
+            compactas.setdefault(compacta, []).append((forma, rachas))
+        # "hijodeputa" dentro de una palabra es coincidencia compacta de "hijo de puta":
+        # se busca en la misma pasada de la vista leet
+        pegada = "".join(c for c in forma if c.isalnum())
+        if pegada and pegada != forma:
+            sin_separadores.setdefault(pegada, set()).add(forma)
+
+    return IndiceFormas(
+        AhoCorasick(con_leet | sin_separadores.keys()), tuple(sorted(literales)),
+        AhoCorasick(compactas.keys()), compactas, sin_separadores, entradas
+    )
+
+
+def _construir_indice(lexicon_badwords):
+    def _items():
+        # Lista manual: "español" -> (es), "inglés" -> (en), resto con su clave
+        etiquetas = {"español": "es", "inglés": "en"}
+        for g, (idioma, palabras) in enumerate(PALABRAS_SOECES.items()):
+            for i, palabra in enumerate(palabras):
+                yield palabra, "lista", etiquetas.get(idioma, idioma), (_RANGO_FUENTE["lista"], g, i)
+
+        for g, (categoria, palabras) in enumerate(lexicon_badwords.badwords.items()):
+            for i, palabra in enumerate(palabras):
+                yield palabra, "badwords", categoria, (_RANGO_FUENTE["badwords"], g, i)
+
+    return compilar_formas(_items())
+
+
+def _get_indice() -> IndiceFormas:
+    lexicon_badwords = badwords_service.obtener_lexicon()
+    clave = _clave_indice(lexicon_badwords)
+    indice = _indice["indice"]
+    if _indice["clave"] == clave:
+        return indice
+    with _indice_lock:
+        if _indice["clave"] != clave:
+            indice = _construir_indice(lexicon_badwords)
+            _indice.update(clave=clave, indice=indice)
+            logger.info(f"[SCANNER] Índice de moderación construido: {len(indice.entradas)} formas")
+        return _indice["indice"]
+
+
+def _formas_presentes(indice: IndiceFormas, literal: str, leet: str, compacto: Optional[str]) -> Set[str]:
+    formas: Set[str] = set()
+    for patron in indice.ac_leet.buscar(leet):
+        if patron in indice.entradas:
+            formas.add(patron)
+        if ENABLE_OBFUSCATION_MATCHING and patron in indice.sin_separadores:
+            formas |= indice.sin_separadores[patron]
+    formas.update(forma for forma in indice.literales if forma in literal)
+    if compacto:
+        vista = None
+        for fin, compacta in indice.ac_compacto.iter_coincidencias(compacto):
+            for forma, rachas in indice.compactas[compacta]:
+                if forma in formas:
+                    continue
+                if vista is None:
+                    vista = _vista_compacta(leet)
+                if _coincidencia_valida(vista, fin - len(compacta), fin, rachas):
+                    formas.add(forma)
+    return formas
+
+
+def _spanlp_en_tokens(tokens: List[str], vocab) -> List[str]:
+    """
+    Tokens detectados por spanlp (en minúsculas, en orden de primera aparición), buscando
+    directo en el vocabulario congelado. Sin vocabulario se delega en detectar_en_tokens.
+    """
+    if vocab is None:
+        return spanlp_service.detectar_en_tokens(tokens)
+    palabras, longitudes = vocab
+    en_vocabulario = spanlp_service.token_en_vocabulario
+    found: List[str] = []
+    vistos: Set[str] = set()
+    for t in tokens:
+        tl = t.lower()
+        if tl not in vistos:
+            vistos.add(tl)
+            if en_vocabulario(tl, palabras, longitudes):
+                found.append(tl)
+    return found
+
+
+def escanear_texto(texto: str, locale: Optional[str] = None) -> Dict:
+    """
+    Un solo escaneo de moderación local.
+    Con 'locale' (p. ej. "es-AR", el del club) se suma la lista de ese locale; spanlp usa
+    el dataset de su país más el global, como la fusión histórica.
+    Retorna:
+      - "palabras": palabras únicas (por forma normalizada), en el orden lista -> spanlp -> badwords
+      - "detalle": [{"palabra", "fuente", "categoria"}] de todas las coincidencias
+      - "nivel": limpio | sospechoso | problematico
+    """
+    if not texto:
+        return {"palabras": [], "detalle": [], "nivel": "limpio"}
+
+    indice = _get_indice()
+    literal, leet = _vistas_texto(texto)
+    compacto = _texto_compacto(leet) if ENABLE_OBFUSCATION_MATCHING and _requiere_vista_compacta(leet) else None
+
+    formas = _formas_presentes(indice, literal, leet, compacto)
+    coincidencias = [e for forma in formas for e in indice.entradas[forma]]
+
+    lexicon_locale = locale_lexicon_service.obtener_lexicon_locale(locale) if locale else None
+    if lexicon_locale is not None:
+        formas = _formas_presentes(lexicon_locale.indice, literal, leet, compacto)
+        coincidencias.extend(e for forma in formas for e in lexicon_locale.indice.entradas[forma])
+
+    # spanlp trabaja por token: se tokeniza una sola vez
+    vocab = lexicon_locale.vocab_spanlp if lexicon_locale is not None else None
+    if vocab is None:
+        vocab = spanlp_service.vocabulario_global()
+    for i, token in enumerate(_spanlp_en_tokens(_WORD_RE.findall(texto), vocab)):
+        coincidencias.append(((_RANGO_FUENTE["spanlp"], 0, i), token, "spanlp", "global", normalizar_texto(token)))
+
+    coincidencias.sort(key=lambda c: c[0])
+
+    # Una palabra por forma normalizada; si varias comparten forma ("folle"/"follé"),
+    # se muestra la que aparece tal cual en el texto
+    texto_min = texto.lower()
+    palabras: List[str] = []
+    posicion: Dict[str, int] = {}
+    detalle = []
+    for _, palabra, fuente, categoria, clave in coincidencias:
+        detalle.append({"palabra": palabra, "fuente": fuente, "categoria": categoria})
+        if clave not in posicion:
+            posicion[clave] = len(palabras)
+            palabras.append(palabra)
+        elif palabras[posicion[clave]] not in texto_min and palabra in texto_min:
+            palabras[posicion[clave]] = palabra
+
+    return {"palabras": palabras, "detalle": detalle, "nivel": calcular_nivel_problema(palabras)}
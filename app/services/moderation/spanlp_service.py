@@ -11,6 +11,9 @@ Características:
 API:
     detectar_palabras(texto: str, country: Optional[str] = None) -> List[str]
     detectar_palabras_struct(texto: str, country: Optional[str] = None) -> List[Dict[str, Any]]
+    detectar_en_tokens(tokens: Iterable[str]) -> List[str]
+    vocabulario_pais(country: str) -> Optional[Tuple[FrozenSet[str], Tuple[int, ...]]]
+    vocabulario_global() -> Optional[Tuple[FrozenSet[str], Tuple[int, ...]]]
 
 Ejemplos:
     detectar_palabras("Hijos de puta de mierda")
@@ -23,8 +26,12 @@ Ejemplos:
 from __future__ import annotations
 
 import logging
+import os
 import re
-from typing import Any, Dict, List, Optional, Set
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
@@ -32,19 +39,44 @@ logger.addHandler(logging.NullHandler())
 # --- Import de spanlp con tolerancia ---
 try:
     from spanlp.palabrota import Palabrota  # type: ignore
+    from spanlp.domain.countries import Country  # type: ignore
     SPANLP_AVAILABLE: bool = True
 except Exception:
     Palabrota = None  # type: ignore[assignment]
+    Country = None  # type: ignore[assignment]
     SPANLP_AVAILABLE = False
     logger.warning("spanlp no está disponible. El wrapper funcionará en modo inactivo.")
 
 # --- Cache de detectores (global y por país) ---
 _palabrota_global: Optional[Any] = None
-_palabrota_by_country: Dict[str, Any] = {}
+# LRU país -> detector, acotado: cada detector arrastra su vocabulario congelado
+SPANLP_MAX_PAISES = max(1, int(os.getenv("SPANLP_MAX_PAISES", "4")))
+_palabrota_by_country: "OrderedDict[str, Any]" = OrderedDict()
+_paises_lock = threading.Lock()
+
+# Código ISO de 2 letras -> archivo del dataset de spanlp (Country.value)
+_PAIS_A_DATASET = {
+    "ar": "ARG", "bo": "BOL", "cl": "CHL", "co": "COL", "cr": "CRI", "cu": "CUB", "do": "DOM",
+    "ec": "ECU", "es": "ESP", "gq": "GNQ", "gt": "GTM", "hn": "HND", "mx": "MEX", "ni": "NIC",
+    "pa": "PAN", "pe": "PER", "pr": "PRI", "py": "PRY", "sv": "SLV", "uy": "URY", "ve": "VEN",
+}
 
 # --- Regex de tokenización unicode (palabras) ---
 _WORD_RE = re.compile(r"\w+", flags=re.UNICODE)
 
+# --- Snapshot del vocabulario por detector ---
+# contains_palabrota(t) relee los .txt del dataset y aplica una regex por palabra en cada
+# llamada. Su semántica es "alguna palabra del dataset aparece (sin distinguir mayúsculas)
+# dentro de t", así que se congela el vocabulario en un frozenset y se buscan los
+# substrings del token con las longitudes presentes en el vocabulario.
+# id(detector) -> (vocabulario, longitudes) o None si no se pudo congelar
+_vocabularios: Dict[int, Optional[Tuple[FrozenSet[str], Tuple[int, ...]]]] = {}
+_vocabularios_lock = threading.Lock()
+
+# LRU token -> bool para detectores que no se pudieron congelar (delegan en spanlp)
+SPANLP_TOKEN_CACHE_SIZE = int(os.getenv("SPANLP_TOKEN_CACHE_SIZE", "20000"))
+_detectores_por_id: Dict[int, Any] = {}
+
 
 def _normalize_country(country: Optional[str]) -> Optional[str]:
     """
@@ -78,22 +110,140 @@ def _get_detector_global() -> Optional[Any]:
 
 def _get_detector_country(country: str) -> Optional[Any]:
     """
-    Devuelve/cacha el detector para un país. Si falla, retorna None.
+    Devuelve/cacha (LRU de SPANLP_MAX_PAISES) el detector con solo el dataset de un país.
+    Si el país no tiene dataset o falla, retorna None.
     """
     if not SPANLP_AVAILABLE or Palabrota is None:
         return None
     c = country.lower()
-    if c in _palabrota_by_country:
-        return _palabrota_by_country[c]
+    with _paises_lock:
+        if c in _palabrota_by_country:
+            _palabrota_by_country.move_to_end(c)
+            return _palabrota_by_country[c]
+    if c not in _PAIS_A_DATASET:
+        return None
     try:
-        detector = Palabrota(country=c)
-        _palabrota_by_country[c] = detector
-        logger.info("Inicializado Palabrota para país=%s", c)
-        return detector
+        detector = Palabrota(countries=[Country(_PAIS_A_DATASET[c])])
     except Exception as e:
         logger.warning("No se pudo inicializar Palabrota para país=%s: %s", c, e)
         return None
 
+    with _paises_lock:
+        if c in _palabrota_by_country:
+            return _palabrota_by_country[c]
+        _palabrota_by_country[c] = detector
+        while len(_palabrota_by_country) > SPANLP_MAX_PAISES:
+            _, desalojado = _palabrota_by_country.popitem(last=False)
+            _olvidar_detector(desalojado)
+    logger.info("Inicializado Palabrota para país=%s", c)
+    return detector
+
+
+def _olvidar_detector(detector: Any):
+    """Libera el vocabulario de un detector desalojado (su id() puede reutilizarse)."""
+    clave = id(detector)
+    with _vocabularios_lock:
+        _vocabularios.pop(clave, None)
+        if _detectores_por_id.pop(clave, None) is not None:
+            _contiene_palabrota_cacheado.cache_clear()
+
+
+def vocabulario_pais(country: str) -> Optional[Tuple[FrozenSet[str], Tuple[int, ...]]]:
+    """(vocabulario, longitudes) del dataset de un país, o None si no hay detector para él."""
+    code = _normalize_country(country)
+    detector = _get_detector_country(code) if code else None
+    return _vocabulario(detector) if detector is not None else None
+
+
+def vocabulario_global() -> Optional[Tuple[FrozenSet[str], Tuple[int, ...]]]:
+    """(vocabulario, longitudes) del detector global, o None si no hay spanlp o no se pudo congelar."""
+    detector = _get_detector_global()
+    return _vocabulario(detector) if detector is not None else None
+
+
+def _congelar_vocabulario(detector: Any) -> Optional[Tuple[FrozenSet[str], Tuple[int, ...]]]:
+    """
+    Lee una sola vez los datasets de los países del detector (más include, menos exclude)
+    y arma el frozenset en minúsculas. Retorna None si el detector usa una métrica de
+    distancia (no equivale a substring) o si no se reconoce su estructura.
+    """
+    try:
+        if getattr(detector, "_distance_metric", None):
+            return None
+        import spanlp.palabrota as _sp  # type: ignore
+        carpeta = os.path.join(os.path.dirname(_sp.__file__), "dataset")
+        excluir = set(getattr(detector, "_exclude", None) or [])
+        palabras: Set[str] = set()
+        for pais in getattr(detector, "_countries"):
+            ruta = os.path.join(carpeta, f"{pais.value}.txt")
+            if not os.path.isfile(ruta):
+                continue
+            with open(ruta, encoding="utf-8") as f:
+                for linea in f:
+                    linea = linea.rstrip("\n")
+                    if linea and linea not in excluir and linea.strip():
+                        palabras.add(linea.strip().lower())
+        palabras.update(w.lower() for w in (getattr(detector, "_include", None) or []) if w)
+        if not palabras:
+            return None
+        return frozenset(palabras), tuple(sorted({len(w) for w in palabras}))
+    except Exception as e:
+        logger.warning("No se pudo congelar el vocabulario de spanlp: %s", e)
+        return None
+
+
+def _vocabulario_desde_artefacto() -> Optional[Tuple[FrozenSet[str], Tuple[int, ...]]]:
+    """Vocabulario global ya congelado en el artefacto precompilado (sin leer el dataset)."""
+    from app.services.moderation.lexicon_artifact import obtener_artefacto
+    artefacto = obtener_artefacto()
+    seccion = artefacto.seccion("spanlp:global") if artefacto is not None else None
+    if not seccion:
+        return None
+    longitudes = seccion.meta.get("longitudes") or sorted({len(w) for w in seccion})
+    return frozenset(seccion), tuple(longitudes)
+
+
+def _vocabulario(detector: Any) -> Optional[Tuple[FrozenSet[str], Tuple[int, ...]]]:
+    clave = id(detector)
+    if clave not in _vocabularios:
+        with _vocabularios_lock:
+            if clave not in _vocabularios:
+                vocab = None
+                if detector is _palabrota_global:
+                    vocab = _vocabulario_desde_artefacto()
+                if vocab is None:
+                    vocab = _congelar_vocabulario(detector)
+                _detectores_por_id[clave] = detector
+                _vocabularios[clave] = vocab
+                if vocab is not None:
+                    logger.info("Vocabulario spanlp congelado: %d palabras", len(vocab[0]))
+    return _vocabularios[clave]
+
+
+def token_en_vocabulario(token: str, vocab: FrozenSet[str], longitudes: Tuple[int, ...]) -> bool:
+    """True si algún substring del token (en minúsculas) está en el vocabulario."""
+    n = len(token)
+    for largo in longitudes:
+        if largo > n:
+            break
+        for i in range(n - largo + 1):
+            if token[i:i + largo] in vocab:
+                return True
+    return False
+
+
+@lru_cache(maxsize=SPANLP_TOKEN_CACHE_SIZE)
+def _contiene_palabrota_cacheado(id_detector: int, token: str) -> bool:
+    return bool(_detectores_por_id[id_detector].contains_palabrota(token))
+
+
+def _contiene_palabrota(detector: Any, token: str) -> bool:
+    """Equivalente a detector.contains_palabrota(token), sin releer el dataset por token."""
+    vocab = _vocabulario(detector)
+    if vocab is not None:
+        return token_en_vocabulario(token.lower(), *vocab)
+    return _contiene_palabrota_cacheado(id(detector), token)
+
 
 def _detect_with(detector: Any, texto: str) -> Set[str]:
     """
@@ -105,9 +255,13 @@ def _detect_with(detector: Any, texto: str) -> Set[str]:
         return found
     try:
         tokens = _WORD_RE.findall(texto)
+        vistos: Set[str] = set()
         for t in tokens:
+            if t in vistos:
+                continue
+            vistos.add(t)
             try:
-                if detector.contains_palabrota(t):
+                if _contiene_palabrota(detector, t):
                     found.add(t.lower())
             except Exception:
                 # Si falla en un token, continuamos con los demás
@@ -117,6 +271,31 @@ def _detect_with(detector: Any, texto: str) -> Set[str]:
     return found
 
 
+def detectar_en_tokens(tokens: Iterable[str]) -> List[str]:
+    """
+    Variante para quien ya tokenizó el texto (p. ej. el escáner unificado):
+    consulta el detector global una sola vez por token distinto.
+    Devuelve los tokens detectados en minúsculas, en orden de primera aparición.
+    """
+    det_global = _get_detector_global()
+    if not det_global:
+        return []
+
+    found: List[str] = []
+    vistos: Set[str] = set()
+    for t in tokens:
+        tl = t.lower()
+        if tl in vistos:
+            continue
+        vistos.add(tl)
+        try:
+            if _contiene_palabrota(det_global, t):
+                found.append(tl)
+        except Exception:
+            continue
+    return found
+
+
 def detectar_palabras_struct(texto: str, country: Optional[str] = None) -> List[Dict[str, Any]]:
     """
     Devuelve lista de dicts con detecciones:
@@ -175,4 +354,5 @@ def detectar_palabras(texto: str, country: Optional[str] = None) -> List[str]:
     return result
 
 
-__all__ = ["detectar_palabras", "detectar_palabras_struct"]
+__all__ = ["detectar_palabras", "detectar_palabras_struct", "detectar_en_tokens", "vocabulario_pais",
+           "vocabulario_global"]
@@ -1,9 +1,11 @@
 # app/services/text_detection_service.py
 import os
+import re
 import time
 import logging
 import tempfile
-from typing import Dict, List, Optional
+import math
+from typing import Dict, List, Optional, Tuple
 from google.cloud import vision
 from google.oauth2 import service_account
 import cv2
@@ -13,9 +15,15 @@ from app.services.core.logging_service import audit_logger
 from app.services.moderation import spanlp_service
 # Natural Language API
 import unicodedata
+import hashlib
+import threading
 from functools import lru_cache
 from google.cloud import language_v2 as language
+from app.services.core.cache_service import CacheTTL
 from app.services.moderation import badwords_service
+from app.services.moderation import moderation_scanner
+from app.services.moderation.lexico_base import PALABRAS_SOECES, calcular_nivel_problema, normalizar_texto
+from app.services.gcp.gcs_service import obtener_url_lectura_gcs_uri, _get_storage_client
 
 
 PROVIDER = os.getenv("TEXT_MOD_PROVIDER", "language_v2").lower()
@@ -23,6 +31,51 @@ ENABLE_MOD = os.getenv("ENABLE_TEXT_MODERATION", "true").lower() in ("1", "true"
 TH_SUS = float(os.getenv("PROFANITY_SUSPECT", "0.25"))
 TH_PROB = float(os.getenv("PROFANITY_PROBLEMATIC", "0.60"))
 LOCALE = os.getenv("BAD_WORDS_LOCALE", "es-AR")
+# Cache de resultados de Language v2 moderate_text (por proceso)
+LANGUAGE_CACHE_MAX_ENTRADAS = int(os.getenv("LANGUAGE_CACHE_MAX_ENTRADAS", "5000"))
+LANGUAGE_CACHE_TTL_SEG = float(os.getenv("LANGUAGE_CACHE_TTL_SEG", "86400"))
+# Escáner unificado (una normalización + un índice combinado) en lugar de tres recorridos
+ENABLE_UNIFIED_SCANNER = os.getenv("ENABLE_UNIFIED_SCANNER", "true").lower() in ("1", "true", "yes")
+
+# Selección de frames para OCR: "uniforme" (por índice) o "tomas" (uno por toma de Video Intelligence)
+OCR_FRAME_SELECTION = os.getenv("OCR_FRAME_SELECTION", "uniforme").lower()
+OCR_MAX_FRAMES = int(os.getenv("OCR_MAX_FRAMES", "10"))
+
+# Presupuesto de frames por video según su duración: ceil(duración * OCR_FRAMES_POR_SEGUNDO)
+# acotado a [OCR_MIN_FRAMES, OCR_MAX_FRAMES]. Sin duración conocida se usa OCR_MAX_FRAMES.
+OCR_FRAMES_POR_SEGUNDO = float(os.getenv("OCR_FRAMES_POR_SEGUNDO", "0.2"))
+OCR_MIN_FRAMES = int(os.getenv("OCR_MIN_FRAMES", "3"))
+
+# Corte temprano: dejar de llamar a Vision cuando las listas ya dan 'problematico'
+OCR_EARLY_STOP = os.getenv("OCR_EARLY_STOP", "true").lower() in ("true", "1", "yes")
+
+# Backend OCR: "vision" (descarga + frames + Cloud Vision por frame) o
+# "video_intelligence" (TEXT_DETECTION dentro del mismo annotate_video)
+OCR_BACKEND = os.getenv("OCR_BACKEND", "vision").lower()
+
+# Frames por request de batch_annotate_images (Vision admite hasta 16 imágenes por llamada).
+# El corte temprano se evalúa entre lotes: lotes más chicos cortan antes pero hacen más llamadas.
+OCR_BATCH_SIZE = max(1, min(16, int(os.getenv("OCR_BATCH_SIZE", "5"))))
+
+# Dedup de frames por dHash antes del OCR: distancia de Hamming máxima (de 64 bits)
+# para considerar dos frames iguales. Negativo desactiva el dedup.
+OCR_DEDUP_HAMMING = int(os.getenv("OCR_DEDUP_HAMMING", "5"))
+
+# Origen del video para OCR: "stream" (ffmpeg lee por rangos desde una URL firmada,
+# solo se materializan los frames muestreados) o "descarga" (copia completa a /tmp).
+# Si el streaming no puede abrir el video se cae a descarga.
+OCR_VIDEO_SOURCE = os.getenv("OCR_VIDEO_SOURCE", "stream").lower()
+OCR_STREAM_TIMEOUT_MS = int(os.getenv("OCR_STREAM_TIMEOUT_MS", "15000"))
+
+# Extractor de frames: "seek" (cap.set + read por muestra), "secuencial" (una pasada
+# con grab() y retrieve() solo en las muestras) o "auto" (secuencial si la distancia
+# media entre muestras es <= OCR_SECUENCIAL_MAX_GAP frames; si no, seek).
+OCR_FRAME_EXTRACTOR = os.getenv("OCR_FRAME_EXTRACTOR", "auto").lower()
+OCR_SECUENCIAL_MAX_GAP = int(os.getenv("OCR_SECUENCIAL_MAX_GAP", "90"))
+
+
+class VideoNoDisponibleError(Exception):
+    """El decodificador no pudo abrir el video (URL o archivo)."""
 
 
 
@@ -33,38 +86,6 @@ logger = logging.getLogger(__name__)
 _GOOGLE_CRED_PATH = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
 BUCKET_NAME = os.getenv("GOOGLE_CLOUD_STORAGE_BUCKET", "accessfan-video")
 
-# Lista de palabras problemáticas (expandible)
-PALABRAS_SOECES = {
-    'español': [
-        'idiota', 'estúpido', 'imbécil', 'tarado', 'pendejo', 'cabrón',
-        'hijo de puta', 'puta', 'puto', 'marica', 'maricón', 'joto',
-        'culero', 'ojete', 'chingar', 'joder', 'mierda', 'cagada',
-        'huevón', 'güevón', 'baboso', 'mamón', 'cerdo', 'cochino', 'pelotudos','forros', 'cabrones',
-        # Agregar más según necesidades
-    ],
-    'inglés': [
-        'idiot', 'stupid', 'moron', 'dumbass', 'asshole', 'bastard',
-        'bitch', 'fuck', 'fucking', 'shit', 'damn', 'hell',
-        'crap', 'suck', 'sucks', 'gay', 'retard', 'loser',
-        'dickhead', 'motherfucker', 'son of a bitch', 'whore',
-        # Agregar más según necesidades
-    ]
-}
-
-_LEET_MAP = str.maketrans({"0":"o","1":"i","3":"e","4":"a","5":"s","7":"t","@":"a","$":"s","!":"i"})
-
-def _normalize(text: str) -> str:
-    t = text.lower()
-    t = unicodedata.normalize("NFD", t)
-    t = "".join(c for c in t if unicodedata.category(c) != "Mn")  # quita acentos
-    t = t.translate(_LEET_MAP)
-    out, prev, run = [], "", 0
-    for c in t:
-        if c == prev: run += 1
-        else: run, prev = 0, c
-        if run < 2: out.append(c)  # permite hasta 2 repeticiones
-    return "".join(out)
-
 @lru_cache(maxsize=8)
 def _load_bad_words(locale: str) -> Dict[str, list]:
     base = {
@@ -83,7 +104,7 @@ def _detectar_palabras_problematicas_normalizado(texto_norm: str, locale: str) -
     buckets = [locale, locale.split("-")[0], "es", "en"]  # prioridad local -> es/en
     for k in buckets:
         for w in lex.get(k, []):
-            w_norm = _normalize(w)
+            w_norm = normalizar_texto(w)
             if w_norm in texto_norm and w_norm not in seen:
                 found.append(w)
                 seen.add(w_norm)
@@ -111,6 +132,9 @@ def _client():
         _vision_client = _get_vision_client()
     return _vision_client
 
+# Etiqueta de país que agrega spanlp ("pelotudo (ar) [spanlp]")
+_TAG_PAIS_RE = re.compile(r"\s*\([a-z]{2}\)")
+
 def _fusionar_palabras(lista_local, lista_spanlp, lista_badwords):
     """
     Une resultados de lista manual, spanlp y badwords_service evitando duplicados.
@@ -119,19 +143,18 @@ def _fusionar_palabras(lista_local, lista_spanlp, lista_badwords):
     fusion = {}
 
     def limpiar_tag(w: str) -> str:
-        return (
+        return _TAG_PAIS_RE.sub("", (
             w.replace("(es)", "")
             .replace("(en)", "")
             .replace("(global)", "")
             .replace("[lista]", "")
             .replace("[spanlp]", "")
             .replace("[badwords]", "")
-            .strip()
-        )
+        )).strip()
 
     def agregar(words: List[str]):
         for w in words:
-            wn = _normalize(limpiar_tag(w))
+            wn = normalizar_texto(limpiar_tag(w))
             if wn not in fusion:   # evita duplicados
                 fusion[wn] = limpiar_tag(w)
 
@@ -141,12 +164,20 @@ def _fusionar_palabras(lista_local, lista_spanlp, lista_badwords):
 
     return list(fusion.values())
 
-def analizar_texto_en_video(gcs_uri: str, video_id: int = None) -> Dict:
+def analizar_texto_en_video(gcs_uri: str, video_id: int = None,
+                            tomas: Optional[List[Tuple[float, float]]] = None,
+                            duracion_seg: Optional[float] = None, locale: Optional[str] = None,
+                            timeout_sec: Optional[float] = None) -> Dict:
     """
     Analiza texto en frames (OCR) + modera con Language v2 (moderate_text)
     y combina con lista local, spanlp y badwords_service.
+    tomas: lista de (inicio_s, fin_s) de Video Intelligence; si se pasa, se toma un frame por toma.
+    duracion_seg: Video.duracion; define el presupuesto de frames (ver _presupuesto_frames).
+    locale: locale de moderación del club (ver locale_lexicon_service); None => solo listas globales.
+    timeout_sec: plazo total del OCR; acota la descarga, la lectura de frames y las llamadas a Vision.
     """
     start_time = time.time()
+    limite = start_time + timeout_sec if timeout_sec else None
 
     try:
         logger.info(f"Iniciando detección de texto para video: {gcs_uri}")
@@ -160,143 +191,265 @@ def analizar_texto_en_video(gcs_uri: str, video_id: int = None) -> Dict:
         # ---------- OCR ----------
         frames_analizados = 0
         todo_el_texto: List[str] = []
+        metricas_ocr: Dict = {}
+        frames_textos = None
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            video_path = os.path.join(temp_dir, "temp_video.mp4")
-
-            if not _descargar_video_desde_gcs(gcs_uri, video_path):
-                raise Exception("No se pudo descargar el video desde GCS")
-
-            frames_textos = _extraer_y_analizar_frames(video_path, max_frames=10)
-            frames_analizados = len(frames_textos)
-
-            for fragmento in frames_textos:
-                if fragmento:
-                    todo_el_texto.append(fragmento)
-
-        texto_completo = " ".join(todo_el_texto).strip()
-        texto_norm = texto_completo.lower() if texto_completo else ""
-
-        # ---------- Lista local + spanlp + badwords ----------
-        palabras_encontradas: List[str] = []
-        nivel_lista = "limpio"
-        if texto_norm:
-            # 1) Detectar con lista manual
-            palabras_locales = _detectar_palabras_problematicas(texto_norm)
-
-            # 2) Detectar con spanlp
-            palabras_spanlp = spanlp_service.detectar_palabras(texto_completo)
-
-            # 3) Detectar con badwords_service
-            bw_result = badwords_service.detect_badwords(texto_completo)
-            palabras_badwords = bw_result.get("found", [])
-
-
-            # 4) Unir todas las fuentes
-            palabras_encontradas = _fusionar_palabras(
-                palabras_locales, palabras_spanlp, palabras_badwords
-            )
-
-            # 5) Calcular nivel
-            nivel_lista = _calcular_nivel_problema(palabras_encontradas)
-
-        # ---------- Language v2: moderate_text ----------
-        nivel_api = "limpio"
-        score_api = 0.0
-        detalle_api: Dict = {}
-        top_cat = "profanity"
-
-        if os.getenv("ENABLE_MOD", "false").lower() in ("true", "1") and texto_completo:
+        if OCR_VIDEO_SOURCE == "stream":
             try:
-                res = _moderate_text_language_v2(texto_completo)
-                cats = {k.lower(): float(v) for k, v in res.get("raw", {}).items()}
-                nivel_api, top_cat, score_api, detalle_api = _nivel_api_desde_categorias(cats)
-            except Exception as me:
-                logger.warning(f"Moderation provider error: {me}")
-                nivel_api = "error"
-
-        # ---------- Fusión niveles ----------
-        def _combinar_niveles(n1, n2):
-            rank = {"limpio": 0, "sospechoso": 1, "problematico": 2, "error": -1}
-            return max([n1, n2], key=lambda n: rank.get(n, -1))
-
-        nivel_problema = _combinar_niveles(nivel_lista, nivel_api)
+                url = obtener_url_lectura_gcs_uri(gcs_uri)
+                frames_textos, metricas_ocr = _extraer_y_analizar_frames(
+                    url, tomas=tomas, duracion_seg=duracion_seg, locale=locale, limite=limite
+                )
+                metricas_ocr["fuente_video_ocr"] = "stream"
+            except Exception as e:
+                logger.warning(f"Streaming del video no disponible ({e}); se descarga a /tmp")
+
+        if frames_textos is None:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                video_path = os.path.join(temp_dir, "temp_video.mp4")
+
+                if not _descargar_video_desde_gcs(gcs_uri, video_path, timeout_sec=_restante(limite)):
+                    raise Exception("No se pudo descargar el video desde GCS")
+
+                try:
+                    frames_textos, metricas_ocr = _extraer_y_analizar_frames(
+                        video_path, tomas=tomas, duracion_seg=duracion_seg, locale=locale, limite=limite
+                    )
+                except VideoNoDisponibleError as e:
+                    logger.error(f"Error extrayendo frames: {str(e)}")
+                    frames_textos = []
+                metricas_ocr["fuente_video_ocr"] = "descarga"
+
+        frames_analizados = len(frames_textos)
+        for fragmento in frames_textos:
+            if fragmento:
+                todo_el_texto.append(fragmento)
+
+        return _moderar_texto_detectado(
+            todo_el_texto, frames_analizados, video_id, start_time, backend="vision", extra=metricas_ocr,
+            locale=locale
+        )
 
-        # Log de moderación
+    except Exception as e:
+        tiempo_procesamiento = time.time() - start_time
+        logger.error(f"Error en detección de texto: {str(e)}")
         audit_logger.log_error(
-            error_type="TEXT_MODERATION_RESULT",
-            message=f"nivel={nivel_problema}, top={top_cat}:{round(score_api, 3)}",
+            error_type="TEXT_DETECTION_ERROR",
+            message=f"Error en detección de texto: {str(e)}",
             video_id=video_id,
-            details={
-                "api_level": nivel_api,
-                "lista_level": nivel_lista,
-                "scores": detalle_api
-            }
+            details={"gcs_uri": gcs_uri, "tiempo_procesamiento": tiempo_procesamiento}
         )
+        return _resultado_texto_error(e, tiempo_procesamiento)
+
+def _resultado_texto_error(e: Exception, tiempo_procesamiento: float) -> Dict:
+    return {
+        "texto_detectado": "",
+        "frames_analizados": 0,
+        "palabras_problematicas": "",
+        "nivel_problema": "error",
+        "nivel_problema_lista": "error",
+        "nivel_problema_api": "error",
+        "profanity_score_api": 0.0,
+        "moderation_details": {},
+        "tiempo_procesamiento": round(tiempo_procesamiento, 2),
+        "texto_encontrado": False,
+        "llamadas_api_ocr": 0,
+        "frames_duplicados_omitidos": 0,
+        "frames_solicitados": 0,
+        "error": str(e),
+    }
 
-        tiempo_procesamiento = time.time() - start_time
-
-        # ---------- Resultado ----------
-        resultado = {
-            "texto_detectado": "; ".join(todo_el_texto) if todo_el_texto else "",
-            "frames_analizados": frames_analizados,
-            "palabras_problematicas": ", ".join(palabras_encontradas) if palabras_encontradas else "",
-            "nivel_problema": nivel_problema,
-            "nivel_problema_lista": nivel_lista,
-            "nivel_problema_api": nivel_api,
-            "profanity_score_api": round(score_api, 3),
-            "moderation_details": detalle_api,
-            "tiempo_procesamiento": round(tiempo_procesamiento, 2),
-            "texto_encontrado": bool(todo_el_texto),
-        }
+def analizar_texto_desde_anotaciones(text_annotations, video_id: int = None,
+                                     locale: Optional[str] = None) -> Dict:
+    """
+    Backend OCR "video_intelligence": arma el resultado a partir de los text_annotations
+    que devuelve annotate_video con TEXT_DETECTION, sin descargar ni decodificar el video.
+    frames_analizados = frames distintos en los que VI encontró texto.
+    """
+    start_time = time.time()
 
-        logger.info(f"Detección de texto completada en {tiempo_procesamiento:.2f}s")
-        logger.info(f"Frames analizados: {frames_analizados}")
-        logger.info(f"Texto encontrado: {len(todo_el_texto)} fragmentos")
-        logger.info(
-            f"Nivel (final): {nivel_problema} | API={nivel_api}({score_api:.3f} {top_cat}) | Lista={nivel_lista}"
+    try:
+        # Orden de aparición: primer segmento de cada anotación
+        anotaciones = []
+        frames_con_texto = set()
+        for ann in text_annotations or []:
+            texto = (getattr(ann, "text", "") or "").strip()
+            if not texto:
+                continue
+            inicio = None
+            for seg in getattr(ann, "segments", []) or []:
+                t = _offset_a_segundos(getattr(getattr(seg, "segment", None), "start_time_offset", None))
+                inicio = t if inicio is None else min(inicio, t)
+                for frame in getattr(seg, "frames", []) or []:
+                    frames_con_texto.add(round(_offset_a_segundos(getattr(frame, "time_offset", None)), 3))
+            anotaciones.append((inicio if inicio is not None else 0.0, texto))
+
+        anotaciones.sort(key=lambda a: a[0])
+        todo_el_texto: List[str] = []
+        vistos = set()
+        for _, texto in anotaciones:
+            clave = normalizar_texto(texto)
+            if clave not in vistos:
+                vistos.add(clave)
+                todo_el_texto.append(texto)
+
+        logger.info(f"[OCR-VI] {len(todo_el_texto)} fragmentos de texto en {len(frames_con_texto)} frames")
+        return _moderar_texto_detectado(
+            todo_el_texto, len(frames_con_texto), video_id, start_time, backend="video_intelligence",
+            locale=locale
         )
 
-        return resultado
-
     except Exception as e:
         tiempo_procesamiento = time.time() - start_time
-        logger.error(f"Error en detección de texto: {str(e)}")
+        logger.error(f"Error procesando text_annotations de Video Intelligence: {str(e)}")
         audit_logger.log_error(
             error_type="TEXT_DETECTION_ERROR",
-            message=f"Error en detección de texto: {str(e)}",
+            message=f"Error procesando text_annotations: {str(e)}",
             video_id=video_id,
-            details={"gcs_uri": gcs_uri, "tiempo_procesamiento": tiempo_procesamiento}
+            details={"backend": "video_intelligence", "tiempo_procesamiento": tiempo_procesamiento}
         )
-        return {
-            "texto_detectado": "",
-            "frames_analizados": 0,
-            "palabras_problematicas": "",
-            "nivel_problema": "error",
-            "nivel_problema_lista": "error",
-            "nivel_problema_api": "error",
-            "profanity_score_api": 0.0,
-            "moderation_details": {},
-            "tiempo_procesamiento": round(tiempo_procesamiento, 2),
-            "texto_encontrado": False,
-            "error": str(e),
+        return _resultado_texto_error(e, tiempo_procesamiento)
+
+def _offset_a_segundos(offset) -> float:
+    """Duration de proto-plus (timedelta) o protobuf (seconds/nanos) a segundos."""
+    if offset is None:
+        return 0.0
+    if hasattr(offset, "total_seconds"):
+        return offset.total_seconds()
+    return getattr(offset, "seconds", 0) + getattr(offset, "nanos", 0) / 1e9
+
+def _moderar_texto_detectado(todo_el_texto: List[str], frames_analizados: int,
+                             video_id: Optional[int], start_time: float, backend: str,
+                             extra: Optional[Dict] = None, locale: Optional[str] = None) -> Dict:
+    """
+    Moderación común a ambos backends OCR: lista local + spanlp + badwords
+    y Language v2 sobre el texto detectado. Arma el dict de resultado.
+    """
+    texto_completo = " ".join(todo_el_texto).strip()
+
+    # ---------- Lista local + spanlp + badwords ----------
+    palabras_encontradas, nivel_lista = _detectar_con_listas(texto_completo, locale)
+
+    # ---------- Language v2: moderate_text ----------
+    nivel_api = "limpio"
+    score_api = 0.0
+    detalle_api: Dict = {}
+    top_cat = "profanity"
+
+    if os.getenv("ENABLE_MOD", "false").lower() in ("true", "1") and texto_completo:
+        try:
+            res = _moderate_text_language_v2(texto_completo)
+            cats = {k.lower(): float(v) for k, v in res.get("raw", {}).items()}
+            nivel_api, top_cat, score_api, detalle_api = _nivel_api_desde_categorias(cats)
+        except Exception as me:
+            logger.warning(f"Moderation provider error: {me}")
+            nivel_api = "error"
+
+    # ---------- Fusión niveles ----------
+    def _combinar_niveles(n1, n2):
+        rank = {"limpio": 0, "sospechoso": 1, "problematico": 2, "error": -1}
+        return max([n1, n2], key=lambda n: rank.get(n, -1))
+
+    nivel_problema = _combinar_niveles(nivel_lista, nivel_api)
+
+    # Log de moderación
+    audit_logger.log_error(
+        error_type="TEXT_MODERATION_RESULT",
+        message=f"nivel={nivel_problema}, top={top_cat}:{round(score_api, 3)}",
+        video_id=video_id,
+        details={
+            "api_level": nivel_api,
+            "lista_level": nivel_lista,
+            "scores": detalle_api
         }
+    )
+
+    tiempo_procesamiento = time.time() - start_time
+
+    # ---------- Resultado ----------
+    resultado = {
+        "texto_detectado": "; ".join(todo_el_texto) if todo_el_texto else "",
+        "frames_analizados": frames_analizados,
+        "palabras_problematicas": ", ".join(palabras_encontradas) if palabras_encontradas else "",
+        "nivel_problema": nivel_problema,
+        "nivel_problema_lista": nivel_lista,
+        "nivel_problema_api": nivel_api,
+        "profanity_score_api": round(score_api, 3),
+        "moderation_details": detalle_api,
+        "tiempo_procesamiento": round(tiempo_procesamiento, 2),
+        "texto_encontrado": bool(todo_el_texto),
+        "backend_ocr": backend,
+        "locale_moderacion": locale,
+    }
+    resultado.update(extra or {})
+
+    logger.info(f"Detección de texto completada en {tiempo_procesamiento:.2f}s")
+    logger.info(f"Frames analizados: {frames_analizados}")
+    logger.info(f"Texto encontrado: {len(todo_el_texto)} fragmentos")
+    logger.info(
+        f"Nivel (final): {nivel_problema} | API={nivel_api}({score_api:.3f} {top_cat}) | Lista={nivel_lista}"
+    )
+
+    return resultado
+
+def _detectar_con_listas(texto_completo: str, locale: Optional[str] = None) -> Tuple[List[str], str]:
+    """
+    Lista manual + spanlp + badwords_service (+ lexicón del locale del club).
+    Retorna (palabras fusionadas, nivel_lista).
+    """
+    if not texto_completo:
+        return [], "limpio"
+
+    if ENABLE_UNIFIED_SCANNER:
+        escaneo = moderation_scanner.escanear_texto(texto_completo, locale=locale)
+        return escaneo["palabras"], escaneo["nivel"]
+
+    # 1) Detectar con lista manual (y la del locale, si hay)
+    palabras_locales = _detectar_palabras_problematicas(texto_completo.lower())
+    if locale:
+        palabras_locales += _detectar_palabras_problematicas_normalizado(normalizar_texto(texto_completo), locale)
+
+    # 2) Detectar con spanlp (país del locale + global)
+    pais = locale.split("-")[1] if locale and "-" in locale else None
+    palabras_spanlp = spanlp_service.detectar_palabras(texto_completo, country=pais)
 
-def _descargar_video_desde_gcs(gcs_uri: str, local_path: str) -> bool:
+    # 3) Detectar con badwords_service
+    bw_result = badwords_service.detect_badwords(texto_completo)
+    palabras_badwords = bw_result.get("found", [])
+
+    # 4) Unir todas las fuentes
+    palabras_encontradas = _fusionar_palabras(
+        palabras_locales, palabras_spanlp, palabras_badwords
+    )
+
+    # 5) Calcular nivel
+    return palabras_encontradas, calcular_nivel_problema(palabras_encontradas)
+
+def _restante(limite: Optional[float]) -> Optional[float]:
+    """Segundos que quedan hasta limite (time.time()); None si no hay plazo."""
+    if limite is None:
+        return None
+    return max(0.0, limite - time.time())
+
+def _descargar_video_desde_gcs(gcs_uri: str, local_path: str, timeout_sec: Optional[float] = None) -> bool:
     """Descarga video desde GCS a archivo local temporal"""
+    if timeout_sec is not None and timeout_sec <= 0:
+        logger.warning("Sin tiempo para descargar el video; se omite el OCR")
+        return False
     try:
-        from google.cloud import storage
-        
         # Extraer bucket y object name de la URI
         uri_parts = gcs_uri.replace('gs://', '').split('/', 1)
         bucket_name = uri_parts[0]
         object_name = uri_parts[1]
         
-        # Descargar archivo
-        client = storage.Client()
+        # Descargar archivo (cliente compartido del proceso)
+        client = _get_storage_client()
         bucket = client.bucket(bucket_name)
         blob = bucket.blob(object_name)
-        blob.download_to_filename(local_path)
+        if timeout_sec is None:
+            blob.download_to_filename(local_path)
+        else:
+            blob.download_to_filename(local_path, timeout=timeout_sec)
         
         logger.debug(f"Video descargado: {local_path}")
         return True
@@ -305,69 +458,263 @@ def _descargar_video_desde_gcs(gcs_uri: str, local_path: str) -> bool:
         logger.error(f"Error descargando video desde GCS: {str(e)}")
         return False
 
-def _extraer_y_analizar_frames(video_path: str, max_frames: int = 10) -> List[str]:
-    """Extrae frames del video y analiza texto en cada uno"""
+def _indices_por_tomas(tomas: List[Tuple[float, float]], fps: float, total_frames: int, max_frames: int) -> List[int]:
+    """
+    Un frame por toma (en el punto medio de cada una). Si hay más tomas que max_frames,
+    se eligen tomas equiespaciadas a lo largo del video.
+    """
+    if fps <= 0 or total_frames <= 0:
+        return []
+
+    indices: List[int] = []
+    for inicio, fin in tomas:
+        idx = min(total_frames - 1, int(((inicio + fin) / 2) * fps))
+        if idx >= 0 and idx not in indices:
+            indices.append(idx)
+
+    if len(indices) > max_frames:
+        paso = len(indices) / max_frames
+        indices = [indices[int(i * paso)] for i in range(max_frames)]
+
+    return indices
+
+def _indices_uniformes(total_frames: int, max_frames: int) -> List[int]:
+    """Hasta max_frames índices equiespaciados desde el frame 0."""
+    if total_frames <= 0:
+        return []
+    if total_frames <= max_frames:
+        return list(range(0, total_frames, max(1, total_frames // max_frames)))
+    return list(range(0, total_frames, total_frames // max_frames))[:max_frames]
+
+def _presupuesto_frames(duracion_seg: Optional[float]) -> int:
+    """Frames a muestrear según la duración, acotados a [OCR_MIN_FRAMES, OCR_MAX_FRAMES]."""
+    if not duracion_seg or duracion_seg <= 0:
+        return OCR_MAX_FRAMES
+    deseados = math.ceil(duracion_seg * OCR_FRAMES_POR_SEGUNDO)
+    return max(1, min(OCR_MAX_FRAMES, max(OCR_MIN_FRAMES, deseados)))
+
+def _extraer_y_analizar_frames(video_path: str, max_frames: Optional[int] = None,
+                               tomas: Optional[List[Tuple[float, float]]] = None,
+                               duracion_seg: Optional[float] = None,
+                               locale: Optional[str] = None,
+                               limite: Optional[float] = None) -> Tuple[List[str], Dict]:
+    """
+    Extrae frames del video y analiza texto en ellos con Vision en lotes.
+    video_path puede ser un archivo local o una URL http(s) (lectura por rangos vía ffmpeg).
+    Sin max_frames, el presupuesto sale de duracion_seg (o de la duración del propio archivo).
+    Con OCR_EARLY_STOP, deja de extraer y de llamar a Vision cuando el texto ya es 'problematico'.
+    Con limite (time.time()), deja de leer frames al vencer y Vision usa el tiempo restante.
+    Retorna (textos por frame en orden de aparición, métricas de OCR).
+    Lanza VideoNoDisponibleError si el video no se puede abrir.
+    """
+    metricas = {
+        "frames_solicitados": 0,
+        "frames_enviados_ocr": 0,
+        "llamadas_api_ocr": 0,
+        "frames_duplicados_omitidos": 0,
+        "ocr_corte_temprano": False,
+        "ocr_corte_por_tiempo": False,
+    }
+    cap = _abrir_captura(video_path)
     try:
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            raise Exception("No se pudo abrir el video")
-        
         total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        fps = int(cap.get(cv2.CAP_PROP_FPS))
+        fps = float(cap.get(cv2.CAP_PROP_FPS) or 0.0)
+
+        if max_frames is None:
+            if not duracion_seg and fps > 0:
+                duracion_seg = total_frames / fps
+            max_frames = _presupuesto_frames(duracion_seg)
         
         # Calcular intervalos para extraer frames representativos
-        if total_frames <= max_frames:
-            frame_indices = list(range(0, total_frames, max(1, total_frames // max_frames)))
+        frame_indices = _indices_por_tomas(tomas, fps, total_frames, max_frames) if tomas else []
+        if frame_indices:
+            logger.info(f"Selección por tomas: {len(frame_indices)} frames para {len(tomas)} tomas")
         else:
-            frame_indices = list(range(0, total_frames, total_frames // max_frames))[:max_frames]
+            frame_indices = _indices_uniformes(total_frames, max_frames)
         
+        metricas["frames_solicitados"] = len(frame_indices)
+
+        # Extraer, omitir casi-duplicados, codificar y mandar a OCR de a lotes
+        frames_jpeg: List[Tuple[int, bytes]] = []
+        lote: List[Tuple[int, bytes]] = []
+        hashes_enviados: List[int] = []
+        textos_por_frame: Dict[int, str] = {}
+        llamadas = 0
+
+        def _procesar_lote() -> bool:
+            """OCR del lote pendiente; True si ya alcanza para 'problematico'."""
+            nonlocal llamadas
+            textos, n = _analizar_textos_en_lote(lote, limite=limite)
+            textos_por_frame.update(textos)
+            llamadas += n
+            frames_jpeg.extend(lote)
+            lote.clear()
+            if not OCR_EARLY_STOP:
+                return False
+            acumulado = " ".join(textos_por_frame[i] for i, _ in frames_jpeg if textos_por_frame.get(i))
+            return _detectar_con_listas(acumulado, locale)[1] == "problematico"
+
+        extractor = _elegir_extractor(frame_indices, total_frames)
+        for frame_idx, frame in _leer_frames(cap, frame_indices, extractor):
+            if limite is not None and time.time() >= limite:
+                metricas["ocr_corte_por_tiempo"] = True
+                logger.warning(f"OCR: plazo vencido tras {len(frames_jpeg) + len(lote)}/{len(frame_indices)} frames")
+                lote.clear()
+                break
+            if OCR_DEDUP_HAMMING >= 0:
+                h = _dhash(frame)
+                if any(_distancia_hamming(h, previo) <= OCR_DEDUP_HAMMING for previo in hashes_enviados):
+                    metricas["frames_duplicados_omitidos"] += 1
+                    continue
+                hashes_enviados.append(h)
+            ok, buffer = cv2.imencode('.jpg', frame)
+            if ok:
+                lote.append((frame_idx, buffer.tobytes()))
+            if len(lote) >= OCR_BATCH_SIZE and _procesar_lote():
+                metricas["ocr_corte_temprano"] = True
+                logger.info(f"OCR: corte temprano tras {len(frames_jpeg)}/{len(frame_indices)} frames (nivel problematico)")
+                break
+        if lote:
+            _procesar_lote()
+
+        metricas["frames_enviados_ocr"] = len(frames_jpeg)
+        metricas["llamadas_api_ocr"] = llamadas
+
         frames_textos = []
+        for frame_idx, _ in frames_jpeg:
+            texto = textos_por_frame.get(frame_idx, "")
+            if texto:
+                frames_textos.append(texto)
+                logger.debug(f"Frame {frame_idx}: {texto[:100]}...")
+
+        logger.info(
+            f"Analizados {len(frame_indices)} frames, texto en {len(frames_textos)} "
+            f"(extractor={extractor}, {llamadas} llamadas a Vision, lote={OCR_BATCH_SIZE}, "
+            f"duplicados omitidos={metricas['frames_duplicados_omitidos']})"
+        )
         
-        for frame_idx in frame_indices:
-            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-            ret, frame = cap.read()
-            
-            if ret:
-                texto = _analizar_texto_en_frame(frame)
-                if texto:
-                    frames_textos.append(texto)
-                    logger.debug(f"Frame {frame_idx}: {texto[:100]}...")
-        
-        cap.release()
-        logger.info(f"Analizados {len(frame_indices)} frames, texto en {len(frames_textos)}")
-        
-        return frames_textos
+        return frames_textos, metricas
         
     except Exception as e:
         logger.error(f"Error extrayendo frames: {str(e)}")
-        return []
+        return [], metricas
+    finally:
+        cap.release()
 
-def _analizar_texto_en_frame(frame) -> str:
-    """Analiza texto en un frame específico usando Cloud Vision API"""
-    try:
-        # Convertir frame a bytes
-        _, buffer = cv2.imencode('.jpg', frame)
-        image_bytes = buffer.tobytes()
-        
-        # Crear objeto Image para Vision API
-        image = vision.Image(content=image_bytes)
-        
-        # Detectar texto
-        response = _client().text_detection(image=image)
-        
-        if response.error.message:
-            raise Exception(f"Error en Vision API: {response.error.message}")
-        
-        # Extraer texto detectado
-        texts = response.text_annotations
-        if texts:
-            return texts[0].description.strip()
-        
-        return ""
-        
-    except Exception as e:
-        logger.debug(f"Error analizando frame: {str(e)}")
-        return ""
+def _elegir_extractor(frame_indices: List[int], total_frames: int) -> str:
+    if OCR_FRAME_EXTRACTOR in ("seek", "secuencial"):
+        return OCR_FRAME_EXTRACTOR
+    if not frame_indices:
+        return "seek"
+    gap_medio = total_frames / len(frame_indices)
+    return "secuencial" if gap_medio <= OCR_SECUENCIAL_MAX_GAP else "seek"
+
+def _leer_frames(cap, frame_indices: List[int], extractor: str):
+    """Itera (índice, frame) de los frames pedidos con el extractor indicado."""
+    if extractor == "secuencial":
+        yield from _leer_frames_secuencial(cap, frame_indices)
+    else:
+        yield from _leer_frames_seek(cap, frame_indices)
+
+def _leer_frames_seek(cap, frame_indices: List[int]):
+    """
+    Un seek por muestra. Con H.264/HEVC cada seek decodifica desde el keyframe previo,
+    así que conviene cuando las muestras están separadas por más de un GOP.
+    """
+    for frame_idx in frame_indices:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+        ret, frame = cap.read()
+        if ret:
+            yield frame_idx, frame
+
+def _leer_frames_secuencial(cap, frame_indices: List[int]):
+    """
+    Una sola pasada: grab() avanza sin convertir el frame y retrieve() solo
+    materializa las muestras. Se corta al pasar la última muestra.
+    """
+    pendientes = sorted(set(frame_indices))
+    if not pendientes:
+        return
+    objetivo = 0
+    actual = 0
+    while objetivo < len(pendientes):
+        if not cap.grab():
+            break
+        if actual == pendientes[objetivo]:
+            ret, frame = cap.retrieve()
+            if ret:
+                yield actual, frame
+            objetivo += 1
+        actual += 1
+
+def _abrir_captura(fuente: str):
+    """Abre el video con cv2; las URLs van por ffmpeg con timeouts de apertura/lectura."""
+    if fuente.startswith(("http://", "https://")):
+        cap = cv2.VideoCapture(fuente, cv2.CAP_FFMPEG, [
+            cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, OCR_STREAM_TIMEOUT_MS,
+            cv2.CAP_PROP_READ_TIMEOUT_MSEC, OCR_STREAM_TIMEOUT_MS,
+        ])
+    else:
+        cap = cv2.VideoCapture(fuente)
+    if not cap.isOpened():
+        cap.release()
+        raise VideoNoDisponibleError("No se pudo abrir el video")
+    return cap
+
+def _dhash(frame, tam: int = 8) -> int:
+    """
+    Hash perceptual (dHash) de tam*tam bits: gris, reducido a (tam+1)xtam y
+    comparación de cada píxel con su vecino de la derecha.
+    """
+    gris = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    chico = cv2.resize(gris, (tam + 1, tam), interpolation=cv2.INTER_AREA)
+    bits = (chico[:, 1:] > chico[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+def _distancia_hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+def _analizar_textos_en_lote(frames_jpeg: List[Tuple[int, bytes]],
+                             limite: Optional[float] = None) -> Tuple[Dict[int, str], int]:
+    """
+    Envía los frames (índice, jpeg) a Cloud Vision con batch_annotate_images en grupos
+    de OCR_BATCH_SIZE. Retorna ({índice_frame: texto}, número de llamadas a la API).
+    Un lote o una imagen con error se tratan como frames sin texto.
+    Con limite (time.time()), cada llamada usa el tiempo restante como timeout.
+    """
+    textos: Dict[int, str] = {}
+    llamadas = 0
+    feature = vision.Feature(type_=vision.Feature.Type.TEXT_DETECTION)
+
+    for i in range(0, len(frames_jpeg), OCR_BATCH_SIZE):
+        lote = frames_jpeg[i:i + OCR_BATCH_SIZE]
+        requests = [
+            vision.AnnotateImageRequest(image=vision.Image(content=contenido), features=[feature])
+            for _, contenido in lote
+        ]
+        restante = _restante(limite)
+        if restante is not None and restante <= 0:
+            logger.warning(f"OCR: plazo vencido, quedan {len(frames_jpeg) - i} frames sin enviar a Vision")
+            break
+        try:
+            llamadas += 1
+            if restante is None:
+                respuesta = _client().batch_annotate_images(requests=requests)
+            else:
+                respuesta = _client().batch_annotate_images(requests=requests, timeout=restante)
+        except Exception as e:
+            logger.warning(f"Error en lote OCR ({len(lote)} frames): {str(e)}")
+            continue
+
+        # Las respuestas vienen en el mismo orden que los requests
+        for (frame_idx, _), resp in zip(lote, respuesta.responses):
+            if resp.error.message:
+                logger.debug(f"Error en Vision API (frame {frame_idx}): {resp.error.message}")
+                continue
+            if resp.text_annotations:
+                textos[frame_idx] = resp.text_annotations[0].description.strip()
+
+    return textos, llamadas
 
 def _detectar_palabras_problematicas(texto: str) -> List[str]:
     """Busca palabras problemáticas en el texto detectado"""
@@ -386,17 +733,6 @@ def _detectar_palabras_problematicas(texto: str) -> List[str]:
     
     return palabras_encontradas
 
-def _calcular_nivel_problema(palabras_encontradas: List[str]) -> str:
-    """Calcula el nivel de problema basado en palabras encontradas"""
-    num_palabras = len(palabras_encontradas)
-    
-    if num_palabras == 0:
-        return 'limpio'
-    elif num_palabras <= 2:
-        return 'sospechoso'
-    else:
-        return 'problematico'
-
 # --- Helpers de moderación avanzada ---
 
 # Umbrales (Valores ajustables)
@@ -471,25 +807,74 @@ def probar_conexion_vision_api() -> bool:
         )
         return False
 
+_language_client = None
+_language_client_lock = threading.Lock()
+
+# Resultados de moderate_text por hash del texto normalizado (banners y cantos se repiten entre videos)
+_moderacion_cache = CacheTTL(LANGUAGE_CACHE_MAX_ENTRADAS, LANGUAGE_CACHE_TTL_SEG)
+_latencia_api = {"llamadas": 0, "errores": 0, "ms_total": 0.0, "ms_max": 0.0}
+_latencia_lock = threading.Lock()
+
+def _get_language_client():
+    """Cliente de Language v2 único por proceso (un canal gRPC y un handshake de auth)."""
+    global _language_client
+    if _language_client is None:
+        with _language_client_lock:
+            if _language_client is None:
+                _language_client = language.LanguageServiceClient()
+    return _language_client
+
+def _clave_moderacion(texto: str) -> str:
+    normalizado = " ".join(unicodedata.normalize("NFC", texto).casefold().split())
+    return hashlib.sha256(normalizado.encode("utf-8")).hexdigest()
+
+def _registrar_latencia(ms: float, error: bool):
+    with _latencia_lock:
+        _latencia_api["llamadas"] += 1
+        _latencia_api["ms_total"] += ms
+        _latencia_api["ms_max"] = max(_latencia_api["ms_max"], ms)
+        if error:
+            _latencia_api["errores"] += 1
+
+def obtener_estadisticas_moderacion_api() -> Dict:
+    """Hit ratio de la cache de moderate_text y latencia de las llamadas reales."""
+    with _latencia_lock:
+        latencia = dict(_latencia_api)
+    llamadas = latencia["llamadas"]
+    latencia["ms_promedio"] = round(latencia["ms_total"] / llamadas, 1) if llamadas else 0.0
+    latencia["ms_total"] = round(latencia["ms_total"], 1)
+    latencia["ms_max"] = round(latencia["ms_max"], 1)
+    return {"cache": _moderacion_cache.estadisticas(), "latencia_api": latencia}
+
 def _moderate_text_language_v2(texto: str) -> dict:
     """
-    Stub de moderación de texto con Google Language v2 (moderate_text).
-    Aquí deberías llamar a la API real. Por ahora simula respuesta.
+    Moderación de texto con Google Language v2 (moderate_text).
+    Usa el cliente del proceso y cachea por texto normalizado; los errores no se cachean.
+    "desde_cache" indica si la respuesta salió de la cache (sin llamada a la API).
     """
-    try:
-        from google.cloud import language_v2
+    clave = _clave_moderacion(texto)
+    cacheado = _moderacion_cache.obtener(clave)
+    if cacheado is not None:
+        return {"raw": dict(cacheado), "desde_cache": True}
 
-        client = language_v2.LanguageServiceClient()
-        response = client.moderate_text(
-            model="moderation-text-v1.0",
-            prompt=texto
+    inicio = time.perf_counter()
+    try:
+        response = _get_language_client().moderate_text(
+            document=language.Document(
+                content=texto,
+                type_=language.Document.Type.PLAIN_TEXT,
+            )
         )
-        raw_scores = {cat.name.lower(): cat.score for cat in response.moderation_categories}
-        return {"raw": raw_scores}
+        raw_scores = {cat.name.lower(): cat.confidence for cat in response.moderation_categories}
+        _registrar_latencia((time.perf_counter() - inicio) * 1000, error=False)
+        if raw_scores:
+            _moderacion_cache.guardar(clave, raw_scores)
+        return {"raw": raw_scores, "desde_cache": False}
 
     except Exception as e:
+        _registrar_latencia((time.perf_counter() - inicio) * 1000, error=True)
         logger.warning(f"Error llamando a Language v2 moderate_text: {e}")
-        return {"raw": {}}
+        return {"raw": {}, "desde_cache": False}
 
 def _nivel_por_score(score: float) -> str:
     if score >= TH_PROB: return "problematico"
@@ -0,0 +1,168 @@
+# app/services/moderation/text_moderation_service.py
+"""
+Moderación de textos sueltos en lote (descripciones, nombres de clubes, backfills).
+
+Cada texto pasa por el escáner local compilado (lista manual + spanlp + badwords en
+un solo índice). Language v2 es opcional y se acota por lote con TEXT_MOD_API_MAX_POR_LOTE:
+se consulta solo para los textos que las listas no marcaron ya como 'problematico'
+(la API solo puede subir el nivel), empezando por los sospechosos.
+"""
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from app.services.core.logging_service import audit_logger
+from app.services.moderation import moderation_scanner
+
+logger = logging.getLogger(__name__)
+
+# Máximo de textos aceptados por request
+TEXT_MOD_MAX_TEXTOS = int(os.getenv("TEXT_MOD_MAX_TEXTOS", "1000"))
+# Máximo de llamadas a Language v2 por lote (0 = nunca)
+TEXT_MOD_API_MAX_POR_LOTE = int(os.getenv("TEXT_MOD_API_MAX_POR_LOTE", "20"))
+# Llamadas a Language v2 en paralelo dentro de un lote
+TEXT_MOD_API_WORKERS = max(1, int(os.getenv("TEXT_MOD_API_WORKERS", "4")))
+
+_RANGO_NIVEL = {"limpio": 0, "sospechoso": 1, "problematico": 2}
+
+
+class LoteInvalidoError(ValueError):
+    """El lote recibido no tiene el formato esperado o excede el máximo."""
+
+
+def _normalizar_entrada(textos) -> List[Dict]:
+    """Acepta ["texto", ...] o [{"id": ..., "texto": ...}, ...]."""
+    if not isinstance(textos, list):
+        raise LoteInvalidoError("'textos' debe ser una lista")
+    if len(textos) > TEXT_MOD_MAX_TEXTOS:
+        raise LoteInvalidoError(f"Máximo {TEXT_MOD_MAX_TEXTOS} textos por lote")
+
+    entradas = []
+    for i, item in enumerate(textos):
+        if isinstance(item, dict):
+            texto = item.get("texto")
+            ref = item.get("id")
+        else:
+            texto, ref = item, None
+        if texto is not None and not isinstance(texto, str):
+            raise LoteInvalidoError(f"textos[{i}]: el texto debe ser string")
+        entradas.append({"indice": i, "id": ref, "texto": (texto or "").strip()})
+    return entradas
+
+
+def _escanear_local(texto: str, locale: Optional[str] = None) -> Dict:
+    escaneo = moderation_scanner.escanear_texto(texto, locale=locale)
+    categorias: Dict[str, List[str]] = {}
+    for d in escaneo["detalle"]:
+        # La lista manual y spanlp son de palabras soeces; badwords trae su propia categoría
+        categoria = d["categoria"] if d["fuente"] == "badwords" else "soez"
+        palabras = categorias.setdefault(categoria, [])
+        if d["palabra"] not in palabras:
+            palabras.append(d["palabra"])
+    return {
+        "nivel_lista": escaneo["nivel"],
+        "palabras": escaneo["palabras"],
+        "categorias": categorias,
+    }
+
+
+def _moderar_con_api(texto: str) -> Dict:
+    """Nivel de Language v2; "desde_cache" indica que la respuesta no requirió llamada a la API."""
+    from app.services.moderation.text_detection_service import (
+        _moderate_text_language_v2,
+        _nivel_api_desde_categorias,
+    )
+    try:
+        res = _moderate_text_language_v2(texto)
+        desde_cache = bool(res.get("desde_cache"))
+        cats = {k.lower(): float(v) for k, v in res.get("raw", {}).items()}
+        if not cats:
+            return {"nivel_api": "error", "scores_api": {}, "desde_cache": desde_cache}
+        nivel_api, _, _, detalle = _nivel_api_desde_categorias(cats)
+        return {"nivel_api": nivel_api, "scores_api": {k: round(v, 3) for k, v in detalle.items()},
+                "desde_cache": desde_cache}
+    except Exception as e:
+        logger.warning(f"[TEXT_MOD] Error en Language v2: {e}")
+        return {"nivel_api": "error", "scores_api": {}, "desde_cache": False}
+
+
+def moderar_textos(textos, usar_api: bool = False, max_api: Optional[int] = None,
+                   locale: Optional[str] = None) -> Dict:
+    """
+    Modera un lote de textos con los matchers locales y, opcionalmente, Language v2.
+    Con 'locale' se suma el lexicón de ese locale (ver locale_lexicon_service).
+    Los textos repetidos dentro del lote se analizan una sola vez.
+    Retorna {"resultados": [...], "resumen": {...}} con un resultado por texto, en orden.
+    Lanza LoteInvalidoError si el lote no es válido.
+    """
+    inicio = time.time()
+    entradas = _normalizar_entrada(textos)
+
+    # Un análisis por texto distinto
+    analisis: Dict[str, Dict] = {}
+    for e in entradas:
+        if e["texto"] and e["texto"] not in analisis:
+            analisis[e["texto"]] = _escanear_local(e["texto"], locale)
+
+    # Language v2 acotado: primero los sospechosos, nunca los ya problemáticos.
+    # llamadas_api cuenta solo las que llegaron a la API (no las servidas por su cache)
+    llamadas_api = 0
+    respuestas_cache_api = 0
+    if usar_api:
+        tope = TEXT_MOD_API_MAX_POR_LOTE if max_api is None else min(max_api, TEXT_MOD_API_MAX_POR_LOTE)
+        candidatos = [t for t, a in analisis.items() if a["nivel_lista"] != "problematico"]
+        candidatos.sort(key=lambda t: -_RANGO_NIVEL[analisis[t]["nivel_lista"]])
+        candidatos = candidatos[:max(0, tope)]
+        if candidatos:
+            with ThreadPoolExecutor(
+                max_workers=min(TEXT_MOD_API_WORKERS, len(candidatos)), thread_name_prefix="text-mod"
+            ) as executor:
+                for texto, res in zip(candidatos, executor.map(_moderar_con_api, candidatos)):
+                    if res.pop("desde_cache", False):
+                        respuestas_cache_api += 1
+                    else:
+                        llamadas_api += 1
+                    analisis[texto].update(res)
+
+    resultados = []
+    conteo = {"limpio": 0, "sospechoso": 0, "problematico": 0}
+    for e in entradas:
+        a = analisis.get(e["texto"], {"nivel_lista": "limpio", "palabras": [], "categorias": {}})
+        nivel_api = a.get("nivel_api")
+        nivel = a["nivel_lista"]
+        if nivel_api in _RANGO_NIVEL and _RANGO_NIVEL[nivel_api] > _RANGO_NIVEL[nivel]:
+            nivel = nivel_api
+        conteo[nivel] += 1
+
+        resultado = {
+            "indice": e["indice"],
+            "nivel": nivel,
+            "nivel_lista": a["nivel_lista"],
+            "nivel_api": nivel_api,
+            "palabras": a["palabras"],
+            "categorias": a["categorias"],
+        }
+        if e["id"] is not None:
+            resultado["id"] = e["id"]
+        if "scores_api" in a:
+            resultado["scores_api"] = a["scores_api"]
+        resultados.append(resultado)
+
+    resumen = {
+        "total": len(entradas),
+        "distintos": len(analisis),
+        "llamadas_api": llamadas_api,
+        "respuestas_cache_api": respuestas_cache_api,
+        "locale": locale,
+        "niveles": conteo,
+        "tiempo_procesamiento": round(time.time() - inicio, 3),
+    }
+    audit_logger.log_event(
+        event_type="TEXT_MODERATION_BATCH",
+        message=f"Lote moderado: {len(entradas)} textos, {llamadas_api} llamadas API "
+                f"({respuestas_cache_api} desde cache)",
+        details=resumen,
+    )
+    return {"resultados": resultados, "resumen": resumen}
@@ -0,0 +1,186 @@
+# app/services/video/analysis_cache_service.py
+"""
+Cache de resultados de analizar_video_completo direccionado por contenido.
+
+La clave es (hash del objeto en GCS, versión del pipeline). El hash sale de la
+metadata que GCS ya calcula (md5 o crc32c), así que no hace falta leer el video.
+La versión combina AI_PIPELINE_VERSION con una huella de las variables de entorno
+que cambian el resultado; si alguna cambia, las entradas viejas dejan de usarse.
+"""
+import os
+import json
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models.analisis_cache import AnalisisCache
+from app.services.core.logging_service import audit_logger
+from app.services.gcp.gcs_service import obtener_hash_contenido
+from app.services.moderation import badwords_service
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_CACHE_ENABLED = os.getenv("ANALYSIS_CACHE_ENABLED", "true").lower() in ("true", "1", "yes")
+AI_PIPELINE_VERSION = os.getenv("AI_PIPELINE_VERSION", "1")
+
+# Variables de entorno que modifican el resultado del análisis
+_CLAVES_CONFIG_PIPELINE = (
+    "USE_VERTEX_AI",
+    "VERTEX_FOUNDATION_MODEL",
+    "LOGO_CONFIDENCE_THRESHOLD",
+    "OBJECT_CONFIDENCE_THRESHOLD",
+    "OBJECT_MIN_FRAMES",
+    "OBJECT_TOPK",
+    "OBJECT_LABEL_ALLOWLIST",
+    "OBJECT_LABEL_DENYLIST",
+    "ENABLE_TRANSLATION",
+    "ENABLE_MOD",
+    "OCR_FRAME_SELECTION",
+    "OCR_MAX_FRAMES",
+    "OCR_BACKEND",
+    "OCR_DEDUP_HAMMING",
+    "OCR_FRAMES_POR_SEGUNDO",
+    "OCR_MIN_FRAMES",
+    "OCR_EARLY_STOP",
+    "OCR_BATCH_SIZE",
+    "ENABLE_UNIFIED_SCANNER",
+    "ENABLE_OBFUSCATION_MATCHING",
+    "OFUSCACION_MAX_FRAGMENTO",
+    "BAD_WORDS_LOCALE",
+)
+
+_stats = {"hits": 0, "misses": 0, "guardados": 0, "errores": 0}
+_stats_lock = threading.Lock()
+
+
+def _contar(clave: str):
+    with _stats_lock:
+        _stats[clave] += 1
+
+
+def version_pipeline(locale: Optional[str] = None) -> str:
+    """
+    Versión del pipeline: AI_PIPELINE_VERSION + huella de la configuración relevante.
+    El locale de moderación entra en la huella: el mismo clip en clubes de distinto país
+    puede moderarse distinto.
+    """
+    config = {k: os.getenv(k, "") for k in _CLAVES_CONFIG_PIPELINE}
+    # Un cambio en el lexicón de badwords (BD) también invalida resultados previos
+    config["lexicon_badwords"] = list(badwords_service.clave_lexicon())
+    if locale:
+        config["locale_moderacion"] = locale
+    huella = hashlib.sha1(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    return f"{AI_PIPELINE_VERSION}-{huella}"
+
+
+def _es_cacheable(datos_ia: Dict) -> bool:
+    """No se guardan resultados parciales (ramas con timeout o texto con error)."""
+    if datos_ia.get("ramas_timeout"):
+        return False
+    if datos_ia.get("nivel_problema_texto") == "error":
+        return False
+    return True
+
+
+def obtener_resultado_cacheado(object_name: str, locale: Optional[str] = None) -> Tuple[Optional[Dict], Optional[str]]:
+    """
+    Busca un análisis previo para el contenido del objeto.
+    Retorna (datos_ia | None, hash_contenido | None). El hash se devuelve también
+    en un miss para poder guardar el resultado luego sin volver a consultar GCS.
+    Lee y actualiza los hits con una conexión propia: el llamador tiene el video en
+    db.session y la cache no debe confirmar ni deshacer sus cambios pendientes.
+    """
+    if not ANALYSIS_CACHE_ENABLED:
+        return None, None
+
+    try:
+        hash_contenido = obtener_hash_contenido(object_name)
+        if not hash_contenido:
+            _contar("misses")
+            return None, None
+
+        with db.engine.begin() as conn:
+            entrada = conn.execute(
+                select(AnalisisCache.id, AnalisisCache.resultado, AnalisisCache.video_id_origen, AnalisisCache.hits)
+                .where(AnalisisCache.hash_contenido == hash_contenido,
+                       AnalisisCache.version_pipeline == version_pipeline(locale))
+            ).first()
+            if entrada:
+                conn.execute(
+                    update(AnalisisCache)
+                    .where(AnalisisCache.id == entrada.id)
+                    .values(hits=AnalisisCache.hits + 1, fecha_ultimo_uso=datetime.utcnow())
+                )
+
+        if not entrada:
+            _contar("misses")
+            return None, hash_contenido
+
+        datos_ia = json.loads(entrada.resultado)
+        _contar("hits")
+        logger.info(f"[CACHE_IA] HIT {hash_contenido} (origen video {entrada.video_id_origen}, "
+                    f"hits={(entrada.hits or 0) + 1})")
+        return datos_ia, hash_contenido
+
+    except Exception as e:
+        _contar("errores")
+        logger.warning(f"[CACHE_IA] Error consultando cache para '{object_name}': {e}")
+        return None, None
+
+
+def guardar_resultado_cacheado(hash_contenido: Optional[str], datos_ia: Dict, video_id: Optional[int] = None,
+                               locale: Optional[str] = None) -> bool:
+    """Guarda el resultado de un análisis completo (conexión propia). Nunca lanza excepción."""
+    if not ANALYSIS_CACHE_ENABLED or not hash_contenido or not _es_cacheable(datos_ia):
+        return False
+
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(insert(AnalisisCache).values(
+                hash_contenido=hash_contenido,
+                version_pipeline=version_pipeline(locale),
+                resultado=json.dumps(datos_ia, ensure_ascii=False, default=str),
+                video_id_origen=video_id,
+            ))
+        _contar("guardados")
+        return True
+
+    except IntegrityError:
+        # Otro worker guardó el mismo contenido en paralelo
+        return False
+
+    except Exception as e:
+        _contar("errores")
+        logger.warning(f"[CACHE_IA] Error guardando resultado {hash_contenido}: {e}")
+        audit_logger.log_error(
+            error_type="ANALYSIS_CACHE_SAVE_ERROR",
+            message=f"Error guardando resultado en cache de análisis: {str(e)}",
+            video_id=video_id,
+            details={"hash_contenido": hash_contenido}
+        )
+        return False
+
+
+def obtener_estadisticas_cache() -> Dict:
+    """Contadores del proceso (hits/misses) + tamaño de la tabla."""
+    with _stats_lock:
+        stats = dict(_stats)
+
+    consultas = stats["hits"] + stats["misses"]
+    stats["hit_ratio"] = round(stats["hits"] / consultas, 3) if consultas else 0.0
+    stats["habilitado"] = ANALYSIS_CACHE_ENABLED
+    stats["version_pipeline"] = version_pipeline()
+
+    try:
+        stats["entradas"] = AnalisisCache.query.count()
+    except Exception as e:
+        logger.warning(f"[CACHE_IA] No se pudo contar entradas: {e}")
+        stats["entradas"] = None
+
+    return stats
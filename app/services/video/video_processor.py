@@ -1,10 +1,24 @@
 # app/services/video_processor.py
 import logging
 import os
+import time
 from typing import List, Optional
 from app import db
 from app.models.video import Video
-from app.services.gcp.video_ai_service import analizar_video_completo, TransientQuotaError
+from app.services.gcp.video_ai_service import (
+    analizar_video_completo,
+    iniciar_anotacion_video,
+    consultar_anotacion_video,
+    TransientQuotaError,
+)
+from app.services.gcp.cloud_tasks_service import enqueue_process_video_task
+from app.services.video.analysis_cache_service import (
+    obtener_resultado_cacheado,
+    guardar_resultado_cacheado,
+    obtener_estadisticas_cache,
+)
+from app.services.moderation.locale_lexicon_service import locale_para_video
+from app.services.i18n.traduccion_pendiente_service import encolar_traduccion_pendiente, traducir_video
 from app.services.core.logging_service import audit_logger
 
 # Configurar logging
@@ -14,6 +28,11 @@ logger = logging.getLogger(__name__)
 BUCKET_NAME = os.getenv("GOOGLE_CLOUD_STORAGE_BUCKET", "accessfan-video")
 PROCESAMIENTO_HABILITADO = os.getenv("ENABLE_AI_PROCESSING", "true").lower() == "true"
 
+# Modo submit/resume de Video Intelligence: no bloquear hilos esperando la operación
+VI_ASYNC_ENABLED = os.getenv("VI_ASYNC_ENABLED", "false").lower() in ("true", "1", "yes")
+VI_POLL_DELAY_SEC = int(os.getenv("VI_POLL_DELAY_SEC", "30"))
+VI_POLL_MAX_INTENTOS = int(os.getenv("VI_POLL_MAX_INTENTOS", "40"))
+
 def procesar_videos_pendientes(limite: int = 5) -> dict:
     """
     Procesa videos que están pendientes de análisis de IA.
@@ -118,10 +137,12 @@ def procesar_videos_pendientes(limite: int = 5) -> dict:
     
     return stats
 
-def procesar_video_individual(video: Video) -> dict:
+def procesar_video_individual(video: Video, annotation_result=None, resultado_cache=None) -> dict:
     """
     Procesa un video individual con IA y guarda los resultados en la base de datos.
     Conserva la clasificación visual real (explícito / posible / seguro) y agrega la fuente de IA.
+    Si se pasa annotation_result (fase de reanudación), no se vuelve a llamar a Video Intelligence.
+    resultado_cache: (datos_ia, hash_contenido) de una consulta previa a la cache, para no repetirla.
     """
     logger.info(f"Procesando video ID {video.id}: {video.nombre_archivo}")
     audit_logger.log_error(
@@ -152,9 +173,25 @@ def procesar_video_individual(video: Video) -> dict:
         db.session.commit()
         logger.info(f"Video {video.id} marcado como 'procesando'")
 
-        # --- Análisis IA ---
-        logger.info(f"Iniciando análisis de IA para video {video.id}")
-        datos_ia = analizar_video_completo(gcs_uri, timeout_sec=600)
+        # --- Locale de moderación (país del club) ---
+        locale = locale_para_video(video)
+
+        # --- Cache por contenido (re-subidas del mismo clip) ---
+        inicio_cache = time.time()
+        datos_ia, hash_contenido = resultado_cache or obtener_resultado_cacheado(video.gcs_object_name, locale)
+
+        if datos_ia is not None:
+            logger.info(f"♻️ Video {video.id}: reutilizando análisis previo ({hash_contenido})")
+            datos_ia["cache_hit"] = True
+            datos_ia["tiempo_procesamiento"] = round(time.time() - inicio_cache, 3)
+        else:
+            # --- Análisis IA ---
+            logger.info(f"Iniciando análisis de IA para video {video.id}")
+            datos_ia = analizar_video_completo(
+                gcs_uri, timeout_sec=600, annotation_result=annotation_result,
+                duracion_seg=video.duracion, locale=locale
+            )
+            guardar_resultado_cacheado(hash_contenido, datos_ia, video_id=video.id, locale=locale)
 
         # ✅ Asegurar que se conserva la clasificación visual real
         if datos_ia.get("contenido_explicito") in (None, "", "No analizado"):
@@ -167,6 +204,10 @@ def procesar_video_individual(video: Video) -> dict:
         video.actualizar_estado_ia('completado', datos_ia)
         db.session.commit()
 
+        # --- Traducción diferida: la task traduce en lote; sin Cloud Tasks se traduce acá ---
+        if video.traduccion_pendiente and not encolar_traduccion_pendiente():
+            traducir_video(video)
+
         # --- Logs ---
         logger.info(f"✅ Video {video.id} procesado exitosamente")
         logger.info(f"   - Etiquetas: {len(datos_ia['etiquetas'].split(',')) if datos_ia.get('etiquetas') else 0}")
@@ -260,6 +301,152 @@ def procesar_video_individual(video: Video) -> dict:
 
         return {"exitoso": False, "error": str(e)}
 
+def iniciar_procesamiento_video(video: Video) -> dict:
+    """
+    Fase 1 del modo submit/resume: envía annotate_video, guarda el nombre de la
+    operación en el video y encola una task de reanudación con delay.
+    Retorna enseguida sin esperar a Video Intelligence.
+    """
+    logger.info(f"Iniciando (submit) video ID {video.id}: {video.nombre_archivo}")
+
+    try:
+        if not video.gcs_object_name:
+            raise ValueError("Video no tiene gcs_object_name")
+
+        gcs_uri = f"gs://{BUCKET_NAME}/{video.gcs_object_name}"
+
+        # Contenido ya analizado: resolver en el acto sin enviar nada a Video Intelligence
+        resultado_cache = obtener_resultado_cacheado(video.gcs_object_name, locale_para_video(video))
+        if resultado_cache[0] is not None:
+            return procesar_video_individual(video, resultado_cache=resultado_cache)
+
+        video.actualizar_estado_ia('procesando')
+        video.vi_operation_name = iniciar_anotacion_video(gcs_uri)
+        db.session.commit()
+
+        enqueue_process_video_task(
+            video.gcs_object_name,
+            delay_seconds=VI_POLL_DELAY_SEC,
+            fase="reanudar",
+            intento=1,
+        )
+
+        audit_logger.log_event(
+            event_type="VIDEO_PROCESSOR_VI_SUBMITTED",
+            message=f"Operación de Video Intelligence enviada para video {video.id}",
+            video_id=video.id,
+            details={'operation_name': video.vi_operation_name, 'delay_seconds': VI_POLL_DELAY_SEC}
+        )
+        return {"exitoso": True, "pendiente": True, "operacion": video.vi_operation_name}
+
+    except TransientQuotaError as e:
+        logger.error(f"⏳ Quota/rate-limit (retry) al enviar video {video.id}: {e}")
+        try:
+            video.actualizar_estado_ia('error')
+            video.razon_rechazo = f"Quota/rate-limit, se reintentará: {str(e)}"
+            db.session.commit()
+        except Exception as db_error:
+            logger.error(f"Error actualizando BD en quota retry: {db_error}")
+            db.session.rollback()
+        raise
+
+    except Exception as e:
+        logger.error(f"❌ Error enviando video {video.id} a Video Intelligence: {e}")
+        audit_logger.log_error(
+            error_type="VIDEO_PROCESSOR_VI_SUBMIT_ERROR",
+            message=f"Error enviando video {video.id} a Video Intelligence: {str(e)}",
+            video_id=video.id,
+            details={'nombre_archivo': video.nombre_archivo}
+        )
+        try:
+            video.actualizar_estado_ia('error')
+            video.vi_operation_name = None
+            video.razon_rechazo = f"Error análisis IA: {str(e)}"
+            db.session.commit()
+        except Exception as db_error:
+            logger.error(f"Error adicional actualizando BD: {db_error}")
+            db.session.rollback()
+        return {"exitoso": False, "error": str(e)}
+
+def reanudar_procesamiento_video(video: Video, intento: int = 1) -> dict:
+    """
+    Fase 2 del modo submit/resume: consulta la operación guardada en el video.
+    - Si no terminó: vuelve a encolar la task con delay (hasta VI_POLL_MAX_INTENTOS).
+    - Si terminó: reclama la operación y continúa con el post-procesamiento normal
+      (Gemini, OCR, veredicto, BD). Una entrega duplicada que pierde el reclamo se omite.
+    """
+    operation_name = video.vi_operation_name
+    if not operation_name:
+        return {"exitoso": False, "error": "Video sin operación de Video Intelligence pendiente"}
+
+    try:
+        annotation_result = consultar_anotacion_video(operation_name)
+    except TransientQuotaError as e:
+        logger.warning(f"⏳ Quota al consultar operación de video {video.id}, se reintenta: {e}")
+        annotation_result = None
+    except Exception as e:
+        logger.error(f"❌ Operación de Video Intelligence falló para video {video.id}: {e}")
+        audit_logger.log_error(
+            error_type="VIDEO_PROCESSOR_VI_OPERATION_ERROR",
+            message=f"Operación de Video Intelligence falló para video {video.id}: {str(e)}",
+            video_id=video.id,
+            details={'operation_name': operation_name, 'intento': intento}
+        )
+        try:
+            video.actualizar_estado_ia('error')
+            video.vi_operation_name = None
+            video.razon_rechazo = f"Error análisis IA: {str(e)}"
+            db.session.commit()
+        except Exception as db_error:
+            logger.error(f"Error adicional actualizando BD: {db_error}")
+            db.session.rollback()
+        return {"exitoso": False, "error": str(e)}
+
+    if annotation_result is None:
+        if intento >= VI_POLL_MAX_INTENTOS:
+            msg = f"Video Intelligence no terminó tras {intento} consultas"
+            logger.error(f"❌ {msg} (video {video.id})")
+            audit_logger.log_error(
+                error_type="VIDEO_PROCESSOR_VI_POLL_EXHAUSTED",
+                message=msg,
+                video_id=video.id,
+                details={'operation_name': operation_name}
+            )
+            video.actualizar_estado_ia('error')
+            video.vi_operation_name = None
+            video.razon_rechazo = msg
+            db.session.commit()
+            return {"exitoso": False, "error": msg}
+
+        enqueue_process_video_task(
+            video.gcs_object_name,
+            delay_seconds=VI_POLL_DELAY_SEC,
+            fase="reanudar",
+            intento=intento + 1,
+        )
+        logger.info(f"[VI] Operación aún en curso para video {video.id} (intento {intento}), re-encolada")
+        return {"exitoso": True, "pendiente": True, "operacion": operation_name}
+
+    # Cloud Tasks entrega al menos una vez: solo quien limpia la operación sigue adelante
+    if not _reclamar_operacion(video, operation_name):
+        logger.info(f"[VI] Operación de video {video.id} ya reclamada por otra entrega, se omite")
+        return {"exitoso": True, "omitido": True, "operacion": operation_name}
+
+    logger.info(f"[VI] Operación completada para video {video.id} (intento {intento}), reanudando")
+    return procesar_video_individual(video, annotation_result=annotation_result)
+
+def _reclamar_operacion(video: Video, operation_name: str) -> bool:
+    """UPDATE condicional sobre vi_operation_name; True si esta entrega lo ganó."""
+    reclamados = (
+        Video.query
+        .filter_by(id=video.id, vi_operation_name=operation_name)
+        .update({Video.vi_operation_name: None}, synchronize_session=False)
+    )
+    db.session.commit()
+    if reclamados:
+        video.vi_operation_name = None
+    return reclamados == 1
+
 def reprocesar_video(video_id: int) -> dict:
     """
     Fuerza el reprocesamiento de un video específico.
@@ -291,9 +478,13 @@ def reprocesar_video(video_id: int) -> dict:
     video.fecha_procesamiento = None
     video.etiquetas = None
     video.logotipos = None
+    video.etiquetas_original = None
+    video.logotipos_original = None
+    video.traduccion_pendiente = False
     video.contenido_explicito = 'No analizado'
     video.puntaje_confianza = 0.0
     video.tiempo_procesamiento = 0.0
+    video.vi_operation_name = None
     
     try:
         db.session.commit()
@@ -336,6 +527,8 @@ def obtener_estadisticas_procesamiento() -> dict:
         else:
             stats["porcentaje_completado"] = 0
             stats["porcentaje_error"] = 0
+
+        stats["cache_analisis"] = obtener_estadisticas_cache()
         
         audit_logger.log_error(
             error_type="VIDEO_PROCESSOR_STATS_GENERATED",
@@ -383,6 +576,7 @@ def limpiar_videos_colgados() -> dict:
         # Resetear videos colgados
         for video in videos_colgados:
             video.estado_ia = 'pendiente'
+            video.vi_operation_name = None
             video.razon_rechazo = "Reiniciado - proceso anterior incompleto"
         
         db.session.commit()
@@ -0,0 +1,99 @@
+# benchmarks/bench_frame_extraction.py
+"""
+Compara los extractores de frames del OCR (seek vs secuencial) sobre clips reales.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_frame_extraction clip1.mp4 clip2.mov --muestras 10 --repeticiones 3
+    python -m benchmarks.bench_frame_extraction https://<url-firmada> --json
+
+Solo mide decodificación: no llama a Cloud Vision. Para cada clip informa el tiempo
+mediano por extractor, los frames obtenidos y si ambos devolvieron los mismos índices.
+"""
+import argparse
+import json
+import statistics
+import time
+
+import cv2
+
+from app.services.moderation.text_detection_service import (
+    _abrir_captura,
+    _indices_uniformes,
+    _leer_frames,
+)
+
+EXTRACTORES = ("seek", "secuencial")
+
+
+def _medir(fuente: str, muestras: int, extractor: str):
+    cap = _abrir_captura(fuente)
+    try:
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        indices = _indices_uniformes(total_frames, muestras)
+        t0 = time.perf_counter()
+        obtenidos = [idx for idx, _ in _leer_frames(cap, indices, extractor)]
+        return time.perf_counter() - t0, total_frames, obtenidos
+    finally:
+        cap.release()
+
+
+def _info_clip(fuente: str) -> dict:
+    cap = _abrir_captura(fuente)
+    try:
+        fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+        return {
+            "codec": "".join(chr((fourcc >> (8 * i)) & 0xFF) for i in range(4)).strip(),
+            "fps": round(float(cap.get(cv2.CAP_PROP_FPS) or 0.0), 2),
+            "resolucion": f"{int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))}x{int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))}",
+        }
+    finally:
+        cap.release()
+
+
+def correr(fuentes, muestras: int, repeticiones: int) -> list:
+    resultados = []
+    for fuente in fuentes:
+        fila = {"clip": fuente, **_info_clip(fuente), "muestras": muestras}
+        indices_por_extractor = {}
+        for extractor in EXTRACTORES:
+            tiempos = []
+            for _ in range(repeticiones):
+                segundos, total_frames, obtenidos = _medir(fuente, muestras, extractor)
+                tiempos.append(segundos)
+            fila["total_frames"] = total_frames
+            fila[f"{extractor}_s"] = round(statistics.median(tiempos), 4)
+            fila[f"{extractor}_frames"] = len(obtenidos)
+            indices_por_extractor[extractor] = obtenidos
+        fila["mismos_indices"] = indices_por_extractor["seek"] == indices_por_extractor["secuencial"]
+        fila["speedup_secuencial"] = (
+            round(fila["seek_s"] / fila["secuencial_s"], 2) if fila["secuencial_s"] > 0 else None
+        )
+        resultados.append(fila)
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de extractores de frames para OCR")
+    parser.add_argument("clips", nargs="+", help="Rutas locales o URLs http(s) de videos")
+    parser.add_argument("--muestras", type=int, default=10, help="Frames a extraer por clip")
+    parser.add_argument("--repeticiones", type=int, default=3, help="Corridas por extractor (se informa la mediana)")
+    parser.add_argument("--json", action="store_true", help="Salida en JSON")
+    args = parser.parse_args()
+
+    resultados = correr(args.clips, args.muestras, args.repeticiones)
+
+    if args.json:
+        print(json.dumps(resultados, indent=2, ensure_ascii=False))
+        return
+
+    for r in resultados:
+        print(
+            f"{r['clip']}  [{r['codec']} {r['resolucion']} @ {r['fps']}fps, {r['total_frames']} frames]\n"
+            f"  seek:       {r['seek_s']:.4f}s ({r['seek_frames']} frames)\n"
+            f"  secuencial: {r['secuencial_s']:.4f}s ({r['secuencial_frames']} frames)\n"
+            f"  speedup secuencial: {r['speedup_secuencial']}x | mismos índices: {r['mismos_indices']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# benchmarks/bench_moderation.py
+"""
+Benchmark de los detectores de moderación de texto sobre un corpus OCR sintético.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_moderation --textos 2000 --salida bench_moderation.json
+    python -m benchmarks.bench_moderation --textos 2000 --locale es-AR --salida despues.json
+
+El corpus imita lo que devuelve el OCR de un clip de estadio: marcadores, cantos, carteles
+de sponsors, texto mezclado es/en y muchas líneas repetidas, con algunas palabras soeces
+(también ofuscadas) mezcladas. Es determinístico (--semilla), así que dos reportes de
+commits distintos se pueden comparar con un diff.
+
+Se mide cada detector por separado y los dos caminos completos:
+  - "fusion_legacy": lista manual + spanlp + badwords + _fusionar_palabras
+  - "escaner_unificado": moderation_scanner.escanear_texto
+Por detector: textos/s, latencia media, p50 y p99 (ms) y total de palabras detectadas.
+La compilación de índices (primer uso) se informa aparte en "arranque_ms".
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from typing import Callable, Dict, List
+
+from app.services.moderation import badwords_service, moderation_scanner, spanlp_service
+from app.services.moderation.text_detection_service import (
+    _detectar_palabras_problematicas,
+    _fusionar_palabras,
+)
+from benchmarks.corpus_ocr import generar_corpus
+
+
+def _percentil(valores: List[float], p: float) -> float:
+    ordenados = sorted(valores)
+    k = min(len(ordenados) - 1, max(0, int(round(p / 100 * len(ordenados) + 0.5)) - 1))
+    return ordenados[k]
+
+
+def _medir(nombre: str, fn: Callable[[str], List[str]], corpus: List[str]) -> Dict:
+    t0 = time.perf_counter()
+    fn(corpus[0])  # primer uso: compila índices / congela vocabularios
+    arranque = time.perf_counter() - t0
+
+    latencias: List[float] = []
+    detectadas = 0
+    inicio = time.perf_counter()
+    for texto in corpus:
+        t = time.perf_counter()
+        detectadas += len(fn(texto))
+        latencias.append(time.perf_counter() - t)
+    total = time.perf_counter() - inicio
+
+    return {
+        "detector": nombre,
+        "textos_por_s": round(len(corpus) / total, 1) if total else None,
+        "latencia_media_ms": round(statistics.fmean(latencias) * 1000, 4),
+        "p50_ms": round(_percentil(latencias, 50) * 1000, 4),
+        "p99_ms": round(_percentil(latencias, 99) * 1000, 4),
+        "arranque_ms": round(arranque * 1000, 2),
+        "palabras_detectadas": detectadas,
+    }
+
+
+def _detectores(locale: str) -> Dict[str, Callable[[str], List[str]]]:
+    pais = locale.split("-")[1] if locale and "-" in locale else None
+
+    def fusion_legacy(texto: str) -> List[str]:
+        return _fusionar_palabras(
+            _detectar_palabras_problematicas(texto.lower()),
+            spanlp_service.detectar_palabras(texto, country=pais),
+            badwords_service.detect_badwords(texto, source="file").get("found", []),
+        )
+
+    detectores = {
+        "lista_manual": lambda t: _detectar_palabras_problematicas(t.lower()),
+        "spanlp": lambda t: spanlp_service.detectar_palabras(t, country=pais),
+        "badwords": lambda t: badwords_service.detect_badwords(t, source="file")["found"],
+        "fusion_legacy": fusion_legacy,
+        "escaner_unificado": lambda t: moderation_scanner.escanear_texto(t)["palabras"],
+    }
+    if locale:
+        detectores[f"escaner_unificado_{locale}"] = (
+            lambda t: moderation_scanner.escanear_texto(t, locale=locale)["palabras"]
+        )
+    return detectores
+
+
+def _commit_actual() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or "desconocido"
+    except Exception:
+        return "desconocido"
+
+
+def correr(n_textos: int, semilla: int, locale: str, solo: List[str] = None) -> Dict:
+    # El escáner sigue el lexicón configurado; para comparar commits se fija a la lista en código
+    badwords_service.BADWORDS_SOURCE = "file"
+
+    corpus = generar_corpus(n_textos, semilla)
+    resultados = [
+        _medir(nombre, fn, corpus)
+        for nombre, fn in _detectores(locale).items()
+        if not solo or nombre in solo
+    ]
+    return {
+        "commit": _commit_actual(),
+        "python": platform.python_version(),
+        "corpus": {
+            "textos": len(corpus),
+            "distintos": len(set(corpus)),
+            "semilla": semilla,
+            "caracteres_medios": round(statistics.fmean(len(t) for t in corpus), 1),
+        },
+        "config": {
+            "locale": locale or None,
+            "ENABLE_OBFUSCATION_MATCHING": moderation_scanner.ENABLE_OBFUSCATION_MATCHING,
+            "spanlp_disponible": spanlp_service.SPANLP_AVAILABLE,
+        },
+        "detectores": resultados,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de detectores de moderación de texto")
+    parser.add_argument("--textos", type=int, default=2000, help="Tamaño del corpus OCR sintético")
+    parser.add_argument("--semilla", type=int, default=11, help="Semilla del corpus (determinístico)")
+    parser.add_argument("--locale", default="", help="Mide además el escáner con este locale (p. ej. es-AR)")
+    parser.add_argument("--solo", nargs="*", help="Limitar a estos detectores")
+    parser.add_argument("--salida", help="Archivo JSON del reporte (por defecto, stdout)")
+    args = parser.parse_args()
+
+    reporte = correr(args.textos, args.semilla, args.locale, args.solo)
+    contenido = json.dumps(reporte, indent=2, ensure_ascii=False, sort_keys=True)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(contenido + "\n")
+        print(f"Reporte escrito en {os.path.abspath(args.salida)}")
+    else:
+        print(contenido)
+
+
+if __name__ == "__main__":
+    main()
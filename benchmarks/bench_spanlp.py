@@ -0,0 +1,102 @@
+# benchmarks/bench_spanlp.py
+"""
+Throughput de la detección spanlp: comportamiento anterior (contains_palabrota por token)
+vs. vocabulario congelado en frozenset (spanlp_service).
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_spanlp --tokens 10000 --tokens-anterior 300
+
+El corpus imita texto OCR de estadio: pocas palabras que se repiten mucho (marcadores,
+carteles, sponsors) con algunas palabrotas del propio dataset mezcladas. El modo anterior
+relee el dataset y aplica ~1.2k regex por token, por eso se mide sobre una muestra
+(--tokens-anterior) y se informa en tokens/s. También verifica que ambos coincidan.
+"""
+import argparse
+import json
+import random
+import time
+
+from app.services.moderation import spanlp_service
+
+_VOCAB_OCR = [
+    "GOL", "BOCA", "RIVER", "JUNIORS", "PLATE", "1", "0", "2", "MIN", "45", "90", "VAR",
+    "ESTADIO", "MONUMENTAL", "BOMBONERA", "CAMPEÓN", "HINCHADA", "VAMOS", "DALE", "FIFA",
+    "SPONSOR", "QUILMES", "ADIDAS", "NIKE", "FLY", "EMIRATES", "TORNEO", "LIGA", "PROFESIONAL",
+    "árbitro", "tiempo", "extra", "penal", "córner", "Ñandú", "gracias", "familia", "club",
+]
+_PALABROTAS_MUESTRA = ["puta", "mierda", "boludo", "pelotudo", "concha", "forro", "pendejo", "gonorrea"]
+
+
+def generar_corpus(n_tokens: int, semilla: int = 7) -> list:
+    rnd = random.Random(semilla)
+    tokens = []
+    for _ in range(n_tokens):
+        if rnd.random() < 0.03:
+            tokens.append(rnd.choice(_PALABROTAS_MUESTRA))
+        else:
+            tokens.append(rnd.choice(_VOCAB_OCR))
+    return tokens
+
+
+def _anterior(detector, tokens) -> set:
+    """Lo que hacía _detect_with antes: contains_palabrota para cada token."""
+    found = set()
+    for t in tokens:
+        if detector.contains_palabrota(t):
+            found.add(t.lower())
+    return found
+
+
+def correr(n_tokens: int, n_anterior: int) -> dict:
+    detector = spanlp_service._get_detector_global()
+    if detector is None:
+        raise SystemExit("spanlp no está disponible")
+
+    corpus = generar_corpus(n_tokens)
+    muestra = corpus[:n_anterior]
+    texto = " ".join(corpus)
+
+    t0 = time.perf_counter()
+    esperado = _anterior(detector, muestra)
+    seg_anterior = time.perf_counter() - t0
+
+    # Primera llamada: incluye congelar el vocabulario (lectura única del dataset)
+    t0 = time.perf_counter()
+    spanlp_service._vocabulario(detector)
+    seg_snapshot = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    detectadas = spanlp_service._detect_with(detector, texto)
+    seg_nuevo = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    sin_dedup = {t.lower() for t in corpus if spanlp_service._contiene_palabrota(detector, t)}
+    seg_nuevo_sin_dedup = time.perf_counter() - t0
+
+    coincide = spanlp_service._detect_with(detector, " ".join(muestra)) == esperado
+
+    return {
+        "tokens": n_tokens,
+        "tokens_anterior": n_anterior,
+        "anterior_tokens_por_s": round(n_anterior / seg_anterior, 1) if seg_anterior else None,
+        "anterior_estimado_corpus_s": round(seg_anterior * n_tokens / max(1, n_anterior), 2),
+        "snapshot_carga_s": round(seg_snapshot, 4),
+        "nuevo_corpus_s": round(seg_nuevo, 4),
+        "nuevo_tokens_por_s": round(n_tokens / seg_nuevo, 1) if seg_nuevo else None,
+        "nuevo_sin_dedup_tokens_por_s": round(n_tokens / seg_nuevo_sin_dedup, 1) if seg_nuevo_sin_dedup else None,
+        "palabras_detectadas": sorted(detectadas | sin_dedup),
+        "coincide_con_anterior": coincide,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de detección spanlp")
+    parser.add_argument("--tokens", type=int, default=10000, help="Tamaño del corpus OCR sintético")
+    parser.add_argument("--tokens-anterior", type=int, default=300,
+                        help="Tokens medidos con el comportamiento anterior (es lento)")
+    args = parser.parse_args()
+    print(json.dumps(correr(args.tokens, args.tokens_anterior), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
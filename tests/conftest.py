@@ -0,0 +1,38 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Los tests nunca hablan con GCP: sin Secret Manager, lexicón desde código y sin artefacto precompilado
+os.environ.setdefault("ENABLE_SECRET_MANAGER", "false")
+os.environ.setdefault("BADWORDS_SOURCE", "file")
+os.environ.setdefault("LEXICON_ARTIFACT_PATH", "")
+
+
+@pytest.fixture
+def app_ctx(tmp_path):
+    """App Flask mínima sobre un SQLite temporal, con las tablas de los modelos creadas."""
+    from flask import Flask
+    from app import db
+    import app.models.video  # noqa: F401  (registra los modelos en el metadata)
+    import app.models.club  # noqa: F401
+    import app.models.badWord  # noqa: F401
+    import app.models.analisis_cache  # noqa: F401
+    import app.models.traduccion_cache  # noqa: F401
+
+    flask_app = Flask(__name__)
+    flask_app.config.update(
+        # En archivo y no en memoria: cada conexión del pool es independiente, como en MySQL
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'test.db'}",
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        TESTING=True,
+    )
+    db.init_app(flask_app)
+    with flask_app.app_context():
+        db.create_all()
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
@@ -0,0 +1,62 @@
+# tests/test_aho_corasick.py
+import random
+
+import pytest
+
+from app.services.moderation import aho_corasick
+from app.services.moderation.aho_corasick import AhoCorasick
+
+
+@pytest.fixture(params=["automata", "directa"])
+def modo(request, monkeypatch):
+    """Corre cada test con el recorrido del autómata y con la búsqueda directa (pocos patrones)."""
+    umbral = 0 if request.param == "automata" else 10_000
+    monkeypatch.setattr(aho_corasick, "MAX_PATRONES_BUSQUEDA_DIRECTA", umbral)
+    return request.param
+
+
+def test_encuentra_patrones_solapados_y_anidados(modo):
+    ac = AhoCorasick(["puta", "hijo de puta", "mierda", "he", "she", "hers"])
+
+    assert ac.buscar("hijo de puta") == {"puta", "hijo de puta"}
+    assert ac.buscar("ushers") == {"she", "he", "hers"}
+    assert ac.buscar("todo limpio") == set()
+
+
+def test_iter_coincidencias_por_fin_y_el_mas_largo_primero(modo):
+    ac = AhoCorasick(["a", "aa", "ba"])
+
+    assert list(ac.iter_coincidencias("baaa")) == [
+        (2, "ba"), (2, "a"), (3, "aa"), (3, "a"), (4, "aa"), (4, "a"),
+    ]
+
+
+def test_ignora_vacios_y_duplicados():
+    ac = AhoCorasick(["", "forro", "forro", "forros"])
+
+    assert len(ac) == 2
+    assert ac.patrones == ["forro", "forros"]
+    assert ac.bytes_estimados() > 0
+
+
+def test_equivale_a_buscar_cada_palabra_como_substring(modo):
+    rnd = random.Random(3)
+    patrones = ["".join(rnd.choice("abc ") for _ in range(rnd.randint(1, 5))) for _ in range(60)]
+    ac = AhoCorasick(patrones)
+
+    for _ in range(200):
+        texto = "".join(rnd.choice("abcd ") for _ in range(rnd.randint(0, 40)))
+        assert ac.buscar(texto) == {p for p in patrones if p and p in texto}
+
+
+def test_ambos_recorridos_dan_las_mismas_coincidencias(monkeypatch):
+    rnd = random.Random(8)
+    ac = AhoCorasick("".join(rnd.choice("ab") for _ in range(rnd.randint(1, 4))) for _ in range(20))
+    textos = ["".join(rnd.choice("ab ") for _ in range(30)) for _ in range(100)]
+
+    monkeypatch.setattr(aho_corasick, "MAX_PATRONES_BUSQUEDA_DIRECTA", 0)
+    por_automata = [list(ac.iter_coincidencias(t)) for t in textos]
+    monkeypatch.setattr(aho_corasick, "MAX_PATRONES_BUSQUEDA_DIRECTA", 10_000)
+    directas = [list(ac.iter_coincidencias(t)) for t in textos]
+
+    assert por_automata == directas
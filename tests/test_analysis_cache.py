@@ -0,0 +1,84 @@
+# tests/test_analysis_cache.py
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+
+from app.services.gcp import gcs_service
+from app.services.video import analysis_cache_service as cache
+
+
+class _Bucket:
+    def __init__(self, blobs):
+        self.blobs = blobs
+
+    def get_blob(self, nombre):
+        return self.blobs.get(nombre)
+
+
+def test_hash_contenido_usa_md5_y_si_no_crc32c_con_tamano(monkeypatch):
+    bucket = _Bucket({
+        "a.mp4": SimpleNamespace(md5_hash="MD5==", crc32c="CRC==", size=10),
+        "compuesto.mp4": SimpleNamespace(md5_hash=None, crc32c="CRC==", size=10),
+    })
+    monkeypatch.setattr(gcs_service, "_get_bucket", lambda: bucket)
+
+    assert gcs_service.obtener_hash_contenido("a.mp4") == "md5:MD5=="
+    assert gcs_service.obtener_hash_contenido("compuesto.mp4") == "crc32c:CRC==:10"
+    assert gcs_service.obtener_hash_contenido("no-existe.mp4") is None
+
+
+def test_version_pipeline_cambia_con_la_config_y_el_locale(monkeypatch):
+    monkeypatch.delenv("OCR_MAX_FRAMES", raising=False)
+    base = cache.version_pipeline()
+
+    assert cache.version_pipeline() == base
+    assert cache.version_pipeline("es-AR") != base
+    assert cache.version_pipeline("es-AR") != cache.version_pipeline("es-MX")
+
+    monkeypatch.setenv("OCR_MAX_FRAMES", "25")
+    assert cache.version_pipeline() != base
+    assert cache.version_pipeline().startswith(f"{cache.AI_PIPELINE_VERSION}-")
+
+
+@pytest.mark.parametrize("datos", [
+    {"ramas_timeout": ["gemini"], "nivel_problema_texto": "limpio"},
+    {"ramas_timeout": [], "nivel_problema_texto": "error"},
+])
+def test_resultados_parciales_no_se_guardan(app_ctx, datos):
+    from app.models.analisis_cache import AnalisisCache
+
+    assert cache.guardar_resultado_cacheado("md5:abc", datos, video_id=1) is False
+    assert AnalisisCache.query.count() == 0
+
+
+def test_guardar_y_reutilizar_por_contenido(app_ctx, monkeypatch):
+    monkeypatch.setattr(cache, "obtener_hash_contenido", lambda nombre: "md5:abc")
+    datos = {"veredicto_ia": "aprobado", "nivel_problema_texto": "limpio", "ramas_timeout": []}
+
+    assert cache.obtener_resultado_cacheado("uploads/a.mp4") == (None, "md5:abc")
+    assert cache.guardar_resultado_cacheado("md5:abc", datos, video_id=1) is True
+    # Otro nombre de objeto, mismo contenido
+    assert cache.obtener_resultado_cacheado("uploads/copia.mp4") == (datos, "md5:abc")
+    # Otro locale => otra versión de pipeline => miss
+    assert cache.obtener_resultado_cacheado("uploads/copia.mp4", locale="es-MX") == (None, "md5:abc")
+    # Guardar dos veces el mismo contenido no falla
+    assert cache.guardar_resultado_cacheado("md5:abc", datos, video_id=2) is False
+
+
+def test_hit_y_guardado_no_tocan_la_sesion_del_llamador(app_ctx, monkeypatch):
+    from app import db
+    from app.models.video import Video
+
+    monkeypatch.setattr(cache, "obtener_hash_contenido", lambda nombre: "md5:abc")
+    datos = {"veredicto_ia": "aprobado", "nivel_problema_texto": "limpio", "ramas_timeout": []}
+    pendiente = Video(usuario_id=1)
+    db.session.add(pendiente)
+
+    assert cache.guardar_resultado_cacheado("md5:abc", datos, video_id=1) is True
+    assert cache.obtener_resultado_cacheado("uploads/a.mp4") == (datos, "md5:abc")
+
+    with db.engine.connect() as conn:
+        assert conn.execute(text("SELECT hits FROM analisis_cache")).scalar() == 1
+        assert conn.execute(text("SELECT COUNT(*) FROM video")).scalar() == 0
+    assert pendiente in db.session.new
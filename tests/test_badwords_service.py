@@ -0,0 +1,60 @@
+# tests/test_badwords_service.py
+import pytest
+
+from app.services.moderation import badwords_service
+
+
+@pytest.fixture
+def lexicon_db(app_ctx, monkeypatch):
+    monkeypatch.setattr(badwords_service, "_lexicones", {})
+    monkeypatch.setattr(badwords_service, "_recarga", {"ultimo_chequeo": 0.0, "ultima_recarga": None})
+    monkeypatch.setattr(badwords_service, "obtener_artefacto", lambda: None)
+    return app_ctx
+
+
+def _agregar(*palabras, categoria="soez"):
+    from app import db
+    from app.models.badWord import BadWord
+    for palabra in palabras:
+        db.session.add(BadWord(palabra=palabra, categoria=categoria, idioma="es"))
+    db.session.commit()
+
+
+def test_carga_y_recarga_en_caliente_desde_bd(lexicon_db):
+    _agregar("boludo", "gil")
+
+    lex = badwords_service.obtener_lexicon("db")
+    assert lex.badwords == {"soez": ["boludo", "gil"]}
+    assert badwords_service.detect_badwords("che gil", source="db")["found"] == ["gil"]
+
+    _agregar("matar", categoria="violenta")
+    # Dentro de BADWORDS_RELOAD_SEC no se vuelve a consultar
+    assert badwords_service.obtener_lexicon("db") is lex
+
+    badwords_service.forzar_recarga()
+    nuevo = badwords_service.obtener_lexicon("db")
+    assert nuevo.version != lex.version
+    assert nuevo.badwords == {"soez": ["boludo", "gil"], "violento": ["matar"]}
+
+
+def test_tabla_vacia_usa_la_lista_en_codigo(lexicon_db):
+    assert badwords_service.obtener_lexicon("db").badwords is badwords_service.BADWORDS
+
+
+def test_error_de_bd_no_descarta_los_cambios_pendientes_del_llamador(lexicon_db, monkeypatch):
+    from app import db
+    from app.models.video import Video
+
+    video = Video(usuario_id=1, nombre_archivo="clip.mp4")
+    db.session.add(video)
+
+    def _falla(conn):
+        raise RuntimeError("BD caída")
+
+    monkeypatch.setattr(badwords_service, "_version_db", _falla)
+    lex = badwords_service.obtener_lexicon("db")
+
+    assert lex.badwords is badwords_service.BADWORDS
+    assert video in db.session.new
+    db.session.commit()
+    assert Video.query.count() == 1
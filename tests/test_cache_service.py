@@ -0,0 +1,59 @@
+# tests/test_cache_service.py
+import pytest
+
+from app.services.core import cache_service
+from app.services.core.cache_service import CacheTTL
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    ahora = {"t": 1000.0}
+    monkeypatch.setattr(cache_service.time, "monotonic", lambda: ahora["t"])
+    return ahora
+
+
+def test_entrada_expira_al_cumplir_el_ttl(reloj):
+    cache = CacheTTL(max_entradas=10, ttl_seg=60)
+    cache.guardar("a", 1)
+
+    reloj["t"] += 59.9
+    assert cache.obtener("a") == 1
+
+    reloj["t"] += 0.1
+    assert cache.obtener("a") is None
+    assert len(cache) == 0
+    stats = cache.estadisticas()
+    assert (stats["hits"], stats["misses"], stats["expirados"]) == (1, 1, 1)
+
+
+def test_guardar_renueva_el_ttl(reloj):
+    cache = CacheTTL(max_entradas=10, ttl_seg=60)
+    cache.guardar("a", 1)
+    reloj["t"] += 50
+    cache.guardar("a", 2)
+    reloj["t"] += 50
+    assert cache.obtener("a") == 2
+
+
+def test_desaloja_la_menos_usada(reloj):
+    cache = CacheTTL(max_entradas=2, ttl_seg=60)
+    cache.guardar("a", 1)
+    cache.guardar("b", 2)
+    assert cache.obtener("a") == 1   # "b" queda como la menos usada
+    cache.guardar("c", 3)
+
+    assert cache.obtener("b") is None
+    assert cache.obtener("a") == 1
+    assert cache.obtener("c") == 3
+    stats = cache.estadisticas()
+    assert stats["desalojos"] == 1
+    assert stats["entradas"] == 2
+    assert stats["expirados"] == 0
+
+
+def test_max_cero_desactiva_la_cache(reloj):
+    cache = CacheTTL(max_entradas=0, ttl_seg=60)
+    cache.guardar("a", 1)
+    assert cache.obtener("a") is None
+    assert len(cache) == 0
+    assert cache.estadisticas()["hit_ratio"] == 0.0
@@ -0,0 +1,60 @@
+# tests/test_gcs_service.py
+import threading
+import time
+
+import pytest
+from google.auth.transport.requests import Request
+
+from app.services.gcp import gcs_service
+
+
+class _CredencialesFalsas:
+    service_account_email = "app@proyecto.iam.gserviceaccount.com"
+
+    def __init__(self):
+        self.token = None
+        self.refrescos = []
+
+    @property
+    def valid(self):
+        return self.token is not None
+
+    def refresh(self, request):
+        time.sleep(0.01)
+        self.refrescos.append(request)
+        self.token = f"token-{len(self.refrescos)}"
+
+
+class _BlobFalso:
+    def generate_signed_url(self, **kwargs):
+        return kwargs
+
+
+@pytest.fixture
+def credenciales(monkeypatch):
+    creds = _CredencialesFalsas()
+    monkeypatch.setattr(gcs_service, "_storage_client", None)
+    monkeypatch.setattr(gcs_service, "_storage_credentials", None)
+    monkeypatch.setattr(gcs_service, "_crear_storage_client", lambda: (object(), creds))
+    return creds
+
+
+def test_refresco_unico_entre_hilos_con_request_propio(credenciales):
+    hilos = [threading.Thread(target=gcs_service._credenciales_vigentes) for _ in range(8)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+
+    assert len(credenciales.refrescos) == 1
+    assert isinstance(credenciales.refrescos[0], Request)
+    assert gcs_service._credenciales_vigentes() is credenciales
+    assert len(credenciales.refrescos) == 1
+
+
+def test_url_firmada_por_iam_usa_el_token_vigente(credenciales):
+    url, modo = gcs_service._build_signed_url(_BlobFalso())
+
+    assert modo == "IAM"
+    assert url["access_token"] == "token-1"
+    assert url["service_account_email"] == credenciales.service_account_email
@@ -0,0 +1,53 @@
+# tests/test_lexicon_artifact.py
+import pytest
+
+from app.services.moderation import lexicon_artifact
+from app.services.moderation.lexicon_artifact import ArtefactoLexicon, escribir_artefacto
+
+
+def test_ida_y_vuelta_por_mmap(tmp_path):
+    ruta = str(tmp_path / "lexicon.bin")
+    palabras = ["pelotudo", "ñoño", "la concha", "árbitro", "gil"]
+    escribir_artefacto(ruta, {
+        "lista:español": (palabras, {}),
+        "spanlp:global": (sorted(["zeta", "alfa"]), {"longitudes": [4]}),
+        "vacia:x": ([], {}),
+    }, {"version_badwords_db": ["db", 7, 3, 3]})
+
+    art = ArtefactoLexicon(ruta)
+    assert art.secciones == ["lista:español", "spanlp:global", "vacia:x"]
+    assert art.metadata == {"version_badwords_db": ["db", 7, 3, 3]}
+
+    seccion = art.seccion("lista:español")
+    assert list(seccion) == palabras
+    assert seccion[1] == "ñoño"
+    assert all(p in seccion for p in palabras)
+    assert "pelotud" not in seccion and "zzz" not in seccion
+    with pytest.raises(IndexError):
+        seccion[len(palabras)]
+
+    assert art.seccion("spanlp:global").meta == {"longitudes": [4]}
+    assert len(art.seccion("vacia:x")) == 0 and "a" not in art.seccion("vacia:x")
+    assert list(art.grupos("lista")) == ["español"]
+
+
+def test_archivo_ajeno_es_invalido(tmp_path, monkeypatch):
+    ruta = tmp_path / "otro.bin"
+    ruta.write_bytes(b"no es un artefacto")
+    with pytest.raises(ValueError):
+        ArtefactoLexicon(str(ruta))
+
+    monkeypatch.setattr(lexicon_artifact, "LEXICON_ARTIFACT_PATH", str(ruta))
+    monkeypatch.setattr(lexicon_artifact, "_artefacto", {"cargado": False, "valor": None})
+    assert lexicon_artifact.obtener_artefacto() is None
+
+
+def test_construir_sin_db_incluye_listas_y_spanlp(tmp_path):
+    from app.services.moderation import badwords_service
+
+    resumen = lexicon_artifact.construir_artefacto(str(tmp_path / "lexicon.bin"), incluir_db=False)
+    art = ArtefactoLexicon(resumen["ruta"])
+    assert "version_badwords_db" not in art.metadata
+    assert not art.grupos("badwords_db")
+    assert list(art.seccion("badwords_codigo:violento")) == list(badwords_service.BADWORDS["violento"])
+    assert "spanlp:global" in art.secciones
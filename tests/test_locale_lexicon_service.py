@@ -0,0 +1,40 @@
+# tests/test_locale_lexicon_service.py
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.moderation import locale_lexicon_service
+from app.services.moderation.locale_lexicon_service import locale_para_pais, locale_para_video
+
+
+@pytest.mark.parametrize("pais, esperado", [
+    ("AR", "es-AR"), ("mx", "es-MX"), ("US", "en"), (None, None), ("", None), ("ZZ", None),
+])
+def test_locale_para_pais(pais, esperado):
+    assert locale_para_pais(pais) == esperado
+
+
+def test_sin_club_o_sin_pais_se_usa_el_escaneo_global(app_ctx):
+    from app import db
+    from app.models.club import Club
+
+    db.session.add_all([Club(id=1, nombre="Sin país"), Club(id=2, nombre="Boca", pais="AR")])
+    db.session.commit()
+
+    assert locale_para_video(SimpleNamespace(club_id=None, gcs_object_name="uploads/clip.mp4")) is None
+    assert locale_para_video(SimpleNamespace(club_id=1, gcs_object_name=None)) is None
+    assert locale_para_video(SimpleNamespace(club_id=99, gcs_object_name=None)) is None
+    assert locale_para_video(SimpleNamespace(club_id=2, gcs_object_name=None)) == "es-AR"
+    assert locale_para_video(SimpleNamespace(club_id=None, gcs_object_name="uploads/club_2_clip.mp4")) == "es-AR"
+
+
+def test_vocab_del_locale_es_pais_mas_global(monkeypatch):
+    spanlp = locale_lexicon_service.spanlp_service
+    monkeypatch.setattr(spanlp, "vocabulario_global", lambda: (frozenset({"chinga", "forro"}), (5, 6)))
+
+    monkeypatch.setattr(spanlp, "vocabulario_pais", lambda pais: (frozenset({"forro"}), (5,)))
+    assert locale_lexicon_service._vocab_spanlp("ar") is None
+
+    monkeypatch.setattr(spanlp, "vocabulario_pais", lambda pais: (frozenset({"forro", "pelotudazo"}), (5, 10)))
+    assert locale_lexicon_service._vocab_spanlp("ar") == (frozenset({"chinga", "forro", "pelotudazo"}), (5, 6, 10))
+    assert locale_lexicon_service._vocab_spanlp(None) is None
@@ -0,0 +1,49 @@
+# tests/test_migraciones.py
+from sqlalchemy import create_engine, inspect, text
+
+from app.services.core import migraciones_service
+from app.services.core.migraciones_service import MIGRACIONES, aplicar_migraciones
+
+
+def _engine_con_tablas_viejas():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE video (id INTEGER PRIMARY KEY, usuario_id INTEGER NOT NULL)"))
+        conn.execute(text("INSERT INTO video (id, usuario_id) VALUES (1, 7)"))
+        conn.execute(text("CREATE TABLE club (id INTEGER PRIMARY KEY, nombre VARCHAR(100) NOT NULL)"))
+    return engine
+
+
+def test_agrega_columnas_faltantes_en_tablas_existentes():
+    engine = _engine_con_tablas_viejas()
+
+    agregadas = aplicar_migraciones(engine)
+
+    assert agregadas == [f"{m.tabla}.{m.columna}" for m in MIGRACIONES]
+    columnas = {c["name"] for c in inspect(engine).get_columns("video")}
+    assert {m.columna for m in MIGRACIONES if m.tabla == "video"} <= columnas
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT usuario_id FROM video WHERE id = 1")).scalar() == 7
+        # Las filas existentes quedan sin traducción pendiente (DEFAULT FALSE)
+        assert not conn.execute(text("SELECT traduccion_pendiente FROM video WHERE id = 1")).scalar()
+    indices = {i["name"] for i in inspect(engine).get_indexes("video")}
+    assert {"ix_video_club_id", "ix_video_traduccion_pendiente"} <= indices
+
+
+def test_es_idempotente_y_salta_tablas_inexistentes(monkeypatch):
+    engine = _engine_con_tablas_viejas()
+    aplicar_migraciones(engine)
+    assert aplicar_migraciones(engine) == []
+
+    monkeypatch.setattr(migraciones_service, "MIGRACIONES",
+                        [migraciones_service.Migracion("no_existe", "x", "INTEGER NULL")])
+    assert aplicar_migraciones(engine) == []
+
+
+def test_modelos_quedan_consultables_tras_migrar(app_ctx):
+    from app import db
+    from app.models.video import Video
+
+    # create_all ya creó el esquema completo: no hay nada que migrar
+    assert aplicar_migraciones(db.engine) == []
+    assert Video.query.count() == 0
@@ -0,0 +1,115 @@
+# tests/test_moderation_scanner.py
+import random
+
+import pytest
+
+from benchmarks.corpus_ocr import SOECES, generar_corpus, ofuscar
+from app.services.moderation import badwords_service, moderation_scanner, spanlp_service
+from app.services.moderation.lexico_base import normalizar_texto
+from app.services.moderation.text_detection_service import (
+    _detectar_palabras_problematicas,
+    _fusionar_palabras,
+)
+
+
+@pytest.fixture(autouse=True)
+def lexicon_en_codigo(monkeypatch):
+    monkeypatch.setattr(badwords_service, "BADWORDS_SOURCE", "file")
+
+
+def _fusion_legacy(texto, country=None):
+    return _fusionar_palabras(
+        _detectar_palabras_problematicas(texto.lower()),
+        spanlp_service.detectar_palabras(texto, country=country),
+        badwords_service.detect_badwords(texto)["found"],
+    )
+
+
+def _textos_sinofuscar(n=400):
+    rnd = random.Random(1)
+    return [f"{t} {rnd.choice(SOECES)}" for t in generar_corpus(n, tasa_soez=0)]
+
+
+def test_paridad_con_la_fusion_legacy_sin_ofuscacion():
+    for texto in _textos_sinofuscar():
+        # spanlp legacy devuelve un set: se compara sin orden
+        assert sorted(moderation_scanner.escanear_texto(texto)["palabras"]) == sorted(_fusion_legacy(texto)), texto
+
+
+def test_con_ofuscacion_detecta_todo_lo_de_la_fusion_legacy_y_mas():
+    rnd = random.Random(2)
+    for texto in generar_corpus(400, tasa_soez=0.5):
+        unificado = {normalizar_texto(p) for p in moderation_scanner.escanear_texto(texto)["palabras"]}
+        assert {normalizar_texto(p) for p in _fusion_legacy(texto)} <= unificado, texto
+
+    for soez in ("puta", "mierda", "bitch", "shit"):
+        for _ in range(8):
+            texto = f"VAMOS {ofuscar(rnd, soez)}"
+            assert soez in moderation_scanner.escanear_texto(texto)["palabras"], texto
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("p u t a", ["puta"]),
+    ("p.u.t.4", ["puta"]),
+    ("miiierrrda", ["mierda"]),
+    ("hijodeputas", ["hijo de puta", "puta", "hijodeputas"]),
+    ("pera", []),
+    ("la mano de dios", ["mano"]),
+])
+def test_ofuscaciones(texto, esperado):
+    assert moderation_scanner.escanear_texto(texto)["palabras"] == esperado
+
+
+def test_sin_matching_de_ofuscacion_solo_busca_formas_normalizadas(monkeypatch):
+    monkeypatch.setattr(moderation_scanner, "ENABLE_OBFUSCATION_MATCHING", False)
+
+    assert moderation_scanner.escanear_texto("p u t a")["palabras"] == []
+    assert moderation_scanner.escanear_texto("hijodeputas")["palabras"] == ["puta", "hijodeputas"]
+    assert moderation_scanner.escanear_texto("put4")["palabras"] == ["puta"]
+
+
+def test_saltear_la_vista_compacta_no_pierde_coincidencias(monkeypatch):
+    rnd = random.Random(4)
+    palabras = [p for lista in badwords_service.BADWORDS.values() for p in lista]
+    textos = generar_corpus(300, tasa_soez=0.5)
+    textos += [f"{rnd.choice(['', 'de la', 'GOAL!'])} {ofuscar(rnd, rnd.choice(palabras))}" for _ in range(300)]
+    textos += [rnd.choice(palabras).replace(" ", "") for _ in range(300)]
+
+    con_atajo = [moderation_scanner.escanear_texto(t) for t in textos]
+    monkeypatch.setattr(moderation_scanner, "_requiere_vista_compacta", lambda leet: True)
+    siempre_compacta = [moderation_scanner.escanear_texto(t) for t in textos]
+
+    assert con_atajo == siempre_compacta
+
+
+def test_nivel_y_detalle():
+    resultado = moderation_scanner.escanear_texto("puta mierda forro")
+
+    assert resultado["nivel"] == "problematico"
+    assert {"palabra": "puta", "fuente": "lista", "categoria": "es"} in resultado["detalle"]
+    assert moderation_scanner.escanear_texto("") == {"palabras": [], "detalle": [], "nivel": "limpio"}
+
+
+def test_paridad_con_la_fusion_legacy_con_locale(monkeypatch):
+    from app.services.moderation import text_detection_service
+
+    rnd = random.Random(5)
+    propias = text_detection_service._load_bad_words("es-AR")["es-AR"]
+    textos = _textos_sinofuscar(200)
+    textos += [f"{t} {rnd.choice(propias)}" for t in generar_corpus(200, tasa_soez=0)]
+    textos += ["che chinga amarrete bufa", "qué pelotudo el forro ese", "vamos boludo"]
+
+    for texto in textos:
+        unificado = moderation_scanner.escanear_texto(texto, locale="es-AR")
+        monkeypatch.setattr(text_detection_service, "ENABLE_UNIFIED_SCANNER", False)
+        legacy, nivel_legacy = text_detection_service._detectar_con_listas(texto, "es-AR")
+        monkeypatch.setattr(text_detection_service, "ENABLE_UNIFIED_SCANNER", True)
+        assert sorted(unificado["palabras"]) == sorted(legacy), texto
+        assert unificado["nivel"] == nivel_legacy, texto
+
+
+def test_locale_suma_el_spanlp_global_al_del_pais():
+    # Solo están en el dataset de México: el locale es-AR no debe perderlas
+    for palabra in ("chinga", "amarrete", "bufa"):
+        assert palabra in moderation_scanner.escanear_texto(f"che {palabra}", locale="es-AR")["palabras"]
+    assert "boludo" in moderation_scanner.escanear_texto("che boludo", locale="es-AR")["palabras"]
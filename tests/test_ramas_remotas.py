@@ -0,0 +1,87 @@
+# tests/test_ramas_remotas.py
+import threading
+
+import pytest
+
+from app.services.gcp import video_ai_service as vai
+
+
+@pytest.fixture
+def fanout(monkeypatch):
+    monkeypatch.setattr(vai, "AI_FANOUT_ENABLED", True)
+    monkeypatch.setattr(vai, "OCR_BACKEND", "vision")
+    monkeypatch.setattr(vai, "OCR_FRAME_SELECTION", "uniforme")
+    monkeypatch.setattr(vai, "GEMINI_TIMEOUT_SEC", 0.2)
+    monkeypatch.setattr(vai, "OCR_TIMEOUT_SEC", 0.2)
+    monkeypatch.setattr(vai, "VI_TIMEOUT_MARGIN_SEC", 0.0)
+    monkeypatch.setattr(vai, "_ramas_huerfanas", {"en_curso": 0})
+    liberar = threading.Event()
+    yield liberar
+    liberar.set()
+
+
+def test_ramas_lentas_usan_resultado_parcial(fanout, monkeypatch):
+    anotacion = object()
+    monkeypatch.setattr(vai, "_analizar_rama_video_intelligence", lambda uri, t: anotacion)
+    monkeypatch.setattr(vai, "_analizar_rama_gemini", lambda uri, t: fanout.wait(5) or {"alertas": {"x"}})
+    monkeypatch.setattr(vai, "_analizar_rama_ocr", lambda *a: fanout.wait(5) or {"nivel_problema": "limpio"})
+
+    ramas = vai._ejecutar_ramas_remotas("gs://b/v.mp4", 1, use_vertex=True)
+
+    assert ramas["video_intelligence"] is anotacion
+    assert ramas["gemini"] == vai._rama_gemini_vacia()
+    assert ramas["ocr"]["nivel_problema"] == "error"
+    assert sorted(ramas["timeouts"]) == ["gemini", "ocr"]
+    assert vai._ramas_huerfanas["en_curso"] == 2
+
+
+def test_timeouts_de_rama_llegan_a_los_clientes(fanout, monkeypatch):
+    recibidos = {}
+    monkeypatch.setattr(vai, "_analizar_rama_video_intelligence", lambda uri, t: object())
+    monkeypatch.setattr(vai, "_analizar_rama_gemini", lambda uri, t: recibidos.update(gemini=t) or vai._rama_gemini_vacia())
+    monkeypatch.setattr(vai, "_analizar_rama_ocr", lambda *a: recibidos.update(ocr=a[-1]) or {"nivel_problema": "limpio"})
+
+    vai._ejecutar_ramas_remotas("gs://b/v.mp4", 1, use_vertex=True)
+
+    assert recibidos == {"gemini": vai.GEMINI_TIMEOUT_SEC, "ocr": vai.OCR_TIMEOUT_SEC}
+
+
+def test_con_el_tope_de_huerfanas_no_lanza_gemini_ni_ocr(fanout, monkeypatch):
+    def _no_llamar(*a):
+        raise AssertionError("con el tope alcanzado no se lanzan ramas opcionales")
+
+    anotacion = object()
+    monkeypatch.setattr(vai, "AI_MAX_RAMAS_HUERFANAS", 2)
+    monkeypatch.setattr(vai, "_ramas_huerfanas", {"en_curso": 2})
+    monkeypatch.setattr(vai, "_analizar_rama_video_intelligence", lambda uri, t: anotacion)
+    monkeypatch.setattr(vai, "_analizar_rama_gemini", _no_llamar)
+    monkeypatch.setattr(vai, "_analizar_rama_ocr", _no_llamar)
+
+    ramas = vai._ejecutar_ramas_remotas("gs://b/v.mp4", 1, use_vertex=True)
+
+    assert ramas["video_intelligence"] is anotacion
+    assert ramas["gemini"] == vai._rama_gemini_vacia()
+    assert ramas["ocr"]["nivel_problema"] == "error"
+    assert sorted(ramas["timeouts"]) == ["gemini", "ocr"]
+
+
+def test_timeout_de_video_intelligence_se_propaga(fanout, monkeypatch):
+    monkeypatch.setattr(vai, "_analizar_rama_video_intelligence", lambda uri, t: fanout.wait(5))
+    monkeypatch.setattr(vai, "_analizar_rama_ocr", lambda *a: {"nivel_problema": "limpio"})
+
+    with pytest.raises(TimeoutError):
+        vai._ejecutar_ramas_remotas("gs://b/v.mp4", 0.2, use_vertex=False)
+
+
+def test_annotation_result_existente_no_llama_a_video_intelligence(fanout, monkeypatch):
+    def _no_llamar(*a):
+        raise AssertionError("VI no debe ejecutarse en modo resume")
+
+    monkeypatch.setattr(vai, "_analizar_rama_video_intelligence", _no_llamar)
+    monkeypatch.setattr(vai, "_analizar_rama_ocr", lambda *a: {"nivel_problema": "limpio"})
+    anotacion = object()
+
+    ramas = vai._ejecutar_ramas_remotas("gs://b/v.mp4", 1, use_vertex=False, annotation_result=anotacion)
+
+    assert ramas["video_intelligence"] is anotacion
+    assert ramas["timeouts"] == []
@@ -0,0 +1,58 @@
+# tests/test_text_moderation_service.py
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.core.cache_service import CacheTTL
+from app.services.moderation import text_detection_service, text_moderation_service
+
+
+class _ClienteFalso:
+    def __init__(self):
+        self.llamadas = []
+
+    def moderate_text(self, document):
+        self.llamadas.append(document.content)
+        return SimpleNamespace(moderation_categories=[SimpleNamespace(name="Toxic", confidence=0.1)])
+
+
+@pytest.fixture
+def cliente(monkeypatch):
+    falso = _ClienteFalso()
+    monkeypatch.setattr(text_detection_service, "_language_client", falso)
+    monkeypatch.setattr(text_detection_service, "_moderacion_cache", CacheTTL(100, 3600))
+    monkeypatch.setattr(text_moderation_service, "TEXT_MOD_API_MAX_POR_LOTE", 10)
+    return falso
+
+
+def test_llamadas_api_no_cuenta_respuestas_de_cache(cliente):
+    primero = text_moderation_service.moderar_textos(["hola club", "buen partido"], usar_api=True)
+    assert primero["resumen"]["llamadas_api"] == 2
+    assert primero["resumen"]["respuestas_cache_api"] == 0
+
+    segundo = text_moderation_service.moderar_textos(["Hola  club", "buen partido", "gran gol"], usar_api=True)
+    assert segundo["resumen"]["llamadas_api"] == 1
+    assert segundo["resumen"]["respuestas_cache_api"] == 2
+    assert sorted(cliente.llamadas) == ["buen partido", "gran gol", "hola club"]
+    assert all(r["nivel_api"] == "limpio" for r in segundo["resultados"])
+
+
+def test_ocr_con_plazo_vencido_no_llama_a_vision(monkeypatch):
+    def _no_llamar():
+        raise AssertionError("con el plazo vencido no se llama a Vision")
+
+    monkeypatch.setattr(text_detection_service, "_client", _no_llamar)
+    frames = [(0, b"jpeg"), (30, b"jpeg")]
+
+    assert text_detection_service._analizar_textos_en_lote(frames, limite=0.0) == ({}, 0)
+
+
+@pytest.mark.parametrize("pais", [5, ["AR"], {"codigo": "AR"}])
+def test_pais_que_no_es_string_devuelve_400(app_ctx, pais):
+    from app.routes.main import main
+    app_ctx.register_blueprint(main)
+
+    resp = app_ctx.test_client().post("/api/moderate-text", json={"textos": ["hola club"], "pais": pais})
+
+    assert resp.status_code == 400
+    assert resp.get_json()["error"] == "bad_request"
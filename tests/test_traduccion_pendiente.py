@@ -0,0 +1,141 @@
+# tests/test_traduccion_pendiente.py
+import pytest
+from google.api_core.exceptions import AlreadyExists
+
+from app.services.core.cache_service import CacheTTL
+from app.services.gcp import cloud_tasks_service
+from app.services.i18n import traduccion_pendiente_service, translation_service
+
+
+class _ColaFalsa:
+    def __init__(self):
+        self.tasks = []
+
+    def queue_path(self, proyecto, location, cola):
+        return f"projects/{proyecto}/locations/{location}/queues/{cola}"
+
+    def create_task(self, request):
+        task = request["task"]
+        if any(t.get("name") == task.get("name") for t in self.tasks if "name" in task):
+            raise AlreadyExists("task repetida")
+        self.tasks.append(task)
+        return type("Task", (), {"name": task.get("name", "anonima")})()
+
+
+@pytest.fixture
+def cola(monkeypatch):
+    falsa = _ColaFalsa()
+    monkeypatch.setattr(cloud_tasks_service.tasks_v2, "CloudTasksClient", lambda: falsa)
+    monkeypatch.setenv("GCP_PROJECT_ID", "proyecto")
+    monkeypatch.setenv("TASKS_OIDC_SA_EMAIL", "tasks@proyecto.iam.gserviceaccount.com")
+    monkeypatch.setenv("TASK_PROCESS_URL", "https://app.run.app/tasks/process-video")
+    monkeypatch.delenv("TASK_TRANSLATE_URL", raising=False)
+    return falsa
+
+
+def test_una_task_de_traduccion_por_ventana(cola, monkeypatch):
+    monkeypatch.setattr(cloud_tasks_service.time, "time", lambda: 1_000_030.0)
+
+    nombre = cloud_tasks_service.enqueue_translate_pending_task()
+    assert nombre.endswith("/tasks/translate-pending-16667")
+    assert cloud_tasks_service.enqueue_translate_pending_task() is None
+    assert len(cola.tasks) == 1
+    assert cola.tasks[0]["http_request"]["url"] == "https://app.run.app/tasks/translate-pending"
+
+    monkeypatch.setattr(cloud_tasks_service.time, "time", lambda: 1_000_090.0)
+    assert cloud_tasks_service.enqueue_translate_pending_task() is not None
+    assert len(cola.tasks) == 2
+
+
+def test_encolar_sin_configuracion_no_lanza(monkeypatch):
+    monkeypatch.delenv("TASK_PROCESS_URL", raising=False)
+    monkeypatch.delenv("TASK_TRANSLATE_URL", raising=False)
+    assert traduccion_pendiente_service.encolar_traduccion_pendiente() is False
+
+
+class _TranslateFalso:
+    def __init__(self, falla=False):
+        self.falla = falla
+
+    def translate(self, values, source_language, target_language, format_=None):
+        if self.falla:
+            raise RuntimeError("Translate caído")
+        if isinstance(values, list):
+            return [{"translatedText": f"{v}-es"} for v in values]
+        return {"translatedText": f"{values}-es"}
+
+    def detect_language(self, valor):
+        if self.falla:
+            raise RuntimeError("Translate caído")
+        return {"language": "en"}
+
+
+@pytest.fixture
+def cliente(app_ctx, monkeypatch):
+    from app.routes.main import main
+    app_ctx.register_blueprint(main)
+    monkeypatch.setattr(traduccion_pendiente_service, "TRADUCCION_HABILITADA", True)
+    monkeypatch.setattr(translation_service, "TRADUCCION_CACHE_DB", False)
+    monkeypatch.setattr(translation_service, "_traducciones_memoria", CacheTTL(100, 3600))
+    monkeypatch.setattr(translation_service, "obtener_diccionario", lambda idioma: {})
+    monkeypatch.setattr(translation_service, "_translate_client", _TranslateFalso())
+    encoladas = []
+    monkeypatch.setattr("app.routes.main.encolar_traduccion_pendiente", lambda: encoladas.append(1) or True)
+    client = app_ctx.test_client()
+    client.encoladas = encoladas
+    return client
+
+
+def _video_pendiente(**campos):
+    from app import db
+    from app.models.video import Video
+    campos = {"etiquetas": "Crowd", "etiquetas_original": "Crowd", **campos}
+    video = Video(usuario_id=1, estado_ia="completado", traduccion_pendiente=True, **campos)
+    db.session.add(video)
+    db.session.commit()
+    return video
+
+
+def test_translate_pending_solo_desde_cloud_tasks(cliente):
+    video = _video_pendiente()
+
+    assert cliente.post("/tasks/translate-pending").status_code == 403
+    assert cliente.post("/tasks/translate-pending", headers={"X-CloudScheduler": "true"}).status_code == 403
+    assert video.traduccion_pendiente
+
+    resp = cliente.post("/tasks/translate-pending", headers={"X-CloudTasks-TaskName": "t1"})
+    assert resp.status_code == 200
+    assert resp.get_json()["traducidos"] == 1
+    assert not video.traduccion_pendiente
+    assert video.etiquetas == "crowd-es"
+    assert cliente.encoladas == []
+
+
+def test_translate_pending_reencola_si_quedan_videos(cliente):
+    for _ in range(3):
+        _video_pendiente()
+
+    resp = cliente.post("/tasks/translate-pending", json={"limite": 2},
+                        headers={"X-CloudTasks-TaskName": "t1"})
+    assert resp.get_json()["restantes"] == 1
+    assert cliente.encoladas == [1]
+
+
+def test_si_translate_falla_el_video_sigue_pendiente_y_la_task_reintenta(cliente, monkeypatch):
+    video = _video_pendiente(etiquetas_original="Zebra crossing", etiquetas="Zebra crossing")
+    monkeypatch.setattr(translation_service, "_translate_client", _TranslateFalso(falla=True))
+
+    resp = cliente.post("/tasks/translate-pending", headers={"X-CloudTasks-TaskName": "t1"})
+    assert resp.status_code == 500
+    assert resp.get_json()["traducidos"] == 0 and resp.get_json()["fallidos"] == 1
+    assert video.traduccion_pendiente
+    assert video.etiquetas == "Zebra crossing"
+    assert cliente.encoladas == []
+    assert traduccion_pendiente_service.traducir_video(video) is False
+
+    # Cuando Translate vuelve, el reintento completa el video
+    monkeypatch.setattr(translation_service, "_translate_client", _TranslateFalso())
+    resp = cliente.post("/tasks/translate-pending", headers={"X-CloudTasks-TaskName": "t1"})
+    assert resp.status_code == 200
+    assert video.etiquetas == "zebra crossing-es"
+    assert not video.traduccion_pendiente
@@ -0,0 +1,116 @@
+# tests/test_translation_service.py
+import pytest
+from sqlalchemy import text
+
+from app.services.core.cache_service import CacheTTL
+from app.services.i18n import translation_service
+
+
+@pytest.fixture(autouse=True)
+def memoria(monkeypatch):
+    monkeypatch.setattr(translation_service, "_traducciones_memoria", CacheTTL(100, 3600))
+    monkeypatch.setattr(translation_service, "TRADUCCION_CACHE_DB", True)
+
+
+def _hits(db, clave):
+    with db.engine.connect() as conn:
+        return conn.execute(text("SELECT hits FROM traduccion_cache WHERE texto_origen = :c"), {"c": clave}).scalar()
+
+
+def test_hits_de_bd_no_tocan_la_sesion_del_llamador(app_ctx):
+    from app import db
+    from app.models.video import Video
+
+    translation_service._guardar_traducciones({"goal": "gol", "crowd": "multitud"}, "es")
+    translation_service._traducciones_memoria.limpiar()
+    pendiente = Video(usuario_id=1)
+    db.session.add(pendiente)
+
+    encontradas = translation_service._buscar_traducciones(["goal", "crowd", "referee"], "es")
+
+    assert encontradas == {"goal": "gol", "crowd": "multitud"}
+    assert _hits(db, "goal") == 1 and _hits(db, "crowd") == 1
+    # Lo pendiente del llamador sigue pendiente: ni se confirmó ni se deshizo
+    assert pendiente in db.session.new
+    with db.engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM video")).scalar() == 0
+
+    # La segunda vez sale del LRU y no vuelve a la BD
+    assert translation_service._buscar_traducciones(["goal"], "es") == {"goal": "gol"}
+    assert _hits(db, "goal") == 1
+
+
+def test_guardar_duplicado_no_lanza(app_ctx):
+    from app import db
+
+    translation_service._guardar_traducciones({"goal": "gol"}, "es")
+    translation_service._guardar_traducciones({"goal": "gol"}, "es")
+    with db.engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM traduccion_cache")).scalar() == 1
+
+
+def test_un_duplicado_no_descarta_el_resto_del_lote(app_ctx):
+    from app import db
+
+    translation_service._guardar_traducciones({"goal": "gol"}, "es")
+    translation_service._guardar_traducciones({"crowd": "multitud", "goal": "gol", "referee": "árbitro"}, "es")
+    with db.engine.connect() as conn:
+        guardadas = conn.execute(text("SELECT texto_origen FROM traduccion_cache")).scalars().all()
+    assert sorted(guardadas) == ["crowd", "goal", "referee"]
+
+
+class _ClienteFalso:
+    def __init__(self, falla_lote=False):
+        self.falla_lote = falla_lote
+        self.lotes = []
+        self.sueltas = []
+
+    def translate(self, values, source_language, target_language, format_=None):
+        if isinstance(values, list):
+            self.lotes.append(list(values))
+            if self.falla_lote:
+                raise RuntimeError("lote rechazado")
+            return [{"translatedText": f"{v}-es"} for v in values]
+        self.sueltas.append(values)
+        return {"translatedText": f"{values}-es"}
+
+    def detect_language(self, valor):
+        return {"language": "en"}
+
+
+@pytest.fixture
+def traduccion(monkeypatch):
+    monkeypatch.setattr(translation_service, "TRADUCCION_HABILITADA", True)
+    monkeypatch.setattr(translation_service, "TRADUCCION_EN_LOTE", True)
+    monkeypatch.setattr(translation_service, "TRADUCCION_CACHE_DB", False)
+    monkeypatch.setattr(translation_service, "obtener_diccionario", lambda idioma: {"stadium": "estadio"})
+
+    def usar(cliente):
+        monkeypatch.setattr(translation_service, "_translate_client", cliente)
+        return cliente
+    return usar
+
+
+def test_diccionario_despues_cache_y_solo_lo_nuevo_a_la_api(traduccion):
+    cliente = traduccion(_ClienteFalso())
+
+    assert translation_service.traducir_etiquetas("Stadium, crowd, Goal, crowd") == \
+        "estadio, crowd-es, goal-es, crowd-es"
+    assert cliente.lotes == [["crowd", "goal"]]
+
+    assert translation_service.traducir_etiquetas("goal, referee, stadium") == "goal-es, referee-es, estadio"
+    assert cliente.lotes == [["crowd", "goal"], ["referee"]]
+    assert cliente.sueltas == []
+
+
+def test_si_falla_el_lote_traduce_etiqueta_por_etiqueta(traduccion):
+    cliente = traduccion(_ClienteFalso(falla_lote=True))
+
+    assert translation_service.traducir_etiquetas("crowd, stadium, goal") == "crowd-es, estadio, goal-es"
+    assert cliente.lotes == [["crowd", "goal"]]
+    assert cliente.sueltas == ["crowd", "goal"]
+    assert translation_service.obtener_estadisticas_traduccion()["fallos_lote"] >= 1
+
+    # Lo traducido por el camino suelto también queda en cache
+    assert translation_service.traducir_etiquetas("goal") == "goal-es"
+    assert cliente.sueltas == ["crowd", "goal"]
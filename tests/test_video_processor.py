@@ -0,0 +1,30 @@
+# tests/test_video_processor.py
+from types import SimpleNamespace
+
+from app.services.video import video_processor
+
+
+def test_reanudacion_duplicada_solo_procesa_una_vez(app_ctx, monkeypatch):
+    from app import db
+    from app.models.video import Video
+
+    video = Video(usuario_id=1, gcs_object_name="uploads/a.mp4", estado_ia="procesando",
+                  vi_operation_name="projects/p/operations/1")
+    db.session.add(video)
+    db.session.commit()
+
+    procesados = []
+    monkeypatch.setattr(video_processor, "consultar_anotacion_video", lambda op: object())
+    monkeypatch.setattr(video_processor, "procesar_video_individual",
+                        lambda v, annotation_result=None: procesados.append(v.id) or {"exitoso": True})
+
+    # Segunda entrega de la misma task: leyó el video antes de que la primera limpiara la operación
+    duplicada = SimpleNamespace(id=video.id, gcs_object_name=video.gcs_object_name,
+                                vi_operation_name=video.vi_operation_name)
+
+    assert video_processor.reanudar_procesamiento_video(video) == {"exitoso": True}
+    resultado = video_processor.reanudar_procesamiento_video(duplicada)
+
+    assert resultado["omitido"] is True
+    assert procesados == [video.id]
+    assert db.session.get(Video, video.id).vi_operation_name is None